@@ -0,0 +1,24 @@
+"""
+Gunicorn settings shared by the ASGI (default) and WSGI deployments.
+
+ASGI, with uvicorn workers:
+    gunicorn online_menu.asgi:application -c gunicorn.conf.py
+WSGI, with the previous sync workers:
+    GUNICORN_WORKER_CLASS=sync gunicorn online_menu.wsgi:application -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# uvicorn workers serve many connections each from an event loop, so one per
+# core is enough; sync workers serve one request at a time each.
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+# Only used by the threaded gthread worker class.
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then so slow leaks can't accumulate.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', None)
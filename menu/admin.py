@@ -1,16 +1,109 @@
-from django.contrib import admin
-from django.utils.html import format_html
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
 from django.utils import timezone
-from menu.models import Category, Food, FoodImage, Topping, FoodTopping
-from menu.utils.availability import is_food_available
-from menu.utils.pricing import calculate_final_price
+from django.utils.html import format_html
+from menu.models import Category, Food, FoodImage, Topping, FoodTopping, Job
+from menu.utils.availability import is_within_window
+from menu.utils.pagination import EstimatedCountPaginator, uses_estimated_count
+from menu.enums import AvailabilityStatus, JobStatus
+from menu.forms import BulkAvailabilityForm, BulkDiscountForm, BulkPriceForm
+from menu.templatetags.menu_tags import format_discount
+from menu.utils.images import image_url
+from menu.transfer import CSV, JSONL, iter_menu_records, write_records
+
+EXPORT_CONTENT_TYPES = {CSV: 'text/csv', JSONL: 'application/x-ndjson'}
+
+
+def export_menu_response(foods, fmt):
+    """
+    Stream the given foods, with their categories and toppings, as an
+    ``import_menu`` file.
+    """
+    response = StreamingHttpResponse(
+        write_records(iter_menu_records(foods), fmt),
+        content_type=f'{EXPORT_CONTENT_TYPES[fmt]}; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="menu.{fmt}"'
+    return response
+
+class EstimatedCountAdminMixin:
+    """
+    Paginate large tables with the row estimate from the database
+    statistics, and skip the second ``COUNT(*)`` behind "N total" for them.
+    """
+    paginator = EstimatedCountPaginator
+    
+    @property
+    def show_full_result_count(self):
+        return not uses_estimated_count(self.model)
+
+def availability_status_display(obj):
+    """
+    Live availability from the stored ``availability_status`` bucket; only
+    time-restricted rows need their window checked against the clock.
+    """
+    if obj.availability_status == AvailabilityStatus.TIME_RESTRICTED.value:
+        available = is_within_window(obj.available_from, obj.available_to, timezone.now().time())
+    else:
+        available = obj.availability_status == AvailabilityStatus.AVAILABLE.value
+    if available:
+        return format_html('<span style="color: #27ae60; font-weight: bold;">Available</span>')
+    return format_html('<span style="color: #e74c3c; font-weight: bold;">Unavailable</span>')
+
+class BulkPricingActionsMixin:
+    """
+    Admin actions that change the discount, price or availability of every
+    selected row with one ``UPDATE`` after asking for the values on an
+    intermediate page.
+    """
+    bulk_actions = ['bulk_discount', 'bulk_adjust_price', 'bulk_set_availability']
+    
+    def bulk_change(self, request, queryset, form_class, title):
+        action = request.POST['action']
+        if 'apply' in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                try:
+                    updated = form.apply(queryset)
+                except ValueError as exc:
+                    self.message_user(request, str(exc), messages.ERROR)
+                    return None
+                self.message_user(request, f'{updated} {self.model._meta.verbose_name_plural} updated.')
+                return None
+        else:
+            form = form_class()
+        return TemplateResponse(request, 'admin/menu/bulk_action.html', {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'action': action,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    
+    @admin.action(description='Set discount on selected %(verbose_name_plural)s', permissions=['change'])
+    def bulk_discount(self, request, queryset):
+        return self.bulk_change(request, queryset, BulkDiscountForm, 'Set discount')
+    
+    @admin.action(description='Adjust price of selected %(verbose_name_plural)s', permissions=['change'])
+    def bulk_adjust_price(self, request, queryset):
+        return self.bulk_change(request, queryset, BulkPriceForm, 'Adjust price')
+    
+    @admin.action(description='Set availability of selected %(verbose_name_plural)s', permissions=['change'])
+    def bulk_set_availability(self, request, queryset):
+        return self.bulk_change(request, queryset, BulkAvailabilityForm, 'Set availability')
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'display_icon', 'foods_count', 'created_at']
     list_filter = ['created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at', 'updated_at', 'display_icon']
+    actions = ['export_csv', 'export_jsonl']
     
     fieldsets = (
         ('Basic Information', {
@@ -24,13 +117,25 @@ class CategoryAdmin(admin.ModelAdmin):
     
     def display_icon(self, obj):
         if obj.icon:
-            return format_html('<img src="{}" width="50" height="50" style="border-radius: 50%; object-fit: cover;" />', obj.icon.url)
+            return format_html('<img src="{}" width="50" height="50" style="border-radius: 50%; object-fit: cover;" />', image_url(obj, 'icon', 'thumb'))
         return '-'
     display_icon.short_description = 'Icon'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_foods_count()
+    
     def foods_count(self, obj):
-        return obj.foods.count()
+        return obj.foods_count
     foods_count.short_description = 'Foods Count'
+    foods_count.admin_order_field = 'available_foods_count'
+    
+    @admin.action(description='Export foods of selected categories as CSV')
+    def export_csv(self, request, queryset):
+        return export_menu_response(Food.objects.filter(category__in=queryset), CSV)
+    
+    @admin.action(description='Export foods of selected categories as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        return export_menu_response(Food.objects.filter(category__in=queryset), JSONL)
 
 class FoodImageInline(admin.TabularInline):
     model = FoodImage
@@ -40,7 +145,7 @@ class FoodImageInline(admin.TabularInline):
     
     def display_image(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="100" height="100" style="object-fit: cover; border-radius: 4px;" />', obj.image.url)
+            return format_html('<img src="{}" width="100" height="100" style="object-fit: cover; border-radius: 4px;" />', image_url(obj, 'image', 'thumb'))
         return '-'
     display_image.short_description = 'Preview'
 
@@ -50,20 +155,22 @@ class FoodToppingInline(admin.TabularInline):
     autocomplete_fields = ['topping']
 
 @admin.register(Food)
-class FoodAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'display_header_image', 'price_display', 'discount_display', 'availability_status', 'created_at']
-    list_filter = ['category', 'is_available', 'discount', 'created_at']
+class FoodAdmin(EstimatedCountAdminMixin, BulkPricingActionsMixin, admin.ModelAdmin):
+    list_display = ['name', 'category', 'display_header_image', 'price_display', 'discount_display', 'final_price', 'availability_status', 'created_at']
+    list_filter = ['category', 'is_available', 'availability_status', 'discount_type', 'discount', 'created_at']
+    list_select_related = ['category']
     search_fields = ['name', 'description', 'category__name']
     readonly_fields = ['created_at', 'updated_at', 'display_header_image', 'final_price_display']
     autocomplete_fields = ['category']
     inlines = [FoodImageInline, FoodToppingInline]
+    actions = [*BulkPricingActionsMixin.bulk_actions, 'export_csv', 'export_jsonl']
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('category', 'name', 'description', 'header_image', 'display_header_image')
         }),
         ('Pricing', {
-            'fields': ('price', 'discount', 'final_price_display')
+            'fields': ('price', 'discount', 'discount_type', 'final_price_display')
         }),
         ('Availability', {
             'fields': ('is_available', 'available_from', 'available_to')
@@ -76,31 +183,39 @@ class FoodAdmin(admin.ModelAdmin):
     
     def display_header_image(self, obj):
         if obj.header_image:
-            return format_html('<img src="{}" width="150" height="150" style="object-fit: cover; border-radius: 8px;" />', obj.header_image.url)
+            return format_html('<img src="{}" width="150" height="150" style="object-fit: cover; border-radius: 8px;" />', image_url(obj, 'header_image', 'thumb'))
         return '-'
     display_header_image.short_description = 'Header Image'
     
+    @admin.action(description='Export selected foods as CSV')
+    def export_csv(self, request, queryset):
+        return export_menu_response(queryset, CSV)
+    
+    @admin.action(description='Export selected foods as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        return export_menu_response(queryset, JSONL)
+    
     def price_display(self, obj):
         return f'€{obj.price}'
     price_display.short_description = 'Price'
+    price_display.admin_order_field = 'price'
     
     def discount_display(self, obj):
         if obj.discount and obj.discount > 0:
-            return format_html('<span style="color: #e74c3c; font-weight: bold;">{}%</span>', obj.discount)
+            return format_html('<span style="color: #e74c3c; font-weight: bold;">{}</span>', format_discount(obj.discount, obj.discount_type))
         return '-'
     discount_display.short_description = 'Discount'
+    discount_display.admin_order_field = 'discount'
     
     def availability_status(self, obj):
-        is_avail = is_food_available(obj)
-        if is_avail:
-            return format_html('<span style="color: #27ae60; font-weight: bold;">Available</span>')
-        return format_html('<span style="color: #e74c3c; font-weight: bold;">Unavailable</span>')
+        return availability_status_display(obj)
     availability_status.short_description = 'Status'
+    availability_status.admin_order_field = 'availability_status'
     
     def final_price_display(self, obj):
         if obj.price is None:
             return '-'
-        final_price = calculate_final_price(obj.price, obj.discount)
+        final_price = obj.final_price
         if obj.discount and obj.discount > 0:
             return format_html(
                 '<span style="text-decoration: line-through; color: #95a5a6;">€{}</span> <span style="color: #e74c3c; font-weight: bold; font-size: 1.2em;">€{}</span>',
@@ -110,18 +225,19 @@ class FoodAdmin(admin.ModelAdmin):
     final_price_display.short_description = 'Final Price'
 
 @admin.register(Topping)
-class ToppingAdmin(admin.ModelAdmin):
-    list_display = ['name', 'price_display', 'discount_display', 'availability_status', 'created_at']
-    list_filter = ['is_available', 'discount', 'created_at']
+class ToppingAdmin(EstimatedCountAdminMixin, BulkPricingActionsMixin, admin.ModelAdmin):
+    list_display = ['name', 'price_display', 'discount_display', 'final_price', 'availability_status', 'created_at']
+    list_filter = ['is_available', 'availability_status', 'discount_type', 'discount', 'created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at', 'updated_at', 'final_price_display']
+    actions = BulkPricingActionsMixin.bulk_actions
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'description')
         }),
         ('Pricing', {
-            'fields': ('price', 'discount', 'final_price_display')
+            'fields': ('price', 'discount', 'discount_type', 'final_price_display')
         }),
         ('Availability', {
             'fields': ('is_available', 'available_from', 'available_to')
@@ -135,32 +251,24 @@ class ToppingAdmin(admin.ModelAdmin):
     def price_display(self, obj):
         return f'€{obj.price}'
     price_display.short_description = 'Price'
+    price_display.admin_order_field = 'price'
     
     def discount_display(self, obj):
         if obj.discount and obj.discount > 0:
-            return format_html('<span style="color: #e74c3c; font-weight: bold;">{}%</span>', obj.discount)
+            return format_html('<span style="color: #e74c3c; font-weight: bold;">{}</span>', format_discount(obj.discount, obj.discount_type))
         return '-'
     discount_display.short_description = 'Discount'
+    discount_display.admin_order_field = 'discount'
     
     def availability_status(self, obj):
-        now = timezone.now().time()
-        if not obj.is_available:
-            return format_html('<span style="color: #e74c3c; font-weight: bold;">Unavailable</span>')
-        if obj.available_from and obj.available_to:
-            if obj.available_from <= obj.available_to:
-                is_avail = obj.available_from <= now <= obj.available_to
-            else:
-                is_avail = now >= obj.available_from or now <= obj.available_to
-            if is_avail:
-                return format_html('<span style="color: #27ae60; font-weight: bold;">Available</span>')
-            return format_html('<span style="color: #e74c3c; font-weight: bold;">Unavailable</span>')
-        return format_html('<span style="color: #27ae60; font-weight: bold;">Available</span>')
+        return availability_status_display(obj)
     availability_status.short_description = 'Status'
+    availability_status.admin_order_field = 'availability_status'
     
     def final_price_display(self, obj):
         if obj.price is None:
             return '-'
-        final_price = calculate_final_price(obj.price, obj.discount)
+        final_price = obj.final_price
         if obj.discount and obj.discount > 0:
             return format_html(
                 '<span style="text-decoration: line-through; color: #95a5a6;">€{}</span> <span style="color: #e74c3c; font-weight: bold; font-size: 1.2em;">€{}</span>',
@@ -170,9 +278,35 @@ class ToppingAdmin(admin.ModelAdmin):
     final_price_display.short_description = 'Final Price'
 
 @admin.register(FoodTopping)
-class FoodToppingAdmin(admin.ModelAdmin):
+class FoodToppingAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ['food', 'topping', 'created_at']
+    list_select_related = ['food', 'topping']
     list_filter = ['created_at', 'food__category']
     search_fields = ['food__name', 'topping__name']
     autocomplete_fields = ['food', 'topping']
     readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(Job)
+class JobAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    list_display = ['name', 'key', 'status', 'attempts', 'run_after', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'key']
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Retry selected failed jobs')
+    def retry_jobs(self, request, queryset):
+        retried = 0
+        for job in queryset.filter(status=JobStatus.FAILED.value):
+            try:
+                with transaction.atomic():
+                    retried += Job.objects.filter(pk=job.pk).update(
+                        status=JobStatus.PENDING.value, attempts=0, run_after=timezone.now(),
+                    )
+            except IntegrityError:
+                # An identical job is already pending.
+                continue
+        self.message_user(request, f'{retried} jobs queued again.')
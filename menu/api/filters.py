@@ -0,0 +1,41 @@
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework import filters
+
+from menu.search import get_search_backend, search_limit, tokenize
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the full-text index, with prefix matching on every
+    term for type-ahead. Results carry a ``search_rank`` annotation that
+    ``RankedOrderingFilter`` uses when no explicit ordering is requested.
+    Databases without a full-text backend keep the ``icontains`` search.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '')
+        if not tokenize(terms):
+            return queryset
+
+        backend = get_search_backend(queryset.db)
+        if not backend.supported:
+            return super().filter_queryset(request, queryset, view)
+
+        # The view's category, price and availability filters go into the
+        # search query, so MENU_SEARCH_LIMIT counts only foods it can show.
+        food_ids = backend.search(terms, limit=search_limit(), within=queryset)
+        if not food_ids:
+            return queryset.none()
+        return queryset.filter(pk__in=food_ids).annotate(
+            search_rank=Case(
+                *[When(pk=food_id, then=Value(rank)) for rank, food_id in enumerate(food_ids)],
+                output_field=IntegerField(),
+            )
+        )
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['search_rank', *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,135 @@
+from django.core.handlers.asgi import ASGIRequest
+
+from menu.utils.encoding import dumps, isoformat
+from menu.utils.images import is_stale, srcsets, variants_field
+
+
+def _string(value):
+    return 'null' if value is None else dumps(value)
+
+
+def _decimal(value):
+    return 'null' if value is None else dumps(f'{value:.2f}')
+
+
+def _number(value):
+    return 'null' if value is None else repr(float(value))
+
+
+def _bool(value):
+    return 'true' if value else 'false'
+
+
+def _time(value):
+    return _string(isoformat(value))
+
+
+def _file(request, value):
+    if not value:
+        return 'null'
+    return dumps(request.build_absolute_uri(value.url))
+
+
+def _srcset(request, obj, field_name):
+    if not getattr(obj, field_name) or is_stale(obj, field_name):
+        return '{}'
+    return dumps(srcsets(getattr(obj, variants_field(field_name)), request.build_absolute_uri))
+
+
+def encode_topping(topping):
+    return (
+        '{"id":%d,"name":%s,"description":%s,"price":%s,"final_price":%s,'
+        '"is_available":%s,"availability_status":%s,"discount":%s,"discount_type":%s,'
+        '"available_from":%s,"available_to":%s}' % (
+            topping.id,
+            _string(topping.name),
+            _string(topping.description),
+            _decimal(topping.price),
+            _number(topping.final_price),
+            _bool(topping.is_available),
+            _string(topping.availability_status),
+            _number(topping.discount),
+            _string(topping.discount_type),
+            _time(topping.available_from),
+            _time(topping.available_to),
+        )
+    )
+
+
+def encode_food(request, food, toppings):
+    images = ','.join(
+        '{"id":%d,"image":%s,"srcset":%s}' % (
+            image.id, _file(request, image.image), _srcset(request, image, 'image'),
+        )
+        for image in food.images.all()
+    )
+    return (
+        '{"id":%d,"name":%s,"description":%s,"price":%s,"final_price":%s,'
+        '"header_image":%s,"header_image_srcset":%s,"is_available":%s,"availability_status":%s,'
+        '"discount":%s,"discount_type":%s,"available_from":%s,"available_to":%s,"images":[%s],"toppings":[%s]}' % (
+            food.id,
+            _string(food.name),
+            _string(food.description),
+            _decimal(food.price),
+            _number(food.final_price),
+            _file(request, food.header_image),
+            _srcset(request, food, 'header_image'),
+            _bool(food.is_available),
+            _string(food.availability_status),
+            _number(food.discount),
+            _string(food.discount_type),
+            _time(food.available_from),
+            _time(food.available_to),
+            images,
+            ','.join(encode_topping(topping) for topping in toppings),
+        )
+    )
+
+
+def iter_menu_json(request, snapshot, available_only=True):
+    """
+    Yield the whole category -> food -> topping/image tree as JSON chunks,
+    one category at a time, straight from the menu snapshot.
+    """
+    available_foods = snapshot.timeline.available_food_ids()
+    yield '{"categories":['
+    first = True
+    for category in snapshot.categories:
+        foods = category.foods.all()
+        if available_only:
+            foods = [food for food in foods if food.id in available_foods]
+            if not foods:
+                continue
+        yield '%s{"id":%d,"name":%s,"description":%s,"icon":%s,"icon_srcset":%s,"foods":[' % (
+            '' if first else ',',
+            category.id,
+            _string(category.name),
+            _string(category.description),
+            _file(request, category.icon),
+            _srcset(request, category, 'icon'),
+        )
+        first = False
+        for index, food in enumerate(foods):
+            toppings = [food_topping.topping for food_topping in food.food_toppings.all()]
+            if available_only:
+                toppings = [topping for topping in toppings if topping.is_available]
+            yield (',' if index else '') + encode_food(request, food, toppings)
+        yield ']}'
+    yield ']}'
+
+
+async def _aiterate(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def streaming_chunks(request, chunks):
+    """
+    Hand ``chunks`` to ``StreamingHttpResponse`` in the form the server
+    consumes without buffering: an async iterator under ASGI, the plain
+    iterator under WSGI. Either way Django would otherwise collect the whole
+    body in memory first.
+    """
+    if isinstance(request, ASGIRequest):
+        return _aiterate(chunks)
+    return chunks
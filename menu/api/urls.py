@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from menu.api.viewsets import CategoryViewSet, FoodViewSet, ToppingViewSet
+from menu.api import views
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
@@ -8,5 +9,9 @@ router.register(r'foods', FoodViewSet, basename='food')
 router.register(r'toppings', ToppingViewSet, basename='topping')
 
 urlpatterns = [
+    path('menu/', views.menu_stream, name='menu-stream'),
+    path('menu/events/', views.menu_events, name='menu-events'),
+    path('menu/changes/', views.menu_changes, name='menu-changes'),
+    path('menu/cache-stats/', views.cache_stats, name='menu-cache-stats'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,104 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from menu.api.streaming import iter_menu_json, streaming_chunks
+from menu.events import aiter_menu_events, iter_menu_events
+from menu.serializers import (
+    SyncCategorySerializer,
+    SyncFoodImageSerializer,
+    SyncFoodSerializer,
+    SyncFoodToppingSerializer,
+    SyncToppingSerializer,
+)
+from menu.utils.conditional import amenu_condition
+from menu.utils.response_cache import api_cache_stats
+from menu.utils.sync import SyncTokenExpired, decode_sync_token, menu_changes as get_menu_changes
+
+SYNC_SERIALIZERS = {
+    'categories': SyncCategorySerializer,
+    'foods': SyncFoodSerializer,
+    'toppings': SyncToppingSerializer,
+    'food_images': SyncFoodImageSerializer,
+    'food_toppings': SyncFoodToppingSerializer,
+}
+
+
+@require_GET
+@amenu_condition
+async def menu_stream(request):
+    available_only = request.GET.get('available_only', 'true').lower() == 'true'
+    return StreamingHttpResponse(
+        streaming_chunks(request, iter_menu_json(request, request.menu_snapshot, available_only)),
+        content_type='application/json',
+    )
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@require_GET
+def menu_events(request):
+    """
+    Push menu changes as Server-Sent Events. Under ASGI the connection stays
+    open; under WSGI each request delivers what is pending and closes.
+    """
+    last_event_id = _last_event_id(request)
+    if isinstance(request, ASGIRequest):
+        messages = aiter_menu_events(last_event_id)
+    else:
+        messages = iter_menu_events(last_event_id)
+    response = StreamingHttpResponse(messages, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class FullSyncRequired(APIException):
+    status_code = 410
+    default_detail = "Sync token is too old. Sync again without since to get the whole menu."
+    default_code = 'full_sync_required'
+
+
+@api_view(['GET'])
+def menu_changes(request):
+    """
+    Everything changed or deleted since the ``since`` token of the previous
+    sync, including unavailable items. Without a token the whole menu is
+    returned with ``full: true``. Pass the returned ``token`` next time.
+    Tokens older than ``MENU_SYNC_RETENTION`` get a 410.
+    """
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = decode_sync_token(since)
+        except ValueError as exc:
+            raise ValidationError({'since': [str(exc)]})
+    try:
+        token, changed, deleted = get_menu_changes(since or None)
+    except SyncTokenExpired:
+        raise FullSyncRequired
+    data = {'token': token, 'full': not since}
+    for key, queryset in changed.items():
+        data[key] = SYNC_SERIALIZERS[key](queryset, many=True, context={'request': request}).data
+    data['deleted'] = deleted
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    API response cache hits and misses per endpoint, for this worker or,
+    with a shared cache backend, for all of them.
+    """
+    return Response(api_cache_stats())
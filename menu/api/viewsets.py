@@ -1,55 +1,181 @@
+from decimal import Decimal, InvalidOperation
 from rest_framework import viewsets, filters
+from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.utils import timezone
-from django.db.models import Q
+from django.http import Http404
+from django.utils.decorators import method_decorator
 from menu.models import Category, Food, Topping
+from menu.api.filters import FullTextSearchFilter, RankedOrderingFilter
+from menu.api.pagination import MenuPagination
+from menu.managers.food import MENU_RELATIONS
+from menu.mixins.serializers import selected_fields
+from menu.utils.conditional import menu_condition
+from menu.utils.snapshot import get_menu_snapshot
 from menu.serializers import (
     CategorySerializer,
     FoodSerializer,
     FoodDetailSerializer,
     ToppingSerializer,
+    BulkAvailabilitySerializer,
+    BulkDiscountSerializer,
+    BulkPriceSerializer,
 )
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve with ETag/Last-Modified from the menu version,
+    returning 304 before any queryset or serializer is touched.
+    """
+    
+    @method_decorator(menu_condition)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @method_decorator(menu_condition)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+class SnapshotRetrieveMixin:
+    """
+    Serve ``retrieve`` from the in-memory menu snapshot instead of the ORM.
+    """
+    snapshot_getter = None
+    
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = int(self.kwargs[lookup_url_kwarg])
+        except (TypeError, ValueError):
+            raise Http404
+        
+        obj = getattr(get_menu_snapshot(), self.snapshot_getter)(pk)
+        if obj is None or not self.is_visible(obj):
+            raise Http404
+        
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def is_visible(self, obj):
+        return True
+
+class AvailableOnlyMixin:
+    """
+    Honour the ``available_only`` query param using the snapshot's
+    availability timeline.
+    """
+    timeline_lookup = None
+    
+    def available_only(self):
+        return self.request.query_params.get('available_only', 'true').lower() == 'true'
+    
+    def available_ids(self):
+        return getattr(get_menu_snapshot().timeline, self.timeline_lookup)()
+    
+    def filter_by_availability(self, queryset):
+        return queryset.filter(pk__in=self.available_ids())
+    
+    def is_visible(self, obj):
+        if self.available_only():
+            return obj.pk in self.available_ids()
+        return True
+
+class SparseFieldsetViewMixin:
+    """
+    Build querysets for the fields picked with ``?fields=`` and ``?expand=``,
+    leaving out the annotations and prefetches of everything else.
+    """
+    
+    def is_selected(self, name):
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = selected_fields(self.get_serializer_class(), self.request)
+        return self._selected_fields is None or name in self._selected_fields
+
+class BulkChangeMixin:
+    """
+    Staff-only endpoints that change the discount, price or availability of
+    many rows with one ``UPDATE``, like the matching admin actions.
+    """
+    
+    def bulk_change(self, request, serializer_class):
+        serializer = serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.queryset.model.objects.filter(pk__in=serializer.validated_data['ids'])
+        try:
+            updated = serializer.apply(queryset)
+        except ValueError as exc:
+            raise ValidationError({'non_field_errors': [str(exc)]})
+        return Response({'updated': updated})
+    
+    @action(detail=False, methods=['post'], url_path='bulk-discount', permission_classes=[IsAdminUser])
+    def bulk_discount(self, request):
+        return self.bulk_change(request, BulkDiscountSerializer)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-price', permission_classes=[IsAdminUser])
+    def bulk_price(self, request):
+        return self.bulk_change(request, BulkPriceSerializer)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-availability', permission_classes=[IsAdminUser])
+    def bulk_availability(self, request):
+        return self.bulk_change(request, BulkAvailabilitySerializer)
+
+class CategoryViewSet(ConditionalGetMixin, SnapshotRetrieveMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = MenuPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    snapshot_getter = 'get_category'
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_selected('foods_count'):
+            queryset = queryset.with_foods_count()
+        return queryset
 
-class FoodViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Food.objects.select_related('category').prefetch_related('images', 'food_toppings__topping')
+class FoodViewSet(BulkChangeMixin, ConditionalGetMixin, SnapshotRetrieveMixin, AvailableOnlyMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Food.objects.all()
     serializer_class = FoodSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = MenuPagination
+    filter_backends = [FullTextSearchFilter, RankedOrderingFilter]
     search_fields = ['name', 'description', 'category__name']
-    ordering_fields = ['name', 'price', 'created_at']
+    ordering_fields = ['name', 'price', 'final_price', 'created_at']
     ordering = ['name']
+    snapshot_getter = 'get_food'
+    timeline_lookup = 'available_food_ids'
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().with_menu_relations(
+            [relation for relation in MENU_RELATIONS if self.is_selected(relation)]
+        )
         category = self.request.query_params.get('category', None)
-        available_only = self.request.query_params.get('available_only', 'true')
         
         if category:
             queryset = queryset.filter(category_id=category)
         
-        if available_only.lower() == 'true':
-            queryset = self._filter_by_availability(queryset)
+        queryset = self.filter_by_final_price(queryset)
+        
+        if self.available_only():
+            queryset = self.filter_by_availability(queryset)
         
         return queryset
     
-    def _filter_by_availability(self, queryset):
-        now = timezone.now().time()
-        return queryset.filter(
-            is_available=True
-        ).filter(
-            Q(available_from__isnull=True, available_to__isnull=True) |
-            Q(available_from__lte=now, available_to__gte=now) |
-            Q(available_from__lte=now, available_to__isnull=True) |
-            Q(available_from__isnull=True, available_to__gte=now)
-        )
+    def filter_by_final_price(self, queryset):
+        for param, lookup in (('min_price', 'final_price__gte'), ('max_price', 'final_price__lte')):
+            value = self.request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                value = Decimal(value)
+            except InvalidOperation:
+                value = None
+            if value is None or not value.is_finite():
+                raise ValidationError({param: 'A valid number is required.'})
+            queryset = queryset.filter(**{lookup: value})
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -57,6 +183,7 @@ class FoodViewSet(viewsets.ReadOnlyModelViewSet):
         return FoodSerializer
     
     @action(detail=False, methods=['get'])
+    @method_decorator(menu_condition)
     def by_category(self, request):
         category_id = request.query_params.get('category_id')
         if not category_id:
@@ -66,27 +193,21 @@ class FoodViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-class ToppingViewSet(viewsets.ReadOnlyModelViewSet):
+class ToppingViewSet(BulkChangeMixin, ConditionalGetMixin, SnapshotRetrieveMixin, AvailableOnlyMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Topping.objects.all()
     serializer_class = ToppingSerializer
+    pagination_class = MenuPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'price', 'created_at']
+    ordering_fields = ['name', 'price', 'final_price', 'created_at']
     ordering = ['name']
+    snapshot_getter = 'get_topping'
+    timeline_lookup = 'available_topping_ids'
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        available_only = self.request.query_params.get('available_only', 'true')
         
-        if available_only.lower() == 'true':
-            now = timezone.now().time()
-            queryset = queryset.filter(
-                is_available=True
-            ).filter(
-                Q(available_from__isnull=True, available_to__isnull=True) |
-                Q(available_from__lte=now, available_to__gte=now) |
-                Q(available_from__lte=now, available_to__isnull=True) |
-                Q(available_from__isnull=True, available_to__gte=now)
-            )
+        if self.available_only():
+            queryset = self.filter_by_availability(queryset)
         
         return queryset
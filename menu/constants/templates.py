@@ -1,2 +1,4 @@
 MENU_TEMPLATE = 'menu/menu_list.html'
-FOOD_DETAIL_TEMPLATE = 'menu/food_detail.html'
\ No newline at end of file
+FOOD_DETAIL_TEMPLATE = 'menu/food_detail.html'
+FOOD_CARD_TEMPLATE = 'menu/partials/food_card.html'
+CATEGORY_SECTION_TEMPLATE = 'menu/partials/category_section.html'
\ No newline at end of file
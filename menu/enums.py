@@ -11,3 +11,14 @@ class DiscountType(Enum):
     PERCENTAGE = "percentage"
     FIXED = "fixed"
 
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+class MenuEventAction(Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
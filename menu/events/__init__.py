@@ -0,0 +1,13 @@
+from menu.events.log import event_fields, event_item, event_row, record_menu_event
+from menu.events.stream import MenuEventStream, aiter_menu_events, iter_menu_events, sse_message
+
+__all__ = [
+    'MenuEventStream',
+    'aiter_menu_events',
+    'event_fields',
+    'event_item',
+    'event_row',
+    'iter_menu_events',
+    'record_menu_event',
+    'sse_message',
+]
@@ -0,0 +1,59 @@
+from datetime import time
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS
+
+from menu.enums import MenuEventAction
+
+# Fields pushed for food topping links; foods and toppings push their
+# ``tracked_fields``.
+FOOD_TOPPING_FIELDS = ('food_id', 'topping_id')
+
+
+def event_fields(model):
+    if model._meta.model_name == 'foodtopping':
+        return FOOD_TOPPING_FIELDS
+    return model.tracked_fields
+
+
+def _event_value(field, value):
+    # Encoded like the API: prices as strings, final prices as numbers.
+    if field == 'final_price' and value is not None:
+        return float(value)
+    if isinstance(value, Decimal):
+        return f'{value:.2f}'
+    if isinstance(value, time):
+        return value.isoformat()
+    return value
+
+
+def event_item(obj, fields=None):
+    """
+    The id plus ``fields`` (all event fields by default) of ``obj``.
+    """
+    if fields is None:
+        fields = event_fields(type(obj))
+    return {'id': obj.pk, **{field: _event_value(field, getattr(obj, field)) for field in fields}}
+
+
+def event_row(row):
+    """
+    ``event_item`` for a ``values()`` row.
+    """
+    return {field: _event_value(field, value) for field, value in row.items()}
+
+
+def record_menu_event(model, action, items, using=DEFAULT_DB_ALIAS):
+    """
+    Append an event to the log in the current transaction, so it becomes
+    visible exactly when the change it describes is committed.
+    """
+    from menu.models import MenuEvent
+
+    if not items:
+        return None
+    return MenuEvent.objects.using(using).create(
+        model_name=model._meta.model_name,
+        action=MenuEventAction(action).value,
+        items=items,
+    )
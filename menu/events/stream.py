@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.db.models import Q
+
+from menu.utils.encoding import dumps
+from menu.utils.snapshot import aget_menu_snapshot, get_menu_snapshot
+
+
+def sse_message(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class MenuEventStream:
+    """
+    State of one Server-Sent Events connection: the last event id sent,
+    the ids skipped over that may still commit, and the available foods and
+    toppings last reported.
+
+    Ids are handed out when a row is inserted, not when it is committed,
+    so a lower id can appear after a higher one. Skipped ids are asked for
+    again until ``MENU_EVENTS_GAP_TIMEOUT`` seconds have passed. Only the
+    ``MENU_EVENTS_MAX_GAPS`` ids below the newest event are tracked, so a
+    jump in ids can't make a connection hold and query millions of them.
+    """
+    batch_size = 500
+
+    def __init__(self, last_event_id=None):
+        self.cursor = last_event_id
+        self.gaps = {}
+        self.available = None
+        self.last_sent = time.monotonic()
+
+    def start(self, latest_id, oldest_id):
+        """
+        Messages opening the stream. New clients start from the latest event;
+        resuming clients whose last event was pruned are told to reload.
+        """
+        messages = [f"retry: {int(settings.MENU_EVENTS_RETRY * 1000)}\n\n"]
+        if self.cursor is None or self.cursor > latest_id:
+            self.cursor = latest_id
+        elif oldest_id is not None and self.cursor < oldest_id - 1:
+            messages.append(sse_message({}, event='reset'))
+            self.cursor = latest_id
+        # A bare id sets where the client resumes without firing an event.
+        messages.append(f'id: {self.cursor}\n\n')
+        return messages
+
+    def query(self, events):
+        condition = Q(pk__gt=self.cursor)
+        if self.gaps:
+            condition |= Q(pk__in=list(self.gaps))
+        return events.filter(condition).order_by('pk')[:self.batch_size]
+
+    def event_messages(self, events, now=None):
+        if now is None:
+            now = time.monotonic()
+        messages = []
+        for event in events:
+            self.gaps.pop(event.pk, None)
+            if event.pk > self.cursor:
+                self.track_gaps(event.pk, now + settings.MENU_EVENTS_GAP_TIMEOUT)
+                self.cursor = event.pk
+            messages.append(sse_message(
+                {'items': event.items},
+                event=f'{event.model_name}.{event.action}',
+                event_id=event.pk,
+            ))
+        self.gaps = {pk: deadline for pk, deadline in self.gaps.items() if deadline > now}
+        if events and events[-1].pk != self.cursor:
+            # A late event filled a gap; resume after the newest one.
+            messages.append(f'id: {self.cursor}\n\n')
+        return messages
+
+    def track_gaps(self, event_id, deadline):
+        limit = settings.MENU_EVENTS_MAX_GAPS
+        self.gaps.update(dict.fromkeys(range(max(self.cursor + 1, event_id - limit), event_id), deadline))
+        if len(self.gaps) > limit:
+            for gap in sorted(self.gaps)[:len(self.gaps) - limit]:
+                del self.gaps[gap]
+
+    def availability_messages(self, snapshot):
+        """
+        What became available or unavailable since the last check, whether
+        through an edit or an ``available_from``/``available_to`` boundary.
+        The first check reports the full sets.
+        """
+        available = (snapshot.timeline.available_food_ids(), snapshot.timeline.available_topping_ids())
+        previous, self.available = self.available, available
+        if previous is None:
+            return [sse_message({
+                'full': True,
+                'foods': {'available': sorted(available[0])},
+                'toppings': {'available': sorted(available[1])},
+            }, event='availability')]
+        if previous == available:
+            return []
+        return [sse_message({
+            key: {'available': sorted(now - before), 'unavailable': sorted(before - now)}
+            for key, before, now in zip(('foods', 'toppings'), previous, available)
+        }, event='availability')]
+
+    def heartbeat(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_sent >= settings.MENU_EVENTS_HEARTBEAT:
+            return [': ping\n\n']
+        return []
+
+    def sent(self, messages):
+        if messages:
+            self.last_sent = time.monotonic()
+        return messages
+
+
+def _bounds(events):
+    latest = events.order_by('-pk').values_list('pk', flat=True).first()
+    oldest = events.order_by('pk').values_list('pk', flat=True).first()
+    return latest or 0, oldest
+
+
+async def _abounds(events):
+    latest = await events.order_by('-pk').values_list('pk', flat=True).afirst()
+    oldest = await events.order_by('pk').values_list('pk', flat=True).afirst()
+    return latest or 0, oldest
+
+
+async def aiter_menu_events(last_event_id=None):
+    """
+    Stream menu changes as SSE messages for ``MENU_EVENTS_MAX_DURATION``
+    seconds, polling the event log every ``MENU_EVENTS_POLL_INTERVAL``
+    seconds. Clients reconnect on their own and resume from their last id.
+    """
+    from menu.models import MenuEvent
+
+    stream = MenuEventStream(last_event_id)
+    deadline = time.monotonic() + settings.MENU_EVENTS_MAX_DURATION
+    for message in stream.start(*await _abounds(MenuEvent.objects)):
+        yield message
+    while True:
+        events = [event async for event in stream.query(MenuEvent.objects)]
+        messages = stream.event_messages(events)
+        messages += stream.availability_messages(await aget_menu_snapshot())
+        for message in stream.sent(messages or stream.heartbeat()):
+            yield message
+        if time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(settings.MENU_EVENTS_POLL_INTERVAL)
+
+
+def iter_menu_events(last_event_id=None):
+    """
+    A single poll for synchronous servers, which must not hold a worker
+    for the whole stream: everything pending is sent, then the connection
+    closes and the client reconnects after the ``retry`` delay.
+    """
+    from menu.models import MenuEvent
+
+    stream = MenuEventStream(last_event_id)
+    yield from stream.start(*_bounds(MenuEvent.objects))
+    yield from stream.event_messages(list(stream.query(MenuEvent.objects)))
+    yield from stream.availability_messages(get_menu_snapshot())
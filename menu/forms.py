@@ -0,0 +1,31 @@
+from django import forms
+
+from menu.enums import DiscountType
+from menu.managers.ordering import FIXED, PERCENT
+
+
+class BulkDiscountForm(forms.Form):
+    discount = forms.DecimalField(min_value=0, decimal_places=2)
+    discount_type = forms.ChoiceField(
+        choices=[(discount_type.value, discount_type.name.title()) for discount_type in DiscountType],
+    )
+
+    def apply(self, queryset):
+        return queryset.apply_discount(float(self.cleaned_data['discount']), self.cleaned_data['discount_type'])
+
+
+class BulkPriceForm(forms.Form):
+    amount = forms.DecimalField(decimal_places=2, help_text='Negative values lower the prices')
+    adjustment = forms.ChoiceField(choices=[(PERCENT, 'Percent'), (FIXED, 'Fixed amount')])
+
+    def apply(self, queryset):
+        return queryset.adjust_price(self.cleaned_data['amount'], self.cleaned_data['adjustment'])
+
+
+class BulkAvailabilityForm(forms.Form):
+    is_available = forms.BooleanField(required=False, initial=True)
+    available_from = forms.TimeField(required=False, help_text='Leave both times empty for all day')
+    available_to = forms.TimeField(required=False)
+
+    def apply(self, queryset):
+        return queryset.set_availability(**self.cleaned_data)
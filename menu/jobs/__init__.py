@@ -0,0 +1,3 @@
+from menu.jobs.queue import enqueue, job, run_pending_jobs
+
+__all__ = ['enqueue', 'job', 'run_pending_jobs']
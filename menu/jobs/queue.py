@@ -0,0 +1,173 @@
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from menu.enums import JobStatus
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+# Periodic job names and the setting holding their interval in seconds.
+_periodic = {}
+
+
+def job(name, every=None):
+    """
+    Register a function as the job called ``name``. It is called with the
+    job payload as keyword arguments. ``every`` names the setting with the
+    seconds between runs of a periodic job, which workers queue on their
+    own instead of the code paths that make work for it.
+    """
+    def decorator(func):
+        _registry[name] = func
+        if every is not None:
+            _periodic[name] = every
+        return func
+    return decorator
+
+
+def get_job(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"No job registered as {name!r}")
+
+
+def job_key(name, payload):
+    return f"{name}:{json.dumps(payload, sort_keys=True, separators=(',', ':'))}"
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """
+    Queue ``name`` to run with ``payload``.
+
+    Only one pending job per key exists at a time, so enqueueing a job that
+    is already waiting is a no-op. Together with ``delay`` that turns a burst
+    of saves into a single run once the burst has settled. The key defaults
+    to the name plus the payload.
+
+    With ``MENU_JOBS_EAGER`` the job runs immediately instead.
+    """
+    payload = payload or {}
+    func = get_job(name)
+    if settings.MENU_JOBS_EAGER:
+        func(**payload)
+        return None
+
+    from menu.models import Job
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                key=key or job_key(name, payload),
+                payload=payload,
+                max_attempts=settings.MENU_JOB_MAX_ATTEMPTS,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        return None
+
+
+def enqueue_periodic_jobs(last_queued):
+    """
+    Queue every periodic job this worker has not queued within its
+    interval. ``last_queued`` maps job names to ``time.monotonic()`` values
+    and is updated in place.
+    """
+    now = time.monotonic()
+    for name, setting in _periodic.items():
+        last = last_queued.get(name)
+        if last is None or now - last >= getattr(settings, setting):
+            enqueue(name)
+            last_queued[name] = now
+
+
+def requeue_stale_jobs():
+    """
+    Put jobs back in the queue whose worker died while running them.
+    """
+    from menu.models import Job
+    cutoff = timezone.now() - timedelta(seconds=settings.MENU_JOB_TIMEOUT)
+    requeued = 0
+    for job_obj in Job.objects.filter(status=JobStatus.RUNNING.value, locked_at__lt=cutoff):
+        try:
+            with transaction.atomic():
+                requeued += Job.objects.filter(pk=job_obj.pk, status=JobStatus.RUNNING.value).update(
+                    status=JobStatus.PENDING.value, locked_at=None,
+                )
+        except IntegrityError:
+            # The same job was queued again meanwhile; that one will run.
+            Job.objects.filter(pk=job_obj.pk).delete()
+    return requeued
+
+
+def claim_jobs(limit):
+    """
+    Claim up to ``limit`` due jobs. Claiming is a conditional ``UPDATE``,
+    so several workers can poll the same table without taking the same job.
+    """
+    from menu.models import Job
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=JobStatus.PENDING.value, run_after__lte=now,
+    ).order_by('run_after', 'pk').values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        updated = Job.objects.filter(pk=pk, status=JobStatus.PENDING.value).update(
+            status=JobStatus.RUNNING.value, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'pk'))
+
+
+def run_job(job_obj):
+    """
+    Run a claimed job. Success deletes it; an error retries it with
+    exponential backoff until ``max_attempts`` is reached.
+    """
+    from menu.models import Job
+    try:
+        get_job(job_obj.name)(**job_obj.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s failed (attempt %d/%d)', job_obj, job_obj.attempts, job_obj.max_attempts)
+        if job_obj.attempts >= job_obj.max_attempts:
+            Job.objects.filter(pk=job_obj.pk).update(status=JobStatus.FAILED.value, locked_at=None, last_error=error)
+            return False
+        backoff = settings.MENU_JOB_RETRY_DELAY * 2 ** (job_obj.attempts - 1)
+        try:
+            with transaction.atomic():
+                Job.objects.filter(pk=job_obj.pk).update(
+                    status=JobStatus.PENDING.value,
+                    locked_at=None,
+                    last_error=error,
+                    run_after=timezone.now() + timedelta(seconds=backoff),
+                )
+        except IntegrityError:
+            Job.objects.filter(pk=job_obj.pk).delete()
+        return False
+    Job.objects.filter(pk=job_obj.pk).delete()
+    return True
+
+
+def run_pending_jobs(limit=100):
+    """
+    Run every job that is due, in batches of ``limit``. Returns the number
+    of jobs that ran.
+    """
+    ran = 0
+    while True:
+        jobs = claim_jobs(limit)
+        if not jobs:
+            return ran
+        for job_obj in jobs:
+            run_job(job_obj)
+            ran += 1
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from menu.jobs.queue import job
+from menu.search import get_search_backend
+from menu.utils.fragments import render_category_section
+from menu.utils.images import refresh_image_variants
+from menu.utils.snapshot import get_menu_snapshot
+
+
+@job('menu.generate_image_variants')
+def generate_image_variants(model, pk):
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is not None:
+        refresh_image_variants(instance)
+
+
+@job('menu.reindex_category')
+def reindex_category(pk, using='default'):
+    from menu.models import Food
+    foods = Food.objects.using(using).filter(category_id=pk).select_related('category')
+    get_search_backend(using).index_foods(foods)
+
+
+@job('menu.warm_menu_cache')
+def warm_menu_cache():
+    """
+    Rebuild the menu snapshot and re-render every changed card and section
+    into the fragment cache, so the first visitor after an edit doesn't.
+    """
+    for section in get_menu_snapshot().available_menu():
+        render_category_section(section)
+
+
+@job('menu.prune_menu_events', every='MENU_EVENTS_PRUNE_INTERVAL')
+def prune_menu_events():
+    """
+    Drop events older than ``MENU_EVENTS_RETENTION`` seconds. Clients that
+    come back after that are told to reload the whole menu.
+
+    The newest event is always kept: streams start new clients from its id,
+    and an empty log would start them from 0 instead.
+    """
+    from menu.models import MenuEvent
+    cutoff = timezone.now() - timedelta(seconds=settings.MENU_EVENTS_RETENTION)
+    latest = MenuEvent.objects.order_by('-pk').values_list('pk', flat=True).first()
+    MenuEvent.objects.filter(created_at__lt=cutoff).exclude(pk=latest).delete()
+
+
+@job('menu.prune_tombstones', every='MENU_SYNC_PRUNE_INTERVAL')
+def prune_tombstones():
+    """
+    Drop tombstones older than ``MENU_SYNC_RETENTION`` seconds. Sync tokens
+    from before that get a full resync instead of a delta.
+    """
+    from menu.models import Tombstone
+    cutoff = timezone.now() - timedelta(seconds=settings.MENU_SYNC_RETENTION)
+    Tombstone.objects.filter(created_at__lt=cutoff).delete()
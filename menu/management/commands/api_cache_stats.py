@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from menu.utils.response_cache import OUTCOMES, api_cache_stats, reset_api_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show API response cache hits and misses per endpoint. Needs a shared MENU_API_CACHE_BACKEND.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the counts after showing them.')
+
+    def handle(self, *args, **options):
+        stats = api_cache_stats()
+        width = max(len(endpoint) for endpoint in stats)
+        self.stdout.write(f"{'endpoint':<{width}}  " + '  '.join(f'{outcome:>9}' for outcome in OUTCOMES) + '  hit rate')
+        for endpoint, counts in stats.items():
+            total = sum(counts.values())
+            rate = f'{(counts["hit"] + counts["coalesced"]) / total:.0%}' if total else '-'
+            self.stdout.write(
+                f'{endpoint:<{width}}  ' + '  '.join(f'{counts[outcome]:>9}' for outcome in OUTCOMES) + f'  {rate:>8}'
+            )
+        if options['reset']:
+            reset_api_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counts reset.'))
@@ -0,0 +1,263 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import time as dt_time
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from menu.models import Category, Food, FoodImage, FoodTopping, Topping
+from menu.search import get_search_backend
+from menu.utils.response_cache import api_cache
+from menu.utils.snapshot import invalidate_menu_snapshot
+
+BENCHMARK_USER = 'benchmark-admin'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def seed_menu(categories, foods, toppings, images, toppings_per_food):
+    """
+    Create a synthetic menu with bulk inserts. Every fifth food and topping
+    gets a lunch window and every tenth is switched off, so availability
+    filtering has real work to do.
+    """
+    topping_objects = Topping.objects.bulk_create([
+        Topping(
+            name=f'Topping {index}',
+            description=f'Synthetic topping number {index}',
+            price=0.5 + index % 4,
+            discount=10 if index % 3 == 0 else 0,
+            is_available=index % 10 != 0,
+        )
+        for index in range(toppings)
+    ])
+    category_objects = Category.objects.bulk_create([
+        Category(name=f'Category {index}', description=f'Synthetic category number {index}')
+        for index in range(categories)
+    ])
+    food_objects = Food.objects.bulk_create([
+        Food(
+            category=category,
+            name=f'Food {category_index}-{index}',
+            description=f'Synthetic food {index} with tomato, cheese and basil',
+            price=5 + index % 20,
+            discount=15 if index % 4 == 0 else 0,
+            is_available=index % 10 != 0,
+            available_from=dt_time(11, 0) if index % 5 == 0 else None,
+            available_to=dt_time(15, 0) if index % 5 == 0 else None,
+            header_image='foods/benchmark.jpg',
+        )
+        for category_index, category in enumerate(category_objects)
+        for index in range(foods)
+    ])
+    FoodImage.objects.bulk_create([
+        FoodImage(food=food, image=f'foods/benchmark-{index}.jpg')
+        for food in food_objects
+        for index in range(images)
+    ])
+    if topping_objects:
+        FoodTopping.objects.bulk_create([
+            FoodTopping(food=food, topping=topping_objects[(food_index + offset) % len(topping_objects)])
+            for food_index, food in enumerate(food_objects)
+            for offset in range(min(toppings_per_food, len(topping_objects)))
+        ])
+    get_search_backend().rebuild()
+    invalidate_menu_snapshot()
+    return category_objects, food_objects
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic menu into a throwaway test database and measure '
+        'latency, queries and memory of the menu hot paths.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--foods', type=int, default=50, help='Foods per category.')
+        parser.add_argument('--toppings', type=int, default=30)
+        parser.add_argument('--images', type=int, default=2, help='Images per food.')
+        parser.add_argument('--toppings-per-food', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Drop the menu snapshot, fragment cache and API response cache before every request.',
+        )
+        parser.add_argument(
+            '--response-cache', action='store_true',
+            help='Serve the API from the response cache. Off by default, so the API itself is measured.',
+        )
+        parser.add_argument(
+            '--close-connections', action='store_true',
+            help=(
+                'Release the database connection around every request like the WSGI handler does, '
+                'so CONN_MAX_AGE and pooling show up in the latency. Has no effect on in-memory SQLite.'
+            ),
+        )
+        parser.add_argument('--output', default='benchmark.json', help='Where to write the JSON results.')
+        parser.add_argument('--compare', help='Previous results file to print deltas against.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = self.run_benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+        self.print_results(results, options.get('compare'))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_benchmark(self, options):
+        categories, foods = seed_menu(
+            options['categories'], options['foods'], options['toppings'],
+            options['images'], options['toppings_per_food'],
+        )
+        user = get_user_model().objects.create_superuser(BENCHMARK_USER, 'benchmark@example.com', 'benchmark')
+
+        client = Client()
+        admin_client = Client()
+        admin_client.force_login(user)
+
+        results = {}
+        # A timeout of 0 turns the API response cache off.
+        response_cache = {} if options['response_cache'] else {'MENU_API_CACHE_TIMEOUT': 0}
+        with override_settings(**response_cache):
+            for name, url, params, endpoint_client in self.endpoints(categories, foods, client, admin_client):
+                results[name] = self.measure(endpoint_client, url, params, options)
+        return {
+            'meta': self.metadata(options),
+            'results': results,
+        }
+
+    def endpoints(self, categories, foods, client, admin_client):
+        food = foods[len(foods) // 2]
+        category = categories[len(categories) // 2]
+        return [
+            ('menu_list', reverse('menu_list'), {}, client),
+            ('food_detail', reverse('food_detail', args=[food.id]), {}, client),
+            ('api_foods', reverse('food-list'), {}, client),
+            ('api_foods_search', reverse('food-list'), {'search': 'tomato bas'}, client),
+            ('api_foods_by_category', reverse('food-by-category'), {'category_id': category.id}, client),
+            ('api_categories', reverse('category-list'), {}, client),
+            ('admin_categories', reverse('admin:menu_category_changelist'), {}, admin_client),
+            ('admin_foods', reverse('admin:menu_food_changelist'), {}, admin_client),
+            ('admin_toppings', reverse('admin:menu_topping_changelist'), {}, admin_client),
+            ('admin_food_toppings', reverse('admin:menu_foodtopping_changelist'), {}, admin_client),
+        ]
+
+    def request(self, client, url, params, options):
+        if options['cold']:
+            invalidate_menu_snapshot()
+            caches['menu_fragments'].clear()
+            api_cache().clear()
+        # The test client disconnects close_old_connections from the request
+        # signals, so run it here to connect, reuse or check out per request.
+        if options['close_connections']:
+            close_old_connections()
+        response = client.get(url, params)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        if options['close_connections']:
+            close_old_connections()
+        return response
+
+    def measure(self, client, url, params, options):
+        for _ in range(options['warmup']):
+            self.request(client, url, params, options)
+
+        timings = []
+        queries = []
+        status_code = None
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.request(client, url, params, options)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context.captured_queries))
+            status_code = response.status_code
+
+        tracemalloc.start()
+        self.request(client, url, params, options)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'status': status_code,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'sizes': {
+                key: options[key]
+                for key in ('categories', 'foods', 'toppings', 'images', 'toppings_per_food')
+            },
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'response_cache': options['response_cache'],
+            'close_connections': options['close_connections'],
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'pool': connection.settings_dict['OPTIONS'].get('pool', False),
+        }
+
+    def print_results(self, results, compare_path=None):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as compare_file:
+                previous = json.load(compare_file).get('results', {})
+
+        header = f"{'endpoint':<24}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KB':>11}"
+        self.stdout.write(header)
+        for name, result in results['results'].items():
+            line = (
+                f"{name:<24}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries']:>9}{result['peak_memory_kb']:>11.1f}"
+            )
+            if name in previous:
+                before = previous[name]
+                line += (
+                    f"   p50 {result['p50_ms'] - before['p50_ms']:+.2f} ms,"
+                    f" queries {result['queries'] - before['queries']:+d}"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from menu.transfer import FORMATS, JSONL, detect_format, iter_menu_records, write_records
+
+
+class Command(BaseCommand):
+    help = 'Export the whole menu as CSV or JSON Lines, in a format import_menu reads back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or '-' for standard output.")
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, or JSON Lines.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows fetched per query.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (JSONL if path == '-' else detect_format(path))
+        if fmt is None:
+            raise CommandError('Pass --format when the file extension is not .csv or .jsonl.')
+
+        self.exported = 0
+        chunks = write_records(self.count(iter_menu_records(chunk_size=options['chunk_size'])), fmt)
+        if path == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            output.writelines(chunks)
+        self.stdout.write(self.style.SUCCESS(f'Exported {self.exported} records to {path}.'))
+
+    def count(self, records):
+        for record in records:
+            self.exported += 1
+            yield record
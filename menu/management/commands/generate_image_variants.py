@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from PIL import Image, UnidentifiedImageError
+
+from menu.models import Category, Food, FoodImage
+from menu.utils.images import apply_variants, generate_variants, is_stale, variants_field
+from menu.utils.snapshot import invalidate_menu_snapshot
+
+IMAGE_MODELS = (Category, Food, FoodImage)
+
+
+def generate(name):
+    """
+    Worker entry point. Workers only touch media storage; the parent writes
+    the manifests so no database connection crosses a process boundary.
+    """
+    try:
+        return generate_variants(name), None
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        return None, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/AVIF variants for existing category, food and gallery images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Worker processes; 1 runs everything in this process.',
+        )
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already up to date.')
+
+    def handle(self, *args, **options):
+        tasks = list(self.collect_tasks(options['force']))
+        if not tasks:
+            self.stdout.write(self.style.SUCCESS('All image variants are up to date.'))
+            return
+
+        generated = failed = 0
+        for (model, pk, field_name, name), (manifest, error) in self.run(tasks, options['workers']):
+            if error is not None:
+                failed += 1
+                self.stderr.write(f'{model._meta.label} #{pk} {name}: {error}')
+                continue
+            instance = model.objects.filter(pk=pk).first()
+            if instance is None or getattr(instance, field_name).name != name:
+                # Deleted or re-uploaded meanwhile; the save already took care of it.
+                continue
+            apply_variants(instance, field_name, manifest)
+            generated += 1
+
+        invalidate_menu_snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {generated} images, {failed} failed.'))
+
+    def collect_tasks(self, force):
+        for model in IMAGE_MODELS:
+            for field_name in model.variant_image_fields:
+                queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                for instance in queryset.only('pk', field_name, variants_field(field_name)).iterator():
+                    if force or is_stale(instance, field_name):
+                        yield model, instance.pk, field_name, getattr(instance, field_name).name
+
+    def run(self, tasks, workers):
+        if workers <= 1:
+            for task in tasks:
+                yield task, generate(task[3])
+            return
+        # Forked workers must not inherit open database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            futures = {pool.submit(generate, task[3]): task for task in tasks}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from menu.jobs import enqueue
+from menu.transfer import FORMATS, MenuImporter, MenuImportError, detect_format, read_records
+from menu.utils.fragments import fragment_cache_is_shared
+
+
+class Command(BaseCommand):
+    help = (
+        'Import categories, toppings and foods from a CSV or JSON Lines file, '
+        'creating or updating them by name.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for standard input.")
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Records written per bulk query.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if fmt is None:
+            raise CommandError('Pass --format when the file extension is not .csv or .jsonl.')
+
+        importer = MenuImporter(using=options['database'], chunk_size=options['chunk_size'])
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            stats = importer.run(read_records(stream, fmt))
+        except MenuImportError as exc:
+            raise CommandError(f'Nothing was imported. {exc}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if fragment_cache_is_shared():
+            enqueue('menu.warm_menu_cache')
+        summary = ', '.join(f'{count} {label}' for label, count in sorted(stats.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f'Imported: {summary}.'))
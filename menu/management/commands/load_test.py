@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import socket
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from menu.management.commands.benchmark_menu import percentile
+
+DEFAULT_PATHS = ('/', '/api/menu/', '/api/foods/')
+
+
+async def fetch(host, port, path, receive_buffer, read_delay, chunk_size=4096):
+    """
+    GET ``path`` over a fresh connection and read the response ``chunk_size``
+    bytes at a time, pausing ``read_delay`` seconds between reads like a
+    client on a slow mobile link. Returns the status code and body size.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    if receive_buffer:
+        # A small receive window keeps the kernel from absorbing the whole
+        # response, so the server really waits on the slow reader.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    await asyncio.get_running_loop().sock_connect(sock, (host, port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    try:
+        writer.write((
+            f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+            'Accept: application/json, text/html\r\nConnection: close\r\n\r\n'
+        ).encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        size = 0
+        while chunk := await reader.read(chunk_size):
+            size += len(chunk)
+            if read_delay:
+                await asyncio.sleep(read_delay)
+        return int(status_line.split()[1]), size
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, paths, concurrency, duration, receive_buffer, read_delay):
+    results = {path: {'latencies': [], 'errors': 0, 'bytes': 0} for path in paths}
+    deadline = time.monotonic() + duration
+
+    async def client(index):
+        request_index = index
+        while time.monotonic() < deadline:
+            path = paths[request_index % len(paths)]
+            request_index += 1
+            started = time.perf_counter()
+            try:
+                status, size = await fetch(host, port, path, receive_buffer, read_delay)
+            except (OSError, ValueError, IndexError):
+                status, size = None, 0
+            result = results[path]
+            if status != 200:
+                result['errors'] += 1
+                continue
+            result['latencies'].append((time.perf_counter() - started) * 1000)
+            result['bytes'] += size
+
+    started = time.monotonic()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    return results, time.monotonic() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server with concurrent, optionally slow, clients and '
+        'report throughput and latency, to compare the ASGI and WSGI setups.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Base URL of the running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request; repeatable.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Simultaneous clients.')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run.')
+        parser.add_argument(
+            '--read-delay', type=float, default=0,
+            help='Seconds each client pauses between 4 KB reads, to simulate slow links.',
+        )
+        parser.add_argument(
+            '--receive-buffer', type=int, default=0,
+            help='Client socket receive buffer in bytes; small values make slow reads hold the server.',
+        )
+        parser.add_argument(
+            '--server-cores', type=int, default=os.cpu_count(),
+            help='CPU cores the server may use, for the per-core figures.',
+        )
+        parser.add_argument('--label', default='', help='Name of the setup under test, stored with the results.')
+        parser.add_argument('--output', default='load_test.json', help='Where to write the JSON results.')
+        parser.add_argument('--compare', help='Previous results file to print deltas against.')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Only plain http:// URLs are supported.')
+        paths = options['paths'] or list(DEFAULT_PATHS)
+        raw, elapsed = asyncio.run(run_load(
+            url.hostname, url.port or 80, paths, options['concurrency'], options['duration'],
+            options['receive_buffer'], options['read_delay'],
+        ))
+
+        cores = max(options['server_cores'] or 1, 1)
+        results = {}
+        for path, result in raw.items():
+            latencies = result['latencies']
+            throughput = len(latencies) / elapsed
+            results[path] = {
+                'requests': len(latencies),
+                'errors': result['errors'],
+                'rps': round(throughput, 2),
+                'rps_per_core': round(throughput / cores, 2),
+                'p50_ms': round(percentile(latencies, 0.5), 3) if latencies else None,
+                'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+                'mean_ms': round(statistics.fmean(latencies), 3) if latencies else None,
+            }
+        output = {
+            'meta': {
+                'label': options['label'],
+                'url': options['url'],
+                'concurrency': options['concurrency'],
+                'duration': round(elapsed, 2),
+                'read_delay': options['read_delay'],
+                'receive_buffer': options['receive_buffer'],
+                'server_cores': cores,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as output_file:
+            json.dump(output, output_file, indent=2)
+        self.print_results(output, options.get('compare'))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def print_results(self, output, compare_path=None):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as compare_file:
+                previous = json.load(compare_file).get('results', {})
+
+        self.stdout.write(f"{'path':<24}{'requests':>10}{'errors':>8}{'rps':>10}{'rps/core':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for path, result in output['results'].items():
+            line = (
+                f"{path:<24}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.1f}"
+                f"{result['rps_per_core']:>10.1f}{result['p50_ms'] or 0:>10.1f}{result['p99_ms'] or 0:>10.1f}"
+            )
+            if path in previous:
+                before = previous[path]
+                line += f"   rps {result['rps'] - before['rps']:+.1f}"
+            self.stdout.write(line)
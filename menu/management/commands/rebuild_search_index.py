@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from menu.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for foods.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        if not backend.supported:
+            self.stdout.write(self.style.WARNING('This database has no full-text search backend.'))
+            return
+        with transaction.atomic(using=options['database']):
+            backend.create_index()
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,45 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from menu.jobs.queue import claim_jobs, enqueue_periodic_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image variants, search reindexing, cache warming) and the periodic prune jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due now and exit.')
+        parser.add_argument('--batch', type=int, default=20, help='Jobs claimed per poll.')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        succeeded = failed = 0
+        last_queued = {}
+        while not self.stopping:
+            close_old_connections()
+            requeue_stale_jobs()
+            enqueue_periodic_jobs(last_queued)
+            jobs = claim_jobs(options['batch'])
+            for job in jobs:
+                if run_job(job):
+                    succeeded += 1
+                else:
+                    failed += 1
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded + failed} jobs, {failed} failed.'))
+
+    def stop(self, signum, frame):
+        # Finish the claimed batch, then exit.
+        self.stopping = True
@@ -0,0 +1,5 @@
+from menu.managers.category import CategoryQuerySet
+from menu.managers.food import FoodQuerySet
+from menu.managers.ordering import OrderingQuerySet
+
+__all__ = ['CategoryQuerySet', 'FoodQuerySet', 'OrderingQuerySet']
@@ -0,0 +1,13 @@
+from django.db import models
+from django.db.models import Count, Q
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_foods_count(self):
+        """
+        Annotate every category with the number of its available foods in the
+        same query, read back through ``Category.foods_count``.
+        """
+        return self.annotate(
+            available_foods_count=Count('foods', filter=Q(foods__is_available=True))
+        )
@@ -0,0 +1,27 @@
+from django.db.models import Prefetch
+
+from menu.managers.ordering import OrderingQuerySet
+
+
+MENU_RELATIONS = ('category', 'images', 'toppings')
+
+
+class FoodQuerySet(OrderingQuerySet):
+    def with_menu_relations(self, relations=MENU_RELATIONS):
+        """
+        Prefetch everything ``FoodSerializer`` renders, including the
+        annotated category and only the available toppings, so serializing a
+        page of foods never falls back to per-row queries. ``relations``
+        limits the prefetches to the ones the response renders.
+        """
+        from menu.models import Category, FoodTopping
+        lookups = {
+            'category': Prefetch('category', queryset=Category.objects.with_foods_count()),
+            'images': 'images',
+            'toppings': Prefetch(
+                'food_toppings',
+                queryset=FoodTopping.objects.select_related('topping').filter(topping__is_available=True),
+                to_attr='available_food_toppings',
+            ),
+        }
+        return self.prefetch_related(*(lookups[relation] for relation in relations))
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Max, Min, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from menu.enums import DiscountType, MenuEventAction
+from menu.mixins.models.ordering import AVAILABILITY_FIELDS, COMPUTED_FIELDS, PRICING_FIELDS
+from menu.utils.availability import availability_status_expression, get_availability_status
+from menu.utils.pricing import (
+    HUNDRED,
+    MAX_PRICE,
+    final_price_expression,
+    to_decimal,
+    validate_discount,
+)
+
+PERCENT = 'percent'
+FIXED = 'fixed'
+PRICE_ADJUSTMENTS = (PERCENT, FIXED)
+
+
+class OrderingQuerySet(models.QuerySet):
+    """
+    Keeps the denormalized ``final_price`` and ``availability_status``
+    columns of foods and toppings current on the bulk paths that bypass
+    ``save()``.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from menu.events import event_item, record_menu_event
+        objs = list(objs)
+        for obj in objs:
+            obj.refresh_computed_fields()
+        created = super().bulk_create(objs, *args, **kwargs)
+        record_menu_event(
+            self.model, MenuEventAction.CREATED,
+            [event_item(obj) for obj in created if obj.pk is not None], self.db,
+        )
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from menu.events import event_item, record_menu_event
+        objs = list(objs)
+        if set(fields) & {*PRICING_FIELDS, *AVAILABILITY_FIELDS}:
+            for obj in objs:
+                obj.refresh_computed_fields()
+            fields = [*fields, *(field for field in COMPUTED_FIELDS if field not in fields)]
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        event_fields = [field for field in self.model.tracked_fields if field in fields]
+        if event_fields:
+            record_menu_event(
+                self.model, MenuEventAction.UPDATED, [event_item(obj, event_fields) for obj in objs], self.db,
+            )
+        return updated
+
+    def update(self, **kwargs):
+        """
+        ``update()`` that keeps ``final_price`` and ``availability_status``
+        current and bumps ``updated_at`` when pricing or availability fields
+        change. The computed columns are written as expressions over the new
+        values, since ``SET`` clauses only see the old row.
+        """
+        changed = set(kwargs) & {*PRICING_FIELDS, *AVAILABILITY_FIELDS}
+        if changed:
+            replacements = {F(name): self._new_value(name, kwargs[name]) for name in changed}
+            kwargs.setdefault('final_price', final_price_expression().replace_expressions(replacements))
+            kwargs.setdefault(
+                'availability_status', availability_status_expression().replace_expressions(replacements),
+            )
+            kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    def _new_value(self, name, value):
+        field = self.model._meta.get_field(name)
+        if hasattr(value, 'resolve_expression'):
+            return ExpressionWrapper(value, output_field=field)
+        return Value(value, output_field=field)
+
+    def apply_discount(self, value, discount_type=DiscountType.PERCENTAGE.value):
+        """
+        Set the same discount on every row in one ``UPDATE``, validated like
+        ``set_discount``. Returns the number of rows changed.
+        """
+        validate_discount(value, discount_type)
+        if discount_type == DiscountType.FIXED.value and self.filter(price__lt=to_decimal(value)).exists():
+            raise ValueError("Fixed discount cannot exceed the price")
+        return self._bulk_change(
+            discount=value,
+            discount_type=discount_type,
+            final_price=final_price_expression(discount=value, discount_type=discount_type),
+        )
+
+    def adjust_price(self, amount, adjustment=PERCENT):
+        """
+        Raise or lower every price by a percentage or a fixed amount in one
+        ``UPDATE``, rounded to the cent. Fails without changing anything if
+        a price would leave the range of the column.
+        """
+        if adjustment not in PRICE_ADJUSTMENTS:
+            raise ValueError(f"Price adjustment must be one of {', '.join(PRICE_ADJUSTMENTS)}")
+        amount = to_decimal(amount)
+        if adjustment == PERCENT:
+            price = Round(F('price') * (Value(HUNDRED) + Value(amount)) / Value(HUNDRED), 2)
+        else:
+            price = F('price') + Value(amount)
+        price = models.ExpressionWrapper(price, output_field=models.DecimalField(max_digits=8, decimal_places=2))
+        bounds = self.aggregate(lowest=Min(price), highest=Max(price))
+        if bounds['lowest'] is not None and bounds['lowest'] < 0:
+            raise ValueError("Price cannot be negative")
+        if bounds['highest'] is not None and bounds['highest'] > MAX_PRICE:
+            raise ValueError(f"Price cannot exceed {MAX_PRICE}")
+        return self._bulk_change(price=price, final_price=final_price_expression(price=price))
+
+    def set_availability(self, is_available=True, available_from=None, available_to=None):
+        """
+        Give every row the same availability flag and time window in one
+        ``UPDATE``.
+        """
+        values = {'is_available': is_available, 'available_from': available_from, 'available_to': available_to}
+        return self._bulk_change(
+            **values,
+            availability_status=get_availability_status(SimpleNamespace(**values)),
+        )
+
+    def _bulk_change(self, **values):
+        """
+        Run one ``UPDATE`` that also bumps ``updated_at``, record one menu
+        event with the new values of every row, and invalidate the menu once
+        for the whole batch, as ``update()`` sends no signals.
+        """
+        from menu.jobs import enqueue
+        from menu.utils.fragments import fragment_cache_is_shared
+        from menu.utils.snapshot import invalidate_menu_snapshot
+
+        from menu.events import event_row, record_menu_event
+
+        fields = [field for field in self.model.tracked_fields if field in values]
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list('pk', flat=True))
+            updated = self.update(**values, updated_at=timezone.now())
+            rows = self.model._default_manager.using(self.db).filter(pk__in=ids).values('pk', *fields)
+            record_menu_event(
+                self.model, MenuEventAction.UPDATED,
+                [event_row({'id': row.pop('pk'), **row}) for row in rows], self.db,
+            )
+            transaction.on_commit(invalidate_menu_snapshot, using=self.db)
+            if updated and fragment_cache_is_shared():
+                enqueue('menu.warm_menu_cache', delay=settings.MENU_JOB_BATCH_DELAY)
+        invalidate_menu_snapshot()
+        return updated
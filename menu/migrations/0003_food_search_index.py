@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from menu.search.backends import get_search_backend
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection.alias)
+    backend.create_index()
+    backend.rebuild()
+
+
+def drop_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection.alias).drop_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_food_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='discount_type',
+            field=models.CharField(choices=[('percentage', 'Percentage'), ('fixed', 'Fixed')], default='percentage', help_text='Whether the discount is a percentage or a fixed amount off the price', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='topping',
+            name='discount_type',
+            field=models.CharField(choices=[('percentage', 'Percentage'), ('fixed', 'Fixed')], default='percentage', help_text='Whether the discount is a percentage or a fixed amount off the price', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='food',
+            name='discount',
+            field=models.FloatField(blank=True, default=0, help_text='The discount for the food, as a percentage or a fixed amount depending on the discount type', null=True),
+        ),
+        migrations.AlterField(
+            model_name='topping',
+            name='discount',
+            field=models.FloatField(blank=True, default=0, help_text='The discount for the food, as a percentage or a fixed amount depending on the discount type', null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+from menu.utils.availability import get_availability_status
+from menu.utils.pricing import compute_final_price
+
+
+def populate_computed_fields(apps, schema_editor):
+    for model_name in ('Food', 'Topping'):
+        model = apps.get_model('menu', model_name)
+        objs = list(model.objects.using(schema_editor.connection.alias).all())
+        for obj in objs:
+            obj.final_price = compute_final_price(obj.price, obj.discount, obj.discount_type)
+            obj.availability_status = get_availability_status(obj)
+        model.objects.using(schema_editor.connection.alias).bulk_update(
+            objs, ['final_price', 'availability_status'], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_discount_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='availability_status',
+            field=models.CharField(choices=[('available', 'Available'), ('unavailable', 'Unavailable'), ('time_restricted', 'Time Restricted')], db_index=True, default='available', editable=False, help_text='Availability bucket derived from the flag and the time window, kept in sync on save', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='final_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, help_text='The price after discount, kept in sync on save', max_digits=6),
+        ),
+        migrations.AddField(
+            model_name='topping',
+            name='availability_status',
+            field=models.CharField(choices=[('available', 'Available'), ('unavailable', 'Unavailable'), ('time_restricted', 'Time Restricted')], db_index=True, default='available', editable=False, help_text='Availability bucket derived from the flag and the time window, kept in sync on save', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='topping',
+            name='final_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, editable=False, help_text='The price after discount, kept in sync on save', max_digits=6),
+        ),
+        migrations.RunPython(populate_computed_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_persisted_final_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['name'], name='menu_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['-created_at'], name='menu_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['category', 'name'], name='menu_food_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['category', '-created_at'], name='menu_food_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['name'], name='menu_food_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['-created_at'], name='menu_food_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['category'], name='menu_food_available_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topping',
+            index=models.Index(fields=['name'], name='menu_topping_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topping',
+            index=models.Index(fields=['-created_at'], name='menu_topping_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0006_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='icon_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/AVIF copies of the icon'),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='header_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/AVIF copies of the header image'),
+        ),
+        migrations.AddField(
+            model_name='foodimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/AVIF copies of the image'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0009_menu_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['updated_at'], name='menu_category_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['updated_at'], name='menu_food_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodimage',
+            index=models.Index(fields=['updated_at'], name='menu_foodimage_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodtopping',
+            index=models.Index(fields=['updated_at'], name='menu_foodtopping_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['created_at'], name='menu_tombstone_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topping',
+            index=models.Index(fields=['updated_at'], name='menu_topping_updated_idx'),
+        ),
+    ]
@@ -1,11 +1,50 @@
 from django.db import models
+from menu.enums import AvailabilityStatus, DiscountType
+from menu.utils.availability import get_availability_status
+from menu.utils.pricing import compute_final_price
+
+COMPUTED_FIELDS = ('final_price', 'availability_status')
+PRICING_FIELDS = ('price', 'discount', 'discount_type')
+AVAILABILITY_FIELDS = ('is_available', 'available_from', 'available_to')
 
 class OrderingMixin(models.Model):
     is_available = models.BooleanField(default=True, help_text='If the food is available for ordering')
-    discount = models.FloatField(default=0, blank=True, null=True, help_text='The discount percentage for the food')
+    discount = models.FloatField(default=0, blank=True, null=True, help_text='The discount for the food, as a percentage or a fixed amount depending on the discount type')
+    discount_type = models.CharField(
+        max_length=20,
+        choices=[(discount_type.value, discount_type.name.title()) for discount_type in DiscountType],
+        default=DiscountType.PERCENTAGE.value,
+        help_text='Whether the discount is a percentage or a fixed amount off the price'
+    )
     available_from = models.TimeField(blank=True, null=True, help_text='The time from which the food is available for ordering')
     available_to = models.TimeField(blank=True, null=True, help_text='The time until which the food is available for ordering')
+    final_price = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text='The price after discount, kept in sync on save'
+    )
+    availability_status = models.CharField(
+        max_length=20,
+        choices=[(status.value, status.name.replace('_', ' ').title()) for status in AvailabilityStatus],
+        default=AvailabilityStatus.AVAILABLE.value,
+        editable=False,
+        db_index=True,
+        help_text='Availability bucket derived from the flag and the time window, kept in sync on save'
+    )
 
     class Meta:
         abstract = True
 
+    def refresh_computed_fields(self):
+        self.final_price = compute_final_price(self.price, self.discount, self.discount_type)
+        self.availability_status = get_availability_status(self)
+
+    def save(self, *args, **kwargs):
+        self.refresh_computed_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *COMPUTED_FIELDS}
+        super().save(*args, **kwargs)
@@ -0,0 +1,37 @@
+from django.db import models
+
+
+class ChangeTrackingMixin(models.Model):
+    """
+    Remember the ``tracked_fields`` values a row was loaded with, so that
+    ``changed_fields()`` can tell what a later ``save()`` actually changed
+    without reading the row again.
+    """
+    tracked_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_fields()
+        return instance
+
+    def remember_tracked_fields(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field: getattr(self, field)
+            for field in self.tracked_fields
+            if field not in deferred
+        }
+
+    def changed_fields(self):
+        """
+        Tracked fields that differ from the loaded values; every tracked
+        field for rows that were never loaded.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return list(self.tracked_fields)
+        return [field for field, value in loaded.items() if getattr(self, field) != value]
@@ -0,0 +1,3 @@
+from menu.mixins.serializers.fieldsets import SparseFieldsetMixin, request_selection, selected_fields
+
+__all__ = ['SparseFieldsetMixin', 'request_selection', 'selected_fields']
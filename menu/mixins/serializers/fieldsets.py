@@ -0,0 +1,120 @@
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_paths(value):
+    """
+    Turn ``'id,category.name'`` into ``{'id': None, 'category': {'name': None}}``,
+    where ``None`` stands for the whole field.
+    """
+    tree = {}
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('.')]
+        if not all(parts):
+            continue
+        node = tree
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def request_selection(request):
+    """
+    The ``(fields, expand)`` trees asked for by ``?fields=`` and ``?expand=``,
+    or ``None`` when the request asks for neither and gets the full output.
+    """
+    if request is None:
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None
+    fields = params.get(FIELDS_PARAM)
+    return (
+        parse_field_paths(fields) if fields else None,
+        parse_field_paths(params.get(EXPAND_PARAM, '')),
+    )
+
+
+def _selected(name, expandable, fields, expand):
+    if fields is not None:
+        return name in fields or name in expand
+    return name not in expandable or name in expand
+
+
+def selected_fields(serializer_class, request):
+    """
+    Names of the top-level fields ``serializer_class`` renders for
+    ``request``, or ``None`` for all of them, so views can skip the joins
+    and prefetches of everything else.
+    """
+    selection = request_selection(request)
+    if selection is None:
+        return None
+    fields, expand = selection
+    expandable = getattr(serializer_class.Meta, 'expandable_fields', ())
+    return {
+        name for name in serializer_class().get_fields()
+        if _selected(name, expandable, fields, expand)
+    }
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients pick the fields they need with ``?fields=id,name,final_price``
+    (dotted paths reach into nested serializers) and opt into the relations
+    listed in ``Meta.expandable_fields`` with ``?expand=category,images``.
+
+    Without either parameter the output is unchanged. With one of them,
+    expandable relations are left out unless named in ``fields`` or
+    ``expand``.
+    """
+    _selection = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self._selection
+        if selection is None and self._is_root():
+            selection = request_selection(self.context.get('request'))
+        if selection is None:
+            return fields
+
+        wanted, expand = selection
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        selected = {}
+        for name, field in fields.items():
+            # Write-only fields never render but must still accept input.
+            if not field.write_only and not _selected(name, expandable, wanted, expand):
+                continue
+            selected[name] = field
+            nested = getattr(field, 'child', field)
+            if isinstance(nested, SparseFieldsetMixin):
+                nested._selection = self._nested_selection(name, selection)
+        return selected
+
+    def _nested_selection(self, name, selection):
+        wanted, expand = selection
+        return (wanted.get(name) if wanted else None, expand.get(name) or {})
+
+    def nested_serializer(self, name, serializer_class, instance, **kwargs):
+        """
+        ``serializer_class`` for a ``SerializerMethodField`` called ``name``,
+        restricted to what the request picked for it.
+        """
+        serializer = serializer_class(instance, context=self.context, **kwargs)
+        selection = self._selection
+        if selection is None and self._is_root():
+            selection = request_selection(self.context.get('request'))
+        if selection is not None:
+            nested = getattr(serializer, 'child', serializer)
+            nested._selection = self._nested_selection(name, selection)
+        return serializer
+
+    def _is_root(self):
+        parent = getattr(self, 'parent', None)
+        if parent is not None and getattr(parent, 'child', None) is self:
+            parent = parent.parent
+        return parent is None
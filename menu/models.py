@@ -1,35 +1,60 @@
 from django.db import models
+from django.db.models import Q
 from decimal import Decimal
 from online_menu.base.models import BaseModel
 from menu.mixins.models.ordering import OrderingMixin
 from menu.mixins.models.__str__ import NameStrMixin, CompositeStrMixin
-from menu.utils.pricing import calculate_final_price
+from menu.mixins.models.tracking import ChangeTrackingMixin
+from menu.managers.category import CategoryQuerySet
+from menu.managers.food import FoodQuerySet
+from menu.managers.ordering import OrderingQuerySet
+from menu.utils.pricing import validate_discount, validate_price
+from menu.enums import JobStatus, MenuEventAction
 from menu.utils.availability import is_food_available
 
 
-class Category(BaseModel, NameStrMixin):
+class Category(BaseModel, ChangeTrackingMixin, NameStrMixin):
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True, null=True)
     icon = models.ImageField(upload_to='categories/', blank=True, null=True)
+    icon_variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Resized WebP/AVIF copies of the icon')
+    
+    objects = CategoryQuerySet.as_manager()
+    variant_image_fields = ('icon',)
+    # Foods are indexed under their category's name.
+    tracked_fields = ('name',)
     
     @property
     def foods_count(self):
+        if hasattr(self, 'available_foods_count'):
+            return self.available_foods_count
         return self.foods.filter(is_available=True).count()
     
     @property
     def has_icon(self):
         return bool(self.icon)
+    
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['name'], name='menu_category_name_idx'),
+            models.Index(fields=['-created_at'], name='menu_category_created_idx'),
+            models.Index(fields=['updated_at'], name='menu_category_updated_idx'),
+        ]
 
-class Food(BaseModel, OrderingMixin, NameStrMixin):
+class Food(BaseModel, OrderingMixin, ChangeTrackingMixin, NameStrMixin):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='foods')
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=6, decimal_places=2)
     header_image = models.ImageField(upload_to='foods/', blank=True, null=True)
+    header_image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Resized WebP/AVIF copies of the header image')
     
-    @property
-    def final_price(self):
-        return Decimal(str(calculate_final_price(self.price, self.discount)))
+    objects = FoodQuerySet.as_manager()
+    variant_image_fields = ('header_image',)
+    tracked_fields = (
+        'category_id', 'name', 'price', 'discount', 'discount_type', 'final_price',
+        'is_available', 'availability_status', 'available_from', 'available_to',
+    )
     
     @property
     def has_discount(self):
@@ -50,31 +75,56 @@ class Food(BaseModel, OrderingMixin, NameStrMixin):
         return Decimal('0.00')
     
     def set_price(self, value):
-        if value < 0:
-            raise ValueError("Price cannot be negative")
+        validate_price(value)
         self.price = value
+        self.refresh_computed_fields()
     
-    def set_discount(self, value):
-        if value < 0 or value > 100:
-            raise ValueError("Discount must be between 0 and 100")
+    def set_discount(self, value, discount_type=None):
+        discount_type = discount_type or self.discount_type
+        validate_discount(value, discount_type, self.price)
         self.discount = value
+        self.discount_type = discount_type
+        self.refresh_computed_fields()
+    
+    class Meta(BaseModel.Meta):
+        indexes = [
+            # Category pages in API order and in model order (menu snapshot).
+            models.Index(fields=['category', 'name'], name='menu_food_category_name_idx'),
+            models.Index(fields=['category', '-created_at'], name='menu_food_category_created_idx'),
+            # Unfiltered lists, so a page is an index walk plus LIMIT.
+            models.Index(fields=['name'], name='menu_food_name_idx'),
+            models.Index(fields=['-created_at'], name='menu_food_created_idx'),
+            models.Index(fields=['updated_at'], name='menu_food_updated_idx'),
+            # Available foods per category, for the category foods count.
+            models.Index(fields=['category'], condition=Q(is_available=True), name='menu_food_available_cat_idx'),
+        ]
 
 class FoodImage(BaseModel, CompositeStrMixin):
     food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='foods/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Resized WebP/AVIF copies of the image')
+    
+    variant_image_fields = ('image',)
     
     @property
     def has_image(self):
         return bool(self.image)
+    
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['updated_at'], name='menu_foodimage_updated_idx'),
+        ]
 
-class Topping(BaseModel, OrderingMixin, NameStrMixin):
+class Topping(BaseModel, OrderingMixin, ChangeTrackingMixin, NameStrMixin):
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True, null=True)
     price = models.DecimalField(max_digits=6, decimal_places=2)
     
-    @property
-    def final_price(self):
-        return Decimal(str(calculate_final_price(self.price, self.discount)))
+    objects = OrderingQuerySet.as_manager()
+    tracked_fields = (
+        'name', 'price', 'discount', 'discount_type', 'final_price',
+        'is_available', 'availability_status', 'available_from', 'available_to',
+    )
     
     @property
     def has_discount(self):
@@ -92,14 +142,23 @@ class Topping(BaseModel, OrderingMixin, NameStrMixin):
         return Decimal('0.00')
     
     def set_price(self, value):
-        if value < 0:
-            raise ValueError("Price cannot be negative")
+        validate_price(value)
         self.price = value
+        self.refresh_computed_fields()
     
-    def set_discount(self, value):
-        if value < 0 or value > 100:
-            raise ValueError("Discount must be between 0 and 100")
+    def set_discount(self, value, discount_type=None):
+        discount_type = discount_type or self.discount_type
+        validate_discount(value, discount_type, self.price)
         self.discount = value
+        self.discount_type = discount_type
+        self.refresh_computed_fields()
+    
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['name'], name='menu_topping_name_idx'),
+            models.Index(fields=['-created_at'], name='menu_topping_created_idx'),
+            models.Index(fields=['updated_at'], name='menu_topping_updated_idx'),
+        ]
 
 class FoodTopping(BaseModel, CompositeStrMixin):
     food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='food_toppings')
@@ -110,4 +169,79 @@ class FoodTopping(BaseModel, CompositeStrMixin):
         return self.topping.is_currently_available
 
     class Meta:
-        unique_together = ['food', 'topping']
\ No newline at end of file
+        unique_together = ['food', 'topping']
+        indexes = [
+            models.Index(fields=['updated_at'], name='menu_foodtopping_updated_idx'),
+        ]
+
+
+class Tombstone(BaseModel):
+    """
+    Record of a deleted menu object, so deletions show up in the menu
+    version stamp and in delta syncs like any other change.
+    """
+    model_name = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['created_at'], name='menu_tombstone_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model_name} #{self.object_id}"
+
+
+class MenuEvent(BaseModel):
+    """
+    A change to a food, topping or food topping, ordered by id, that
+    ``/api/menu/events/`` pushes to connected clients. ``items`` holds the
+    id and changed fields of every affected row.
+    """
+    model_name = models.CharField(max_length=50)
+    action = models.CharField(
+        max_length=20,
+        choices=[(action.value, action.name.title()) for action in MenuEventAction],
+    )
+    items = models.JSONField(default=list)
+    
+    class Meta(BaseModel.Meta):
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.model_name} {self.action} #{self.pk}"
+
+
+class Job(BaseModel):
+    """
+    Background job for ``run_jobs``. Jobs that succeed are deleted; failed
+    ones are kept with their last error.
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=255, help_text='Jobs with the same key are only queued once')
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=[(status.value, status.name.title()) for status in JobStatus],
+        default=JobStatus.PENDING.value,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(help_text='The job is not picked up before this time')
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta(BaseModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=Q(status=JobStatus.PENDING.value),
+                name='menu_job_unique_pending_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='menu_job_status_run_after_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,50 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _without_empty(data):
+    if isinstance(data, dict):
+        return {
+            key: _without_empty(value) for key, value in data.items()
+            if value is not None and value != {} and value != []
+        }
+    if isinstance(data, list):
+        return [_without_empty(item) for item in data]
+    return data
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON for low-bandwidth clients, picked with ``?format=compact``. Never
+    indented, and keys whose value is null or an empty object or list are
+    left out, so clients must treat a missing key as empty.
+    """
+    format = 'compact'
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        return None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(_without_empty(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack, picked with ``?format=msgpack`` or
+    ``Accept: application/msgpack``. Values are encoded as in the JSON
+    output. Needs the ``msgpack`` package.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
@@ -0,0 +1,3 @@
+from menu.search.backends import get_search_backend, search_limit, tokenize
+
+__all__ = ['get_search_backend', 'search_limit', 'tokenize']
@@ -0,0 +1,245 @@
+import re
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import connections
+
+SEARCH_TABLE = 'menu_food_search'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(terms):
+    return TOKEN_RE.findall(terms.lower())
+
+
+class BaseSearchBackend(ABC):
+    """
+    Full-text index over food name, description and category name.
+    """
+    supported = True
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @abstractmethod
+    def create_index(self):
+        ...
+
+    @abstractmethod
+    def drop_index(self):
+        ...
+
+    @abstractmethod
+    def index_foods(self, foods):
+        ...
+
+    @abstractmethod
+    def remove_foods(self, food_ids):
+        ...
+
+    @abstractmethod
+    def rebuild(self):
+        ...
+
+    @abstractmethod
+    def search(self, terms, limit=None, within=None):
+        """
+        Ids of the foods matching every term, best match first.
+        """
+
+    def _within(self, column, within):
+        """
+        SQL restricting ``column`` to the ids of the ``within`` queryset, so
+        filters apply before the limit does.
+        """
+        if within is None:
+            return '', []
+        sql, params = within.order_by().values('pk').query.sql_with_params()
+        return f" AND {column} IN ({sql})", list(params)
+
+    def _documents(self, foods):
+        return [
+            (food.pk, food.name, food.description or '', food.category.name)
+            for food in foods
+        ]
+
+
+class NullSearchBackend(BaseSearchBackend):
+    """
+    For databases without native full-text support, which report
+    ``supported = False`` so callers fall back to DRF's ``icontains`` search.
+    """
+    supported = False
+
+    def create_index(self):
+        pass
+
+    def drop_index(self):
+        pass
+
+    def index_foods(self, foods):
+        pass
+
+    def remove_foods(self, food_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, terms, limit=None, within=None):
+        return []
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    FTS5 virtual table keyed by the food id (its rowid), ranked with bm25.
+    """
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "name, description, category, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def index_foods(self, foods):
+        documents = self._documents(foods)
+        if not documents:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                [(document[0],) for document in documents],
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, name, description, category) VALUES (%s, %s, %s, %s)",
+                documents,
+            )
+
+    def remove_foods(self, food_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                [(food_id,) for food_id in food_ids],
+            )
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, name, description, category) "
+                "SELECT f.id, f.name, COALESCE(f.description, ''), c.name "
+                "FROM menu_food f INNER JOIN menu_category c ON c.id = f.category_id"
+            )
+
+    def search(self, terms, limit=None, within=None):
+        tokens = tokenize(terms)
+        if not tokens:
+            return []
+        query = ' '.join('"%s"*' % token.replace('"', '""') for token in tokens)
+        restriction, params = self._within('rowid', within)
+        sql = (
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s{restriction} "
+            f"ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0, 4.0)"
+        )
+        params = [query, *params]
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Weighted ``tsvector`` per food in a side table with a GIN index, ranked
+    with ``ts_rank``.
+    """
+
+    DOCUMENT_SQL = (
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'C') || "
+        "setweight(to_tsvector('simple', %s), 'B')"
+    )
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                "food_id bigint PRIMARY KEY REFERENCES menu_food(id) ON DELETE CASCADE "
+                "DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_gin "
+                f"ON {SEARCH_TABLE} USING gin (document)"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def index_foods(self, foods):
+        documents = self._documents(foods)
+        if not documents:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (food_id, document) VALUES (%s, {self.DOCUMENT_SQL}) "
+                "ON CONFLICT (food_id) DO UPDATE SET document = EXCLUDED.document",
+                documents,
+            )
+
+    def remove_foods(self, food_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE food_id = ANY(%s)", [list(food_ids)])
+
+    def rebuild(self):
+        document = self.DOCUMENT_SQL % ('f.name', "COALESCE(f.description, '')", 'c.name')
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (food_id, document) "
+                f"SELECT f.id, {document} "
+                "FROM menu_food f INNER JOIN menu_category c ON c.id = f.category_id"
+            )
+
+    def search(self, terms, limit=None, within=None):
+        tokens = tokenize(terms)
+        if not tokens:
+            return []
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        restriction, params = self._within('food_id', within)
+        sql = (
+            f"SELECT food_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+            f"WHERE document @@ query{restriction} ORDER BY ts_rank(document, query) DESC, food_id"
+        )
+        params = [query, *params]
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    connection = connections[using]
+    backend_class = BACKENDS.get(connection.vendor, NullSearchBackend)
+    return backend_class(connection)
+
+
+def search_limit():
+    return settings.MENU_SEARCH_LIMIT
@@ -2,6 +2,14 @@ from menu.serializers.category import CategorySerializer
 from menu.serializers.food import FoodSerializer, FoodDetailSerializer
 from menu.serializers.topping import ToppingSerializer
 from menu.serializers.food_topping import FoodToppingSerializer
+from menu.serializers.bulk import BulkAvailabilitySerializer, BulkDiscountSerializer, BulkPriceSerializer
+from menu.serializers.sync import (
+    SyncCategorySerializer,
+    SyncFoodImageSerializer,
+    SyncFoodSerializer,
+    SyncFoodToppingSerializer,
+    SyncToppingSerializer,
+)
 
 __all__ = [
     'CategorySerializer',
@@ -9,4 +17,12 @@ __all__ = [
     'FoodDetailSerializer',
     'ToppingSerializer',
     'FoodToppingSerializer',
+    'BulkAvailabilitySerializer',
+    'BulkDiscountSerializer',
+    'BulkPriceSerializer',
+    'SyncCategorySerializer',
+    'SyncFoodImageSerializer',
+    'SyncFoodSerializer',
+    'SyncFoodToppingSerializer',
+    'SyncToppingSerializer',
 ]
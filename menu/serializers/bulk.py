@@ -0,0 +1,42 @@
+from rest_framework import serializers
+from menu.enums import DiscountType
+from menu.managers.ordering import PRICE_ADJUSTMENTS
+
+
+class BulkChangeSerializer(serializers.Serializer):
+    """
+    Ids of the rows a bulk change applies to, plus the fields ``apply``
+    hands, in order, to the ``OrderingQuerySet`` method named by
+    ``queryset_method``.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000)
+    queryset_method = None
+    arguments = ()
+    
+    def apply(self, queryset):
+        return getattr(queryset, self.queryset_method)(*[self.validated_data[name] for name in self.arguments])
+
+
+class BulkDiscountSerializer(BulkChangeSerializer):
+    discount = serializers.FloatField(min_value=0)
+    discount_type = serializers.ChoiceField(
+        choices=[discount_type.value for discount_type in DiscountType],
+        default=DiscountType.PERCENTAGE.value,
+    )
+    queryset_method = 'apply_discount'
+    arguments = ('discount', 'discount_type')
+
+
+class BulkPriceSerializer(BulkChangeSerializer):
+    amount = serializers.DecimalField(max_digits=8, decimal_places=2)
+    adjustment = serializers.ChoiceField(choices=PRICE_ADJUSTMENTS)
+    queryset_method = 'adjust_price'
+    arguments = ('amount', 'adjustment')
+
+
+class BulkAvailabilitySerializer(BulkChangeSerializer):
+    is_available = serializers.BooleanField(default=True)
+    available_from = serializers.TimeField(default=None, allow_null=True)
+    available_to = serializers.TimeField(default=None, allow_null=True)
+    queryset_method = 'set_availability'
+    arguments = ('is_available', 'available_from', 'available_to')
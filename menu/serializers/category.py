@@ -1,16 +1,16 @@
 from rest_framework import serializers
 from menu.models import Category
+from menu.mixins.serializers import SparseFieldsetMixin
+from menu.serializers.fields import ImageSrcsetField
 
 
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    foods_count = serializers.SerializerMethodField()
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    foods_count = serializers.IntegerField(read_only=True)
+    icon_srcset = ImageSrcsetField('icon')
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'icon', 'foods_count', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'icon', 'icon_srcset', 'foods_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    def get_foods_count(self, obj):
-        return obj.foods.filter(is_available=True).count()
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+from menu.utils.images import is_stale, srcsets, variants_field
+
+
+class ImageSrcsetField(serializers.Field):
+    """
+    Format -> ``srcset`` of the resized variants of an image field, empty
+    until the variants have been generated.
+    """
+    
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, obj):
+        if not getattr(obj, self.image_field) or is_stale(obj, self.image_field):
+            return {}
+        request = self.context.get('request')
+        build_url = request.build_absolute_uri if request else None
+        return srcsets(getattr(obj, variants_field(self.image_field)), build_url)
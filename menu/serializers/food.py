@@ -1,20 +1,25 @@
 from rest_framework import serializers
 from menu.models import Food, FoodImage
+from menu.mixins.serializers import SparseFieldsetMixin
 from menu.serializers.category import CategorySerializer
 from menu.serializers.food_topping import FoodToppingSerializer
+from menu.serializers.fields import ImageSrcsetField
 
 
 
-class FoodImageSerializer(serializers.ModelSerializer):
+class FoodImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    srcset = ImageSrcsetField('image')
+    
     class Meta:
         model = FoodImage
-        fields = ['id', 'image', 'created_at', 'updated_at']
+        fields = ['id', 'image', 'srcset', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class FoodSerializer(serializers.ModelSerializer):
+class FoodSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=True)
-    final_price = serializers.SerializerMethodField()
+    final_price = serializers.DecimalField(max_digits=6, decimal_places=2, coerce_to_string=False, read_only=True)
+    header_image_srcset = ImageSrcsetField('header_image')
     images = FoodImageSerializer(many=True, read_only=True)
     toppings = serializers.SerializerMethodField()
     
@@ -22,26 +27,28 @@ class FoodSerializer(serializers.ModelSerializer):
         model = Food
         fields = [
             'id', 'category', 'category_id', 'name', 'description', 'price',
-            'final_price', 'header_image', 'images', 'toppings',
-            'is_available', 'discount', 'available_from', 'available_to',
+            'final_price', 'header_image', 'header_image_srcset', 'images', 'toppings',
+            'is_available', 'availability_status', 'discount', 'discount_type', 'available_from', 'available_to',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    def get_final_price(self, obj):
-        if obj.discount and obj.discount > 0:
-            return round(float(obj.price) * (1 - obj.discount / 100), 2)
-        return float(obj.price)
+        read_only_fields = ['id', 'availability_status', 'created_at', 'updated_at']
+        expandable_fields = ['category', 'images', 'toppings']
     
     def get_toppings(self, obj):
-        available_toppings = obj.food_toppings.filter(topping__is_available=True)
-        return FoodToppingSerializer(available_toppings, many=True).data
+        available_toppings = getattr(obj, 'available_food_toppings', None)
+        if available_toppings is None:
+            available_toppings = [
+                food_topping for food_topping in obj.food_toppings.all()
+                if food_topping.topping.is_available
+            ]
+        return self.nested_serializer('toppings', FoodToppingSerializer, available_toppings, many=True).data
 
 class FoodDetailSerializer(FoodSerializer):
     all_toppings = serializers.SerializerMethodField()
     
     class Meta(FoodSerializer.Meta):
         fields = FoodSerializer.Meta.fields + ['all_toppings']
+        expandable_fields = FoodSerializer.Meta.expandable_fields + ['all_toppings']
     
     def get_all_toppings(self, obj):
-        return FoodToppingSerializer(obj.food_toppings.all(), many=True).data
+        return self.nested_serializer('all_toppings', FoodToppingSerializer, obj.food_toppings.all(), many=True).data
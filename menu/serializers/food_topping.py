@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from menu.models import FoodTopping
+from menu.mixins.serializers import SparseFieldsetMixin
 from menu.serializers.topping import ToppingSerializer
 
 
 
-class FoodToppingSerializer(serializers.ModelSerializer):
+class FoodToppingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     topping = ToppingSerializer(read_only=True)
     topping_id = serializers.IntegerField(write_only=True, required=True)
     
@@ -0,0 +1,54 @@
+from rest_framework import serializers
+from menu.models import Category, Food, FoodImage, FoodTopping, Topping
+from menu.serializers.fields import ImageSrcsetField
+
+
+
+# Flat rows for /api/menu/changes/: related objects are referenced by id,
+# since clients already hold them or get them in the same response.
+class SyncCategorySerializer(serializers.ModelSerializer):
+    icon_srcset = ImageSrcsetField('icon')
+
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'description', 'icon', 'icon_srcset', 'updated_at']
+
+class SyncFoodSerializer(serializers.ModelSerializer):
+    category_id = serializers.IntegerField(read_only=True)
+    final_price = serializers.DecimalField(max_digits=6, decimal_places=2, coerce_to_string=False, read_only=True)
+    header_image_srcset = ImageSrcsetField('header_image')
+
+    class Meta:
+        model = Food
+        fields = [
+            'id', 'category_id', 'name', 'description', 'price', 'final_price', 'header_image', 'header_image_srcset',
+            'is_available', 'availability_status', 'discount', 'discount_type', 'available_from', 'available_to',
+            'updated_at',
+        ]
+
+class SyncToppingSerializer(serializers.ModelSerializer):
+    final_price = serializers.DecimalField(max_digits=6, decimal_places=2, coerce_to_string=False, read_only=True)
+
+    class Meta:
+        model = Topping
+        fields = [
+            'id', 'name', 'description', 'price', 'final_price',
+            'is_available', 'availability_status', 'discount', 'discount_type', 'available_from', 'available_to',
+            'updated_at',
+        ]
+
+class SyncFoodImageSerializer(serializers.ModelSerializer):
+    food_id = serializers.IntegerField(read_only=True)
+    srcset = ImageSrcsetField('image')
+
+    class Meta:
+        model = FoodImage
+        fields = ['id', 'food_id', 'image', 'srcset', 'updated_at']
+
+class SyncFoodToppingSerializer(serializers.ModelSerializer):
+    food_id = serializers.IntegerField(read_only=True)
+    topping_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = FoodTopping
+        fields = ['id', 'food_id', 'topping_id', 'updated_at']
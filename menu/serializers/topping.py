@@ -1,22 +1,18 @@
 from rest_framework import serializers
 from menu.models import Topping
+from menu.mixins.serializers import SparseFieldsetMixin
 
 
 
 
-class ToppingSerializer(serializers.ModelSerializer):
-    final_price = serializers.SerializerMethodField()
+class ToppingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    final_price = serializers.DecimalField(max_digits=6, decimal_places=2, coerce_to_string=False, read_only=True)
     
     class Meta:
         model = Topping
         fields = [
             'id', 'name', 'description', 'price', 'final_price',
-            'is_available', 'discount', 'available_from', 'available_to',
+            'is_available', 'availability_status', 'discount', 'discount_type', 'available_from', 'available_to',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    def get_final_price(self, obj):
-        if obj.discount and obj.discount > 0:
-            return round(float(obj.price) * (1 - obj.discount / 100), 2)
-        return float(obj.price)
+        read_only_fields = ['id', 'availability_status', 'created_at', 'updated_at']
\ No newline at end of file
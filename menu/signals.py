@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from menu.enums import MenuEventAction
+from menu.events import event_item, record_menu_event
+from menu.jobs import enqueue
+from menu.models import Category, Food, FoodImage, FoodTopping, Topping, Tombstone
+from menu.search import get_search_backend
+from menu.utils.images import delete_variants, is_stale, variants_field
+from menu.utils.fragments import fragment_cache_is_shared, invalidate_category_fragments, invalidate_food_fragments
+from menu.utils.snapshot import invalidate_menu_snapshot
+
+MENU_MODELS = (Category, Food, FoodImage, FoodTopping, Topping)
+IMAGE_MODELS = (Category, Food, FoodImage)
+EVENT_MODELS = (Food, Topping, FoodTopping)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_menu_on_change(sender, **kwargs):
+    if sender not in MENU_MODELS:
+        return
+    invalidate_menu_snapshot()
+    # Readers racing the open transaction may rebuild from the old rows, so
+    # invalidate once more after the change is actually visible.
+    transaction.on_commit(invalidate_menu_snapshot)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def schedule_menu_cache_warming(sender, **kwargs):
+    if sender not in MENU_MODELS or not fragment_cache_is_shared():
+        return
+    # A burst of admin saves collapses into the one pending warm-up job.
+    enqueue('menu.warm_menu_cache', delay=settings.MENU_JOB_BATCH_DELAY)
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, **kwargs):
+    if sender not in MENU_MODELS:
+        return
+    Tombstone.objects.create(model_name=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_save)
+def record_change_event(sender, instance, created, raw=False, **kwargs):
+    if sender not in EVENT_MODELS or raw:
+        return
+    if created:
+        record_menu_event(sender, MenuEventAction.CREATED, [event_item(instance)], instance._state.db)
+    elif sender is not FoodTopping:
+        changed = instance.changed_fields()
+        if changed:
+            record_menu_event(sender, MenuEventAction.UPDATED, [event_item(instance, changed)], instance._state.db)
+    if sender is not FoodTopping:
+        instance.remember_tracked_fields()
+
+
+@receiver(post_delete)
+def record_delete_event(sender, instance, **kwargs):
+    if sender not in EVENT_MODELS:
+        return
+    record_menu_event(sender, MenuEventAction.DELETED, [{'id': instance.pk}], instance._state.db)
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+def invalidate_food_card(sender, instance, **kwargs):
+    invalidate_food_fragments(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_section(sender, instance, **kwargs):
+    invalidate_category_fragments(instance)
+
+
+@receiver(post_save, sender=Food)
+def index_food(sender, instance, **kwargs):
+    get_search_backend(instance._state.db).index_foods([instance])
+
+
+@receiver(post_delete, sender=Food)
+def unindex_food(sender, instance, **kwargs):
+    get_search_backend(instance._state.db).remove_foods([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_foods(sender, instance, created, **kwargs):
+    if not created and 'name' in instance.changed_fields():
+        enqueue('menu.reindex_category', {'pk': instance.pk, 'using': instance._state.db})
+    instance.remember_tracked_fields()
+
+
+@receiver(post_save)
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    if sender not in IMAGE_MODELS or raw:
+        return
+    if any(is_stale(instance, field_name) for field_name in instance.variant_image_fields):
+        enqueue('menu.generate_image_variants', {'model': sender._meta.label, 'pk': instance.pk})
+
+
+@receiver(post_delete)
+def delete_image_variants(sender, instance, **kwargs):
+    if sender not in IMAGE_MODELS:
+        return
+    for field_name in instance.variant_image_fields:
+        delete_variants(getattr(instance, variants_field(field_name)))
@@ -1,28 +1,48 @@
 from django import template
-from menu.utils.availability import is_food_available
-from menu.utils.pricing import calculate_final_price
+from django.utils.html import format_html_join
+from menu.enums import DiscountType
+from menu.utils.fragments import render_category_section
+from menu.utils.images import image_url, is_stale, srcsets, variants_field
 
 register = template.Library()
 
 
-@register.filter
-def final_price(price, discount):
-    return calculate_final_price(price, discount)
-
 @register.filter
 def has_discount(discount):
     return discount and discount > 0
 
-@register.filter
-def is_available(food):
-    return is_food_available(food)
-
 @register.filter
 def format_price(price):
     return f"€{price:.2f}"
 
 @register.filter
-def format_discount(discount):
+def format_discount(discount, discount_type=DiscountType.PERCENTAGE.value):
     if discount and discount > 0:
+        if discount_type == DiscountType.FIXED.value:
+            return f"-€{discount:.2f}"
         return f"-{discount}%"
-    return ""
\ No newline at end of file
+    return ""
+
+@register.simple_tag
+def render_menu_section(section):
+    return render_category_section(section)
+
+@register.simple_tag
+def image_variant(obj, field_name, variant):
+    return image_url(obj, field_name, variant) or ''
+
+@register.simple_tag
+def image_sources(obj, field_name, sizes):
+    """
+    ``<source>`` elements for a ``<picture>``, one per generated format.
+    """
+    if not getattr(obj, field_name) or is_stale(obj, field_name):
+        return ''
+    return format_html_join(
+        '',
+        '<source type="image/{}" srcset="{}" sizes="{}">',
+        (
+            (fmt, value, sizes)
+            for fmt, value in srcsets(getattr(obj, variants_field(field_name))).items()
+        ),
+    )
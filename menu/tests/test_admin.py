@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from menu.models import Category, Food, FoodTopping, Topping
+from menu.utils.pagination import EstimatedCountPaginator, estimated_row_count
+
+
+class AdminChangelistQueryTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.added = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            index = self.added = self.added + 1
+            category = Category.objects.create(name=f"Category {index}")
+            food = Food.objects.create(category=category, name=f"Food {index}", price=10, discount=index % 3)
+            topping = Topping.objects.create(name=f"Topping {index}", price=1, available_from='10:00')
+            FoodTopping.objects.create(food=food, topping=topping)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for name in ('category', 'food', 'topping', 'foodtopping'):
+            with self.subTest(model=name):
+                url = reverse(f'admin:menu_{name}_changelist')
+                self.add_rows(2)
+                few = self.count_queries(url)
+                self.add_rows(8)
+                self.assertEqual(self.count_queries(url), few)
+
+    def test_status_column(self):
+        self.add_rows(1)
+        Food.objects.update(is_available=False)
+        response = self.client.get(reverse('admin:menu_food_changelist'), {'o': '7'})
+        self.assertContains(response, 'Unavailable')
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Pizzas")
+        Food.objects.bulk_create([Food(category=category, name=f"Food {index}", price=1) for index in range(30)])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_estimate(self):
+        self.assertEqual(estimated_row_count(Food), 30)
+
+    @override_settings(MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD=10)
+    def test_large_unfiltered_table_is_estimated(self):
+        Food.objects.filter(name="Food 0").delete()
+        # The statistics are stale until the next ANALYZE.
+        self.assertEqual(EstimatedCountPaginator(Food.objects.all(), 10).count, 30)
+        self.assertEqual(EstimatedCountPaginator(Food.objects.filter(price=1), 10).count, 29)
+
+    @override_settings(MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD=100)
+    def test_small_table_is_counted(self):
+        Food.objects.filter(name="Food 0").delete()
+        self.assertEqual(EstimatedCountPaginator(Food.objects.all(), 10).count, 29)
+
+    @override_settings(MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD=10)
+    def test_changelist_skips_full_count(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin:menu_food_changelist'))
+        self.assertContains(response, '30 foods')
+        self.assertFalse([query for query in context.captured_queries if 'COUNT(*)' in query['sql'] and 'menu_food' in query['sql']])
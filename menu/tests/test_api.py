@@ -1,8 +1,16 @@
-from django.test import TestCase
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from menu.models import Category, Food, Topping
+import json
+from menu.jobs import run_pending_jobs
+from menu.models import Category, Food, Topping, FoodTopping, FoodImage
+from menu.search import get_search_backend
+from menu.utils.snapshot import get_menu_snapshot
 
 
 
@@ -44,6 +52,24 @@ class CategoryAPITest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['foods_count'], 1)
+    
+    def test_category_foods_count_ignores_unavailable_foods(self):
+        Food.objects.create(category=self.category, name="Hidden Food", price=5.00, is_available=False)
+        url = reverse('category-list')
+        response = self.client.get(url)
+        data = response.data['results'] if 'results' in response.data else response.data
+        self.assertEqual(data[0]['foods_count'], 1)
+    
+    def test_list_categories_query_count_is_constant(self):
+        for index in range(10):
+            category = Category.objects.create(name=f"Category {index}")
+            Food.objects.create(category=category, name=f"Food {index}", price=1.00)
+        url = reverse('category-list')
+        get_menu_snapshot()
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        data = response.data['results'] if 'results' in response.data else response.data
+        self.assertEqual(len(data), 11)
 
 class FoodAPITest(TestCase):
     def setUp(self):
@@ -80,6 +106,17 @@ class FoodAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['final_price'], 8.00)
     
+    def test_food_final_price_with_fixed_discount(self):
+        self.food.discount = 2.5
+        self.food.discount_type = 'fixed'
+        self.food.save()
+        url = reverse('food-list')
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['final_price'], 7.50)
+        response = self.client.get(reverse('menu_list'))
+        self.assertContains(response, "€7.50")
+        self.assertContains(response, "-€2.50")
+    
     def test_food_filter_by_category(self):
         url = reverse('food-list')
         response = self.client.get(url, {'category': self.category.id})
@@ -94,12 +131,117 @@ class FoodAPITest(TestCase):
         data = response.data['results'] if 'results' in response.data else response.data
         self.assertEqual(len(data), 1)
     
+    def test_food_list_conditional_get(self):
+        url = reverse('food-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, {'search': 'Test'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
     def test_food_by_category_action(self):
         url = reverse('food-by-category')
         response = self.client.get(url, {'category_id': self.category.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
 
+class FoodFinalPriceAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Test Category")
+        Food.objects.create(category=self.category, name="Cheap", price=4.00)
+        Food.objects.create(category=self.category, name="Discounted", price=20.00, discount=90)
+        Food.objects.create(category=self.category, name="Expensive", price=15.00)
+    
+    def names(self, **params):
+        response = self.client.get(reverse('food-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [food['name'] for food in response.data['results']]
+    
+    def test_order_by_final_price(self):
+        self.assertEqual(self.names(ordering='final_price'), ["Discounted", "Cheap", "Expensive"])
+        self.assertEqual(self.names(ordering='-final_price'), ["Expensive", "Cheap", "Discounted"])
+    
+    def test_final_price_range(self):
+        self.assertEqual(self.names(min_price="2", max_price="10", ordering="name"), ["Cheap", "Discounted"])
+        self.assertEqual(self.names(min_price='5'), ["Expensive"])
+    
+    def test_invalid_final_price_range(self):
+        for params in ({'min_price': 'cheap'}, {'min_price': 'NaN'}, {'max_price': 'Infinity'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('food-list'), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json(), {next(iter(params)): 'A valid number is required.'})
+
+class FoodSearchAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.pizzas = Category.objects.create(name="Pizzas")
+        self.drinks = Category.objects.create(name="Drinks")
+        self.margherita = Food.objects.create(
+            category=self.pizzas,
+            name="Margherita",
+            description="Tomato, mozzarella and basil",
+            price=9.00
+        )
+        self.bruschetta = Food.objects.create(
+            category=self.drinks,
+            name="Lemonade",
+            description="Fresh lemons, with a basil leaf",
+            price=3.00
+        )
+    
+    def search(self, terms, **params):
+        response = self.client.get(reverse('food-list'), {'search': terms, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [food['name'] for food in response.data['results']]
+    
+    def test_prefix_search(self):
+        self.assertEqual(self.search('marg'), ["Margherita"])
+        self.assertEqual(self.search('tom mozz'), ["Margherita"])
+    
+    def test_search_by_category_name(self):
+        self.assertEqual(self.search('drink'), ["Lemonade"])
+    
+    def test_search_is_ranked(self):
+        self.bruschetta.name = "Basil Lemonade"
+        self.bruschetta.save()
+        self.assertEqual(self.search('basil'), ["Basil Lemonade", "Margherita"])
+        self.assertEqual(self.search('basil', ordering='price'), ["Basil Lemonade", "Margherita"])
+        self.assertEqual(self.search('basil', ordering='-price'), ["Margherita", "Basil Lemonade"])
+    
+    def test_index_follows_changes(self):
+        self.pizzas.name = "Pies"
+        self.pizzas.save()
+        # Reindexing a renamed category's foods is a background job.
+        run_pending_jobs()
+        self.assertEqual(self.search('pies'), ["Margherita"])
+        self.margherita.delete()
+        self.assertEqual(self.search('pies'), [])
+    
+    def test_search_ignores_punctuation(self):
+        self.assertEqual(self.search('"marg*'), ["Margherita"])
+        self.assertEqual(self.search('***'), ["Lemonade", "Margherita"])
+    
+    def test_unsupported_database_falls_back_to_icontains(self):
+        with mock.patch.object(connection, 'vendor', 'other'):
+            self.assertFalse(get_search_backend().supported)
+            self.assertEqual(self.search('lemons'), ["Lemonade"])
+            self.assertEqual(self.search('marg'), ["Margherita"])
+    
+    @override_settings(MENU_SEARCH_LIMIT=1)
+    def test_search_limit_applies_after_filters(self):
+        self.bruschetta.name = "Basil Lemonade"
+        self.bruschetta.save()
+        self.assertEqual(self.search('basil'), ["Basil Lemonade"])
+        self.assertEqual(self.search('basil', category=self.pizzas.pk), ["Margherita"])
+        self.assertEqual(self.search('basil', min_price=5), ["Margherita"])
+        self.bruschetta.is_available = False
+        self.bruschetta.save()
+        self.assertEqual(self.search('basil'), ["Margherita"])
+
 class ToppingAPITest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -132,3 +274,112 @@ class ToppingAPITest(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['final_price'], 2.25)
+
+class MenuStreamAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Test Category", description='Quotes "and" ünïcode')
+        self.food = Food.objects.create(
+            category=self.category,
+            name="Test Food",
+            price=10.00,
+            discount=20
+        )
+        FoodImage.objects.create(food=self.food)
+        self.topping = Topping.objects.create(name="Test Topping", price=2.50)
+        FoodTopping.objects.create(food=self.food, topping=self.topping)
+        Food.objects.create(category=self.category, name="Hidden Food", price=1.00, is_available=False)
+        Category.objects.create(name="Empty Category")
+    
+    def get_menu(self, **params):
+        response = self.client.get(reverse('menu-stream'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+    
+    def test_stream_full_menu(self):
+        data = self.get_menu()
+        self.assertEqual(len(data['categories']), 1)
+        category = data['categories'][0]
+        self.assertEqual(category['description'], 'Quotes "and" ünïcode')
+        self.assertEqual([food['name'] for food in category['foods']], ["Test Food"])
+        food = category['foods'][0]
+        self.assertEqual(food['price'], '10.00')
+        self.assertEqual(food['final_price'], 8.0)
+        self.assertEqual(len(food['images']), 1)
+        self.assertEqual(food['toppings'][0]['name'], "Test Topping")
+    
+    def test_stream_matches_food_detail(self):
+        food = self.get_menu()['categories'][0]['foods'][0]
+        detail = self.client.get(reverse('food-detail', args=[self.food.id])).data
+        for field in ('id', 'name', 'description', 'price', 'final_price', 'discount', 'is_available'):
+            self.assertEqual(food[field], detail[field])
+    
+    def test_stream_without_availability_filter(self):
+        data = self.get_menu(available_only='false')
+        categories = {category['name']: category for category in data['categories']}
+        self.assertEqual(len(categories), 2)
+        self.assertEqual(len(categories["Test Category"]['foods']), 2)
+
+class SparseFieldsetAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Test Category")
+        self.food = Food.objects.create(category=self.category, name="Test Food", price=10.00, discount=20)
+        FoodImage.objects.create(food=self.food)
+        self.topping = Topping.objects.create(name="Test Topping", price=2.50)
+        FoodTopping.objects.create(food=self.food, topping=self.topping)
+    
+    def get_foods(self, **params):
+        response = self.client.get(reverse('food-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+    
+    def test_fields(self):
+        food = self.get_foods(fields='id,name,final_price')[0]
+        self.assertEqual(food, {'id': self.food.id, 'name': "Test Food", 'final_price': 8.0})
+    
+    def test_nested_fields(self):
+        food = self.get_foods(fields='id,category.name')[0]
+        self.assertEqual(food, {'id': self.food.id, 'category': {'name': "Test Category"}})
+    
+    def test_expand(self):
+        food = self.get_foods(expand='category')[0]
+        self.assertEqual(food['category']['name'], "Test Category")
+        self.assertNotIn('images', food)
+        self.assertNotIn('toppings', food)
+        self.assertIn('updated_at', food)
+        self.assertEqual(set(self.get_foods()[0]) - set(food), {'images', 'toppings'})
+    
+    def test_unrequested_relations_are_not_queried(self):
+        self.get_foods()
+        with self.assertNumQueries(2):
+            self.get_foods(fields='id,name')
+        with self.assertNumQueries(3):
+            self.get_foods(fields='id,name', expand='images')
+    
+    def test_categories_skip_foods_count(self):
+        get_menu_snapshot()
+        with self.assertNumQueries(2) as context:
+            response = self.client.get(reverse('category-list'), {'fields': 'id,name'})
+        self.assertEqual(response.data['results'], [{'id': self.category.id, 'name': "Test Category"}])
+        self.assertNotIn('COUNT(', context.captured_queries[1]['sql'].split('FROM')[0])
+    
+    def test_detail_fields(self):
+        response = self.client.get(reverse('food-detail', args=[self.food.id]), {'fields': 'name,all_toppings.topping.name'})
+        self.assertEqual(response.data, {'name': "Test Food", 'all_toppings': [{'topping': {'name': "Test Topping"}}]})
+    
+    def test_compact_json(self):
+        response = self.client.get(reverse('food-list'), {'format': 'compact', 'fields': 'id,description,header_image_srcset,name'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, b'{"count":1,"results":[{"id":%d,"name":"Test Food"}]}' % self.food.id)
+    
+    @skipUnless(find_spec('msgpack'), "msgpack is not installed")
+    def test_msgpack(self):
+        import msgpack
+        response = self.client.get(reverse('food-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(data['results'][0]['final_price'], 8.0)
+        self.assertEqual(data['results'][0]['price'], '10.00')
+        self.assertEqual(data['results'], json.loads(self.client.get(reverse('food-list')).content)['results'])
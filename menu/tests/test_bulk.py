@@ -0,0 +1,192 @@
+from datetime import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from menu.enums import AvailabilityStatus, DiscountType
+from menu.models import Category, Food, Topping
+from menu.utils.snapshot import get_menu_snapshot
+
+
+class BulkChangeTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizzas")
+        self.foods = [
+            Food.objects.create(category=self.category, name=f"Food {index}", price=price)
+            for index, price in enumerate(('10.00', '4.99', '20.00'))
+        ]
+        self.queryset = Food.objects.filter(pk__in=[food.pk for food in self.foods])
+
+    def final_prices(self):
+        return list(self.queryset.order_by('pk').values_list('final_price', flat=True))
+
+    def test_discount_is_one_update(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.queryset.apply_discount(10), 3)
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.final_prices(), [Decimal('9.00'), Decimal('4.49'), Decimal('18.00')])
+
+    def test_final_price_matches_save(self):
+        self.queryset.apply_discount(12.5)
+        for food in self.queryset:
+            final_price = food.final_price
+            food.save()
+            food.refresh_from_db()
+            self.assertEqual(food.final_price, final_price)
+
+    def test_fixed_discount(self):
+        self.queryset.apply_discount(2, DiscountType.FIXED.value)
+        self.assertEqual(self.final_prices(), [Decimal('8.00'), Decimal('2.99'), Decimal('18.00')])
+
+    def test_invalid_discount_changes_nothing(self):
+        cases = (
+            (-1, DiscountType.PERCENTAGE.value),
+            (101, DiscountType.PERCENTAGE.value),
+            (5, DiscountType.FIXED.value),
+            (float('nan'), DiscountType.PERCENTAGE.value),
+            (float('inf'), DiscountType.FIXED.value),
+        )
+        for value, discount_type in cases:
+            with self.subTest(value=value, discount_type=discount_type):
+                with self.assertRaises(ValueError):
+                    self.queryset.apply_discount(value, discount_type)
+                self.assertFalse(self.queryset.filter(discount__gt=0).exists())
+
+    def test_adjust_price(self):
+        self.queryset.filter(pk=self.foods[0].pk).apply_discount(50)
+        self.queryset.adjust_price(10)
+        self.assertEqual(
+            list(self.queryset.order_by('pk').values_list('price', flat=True)),
+            [Decimal('11.00'), Decimal('5.49'), Decimal('22.00')],
+        )
+        self.assertEqual(self.final_prices(), [Decimal('5.50'), Decimal('5.49'), Decimal('22.00')])
+
+        self.queryset.adjust_price('-1.50', 'fixed')
+        self.assertEqual(self.final_prices(), [Decimal('4.75'), Decimal('3.99'), Decimal('20.50')])
+
+    def test_adjust_price_out_of_range(self):
+        with self.assertRaisesMessage(ValueError, "Price cannot be negative"):
+            self.queryset.adjust_price(-5, 'fixed')
+        with self.assertRaisesMessage(ValueError, "Price cannot exceed 9999.99"):
+            self.queryset.adjust_price(50000)
+        self.assertEqual(self.final_prices(), [Decimal('10.00'), Decimal('4.99'), Decimal('20.00')])
+
+    def test_set_availability(self):
+        Topping.objects.create(name="Cheese", price=1)
+        Topping.objects.all().set_availability(False)
+        self.assertEqual(Topping.objects.get().availability_status, AvailabilityStatus.UNAVAILABLE.value)
+
+        self.queryset.set_availability(True, time(11), time(15))
+        self.assertEqual(
+            set(self.queryset.values_list('availability_status', flat=True)),
+            {AvailabilityStatus.TIME_RESTRICTED.value},
+        )
+
+    def test_plain_update_recomputes_stored_columns(self):
+        updated_at = self.foods[0].updated_at
+        self.queryset.update(discount=2, discount_type=DiscountType.FIXED.value)
+        self.assertEqual(self.final_prices(), [Decimal('8.00'), Decimal('2.99'), Decimal('18.00')])
+        self.queryset.update(price=F('price') * 2)
+        self.assertEqual(self.final_prices(), [Decimal('18.00'), Decimal('7.98'), Decimal('38.00')])
+        self.queryset.update(available_from=time(11), available_to=None)
+        self.assertEqual(
+            set(self.queryset.values_list('availability_status', flat=True)),
+            {AvailabilityStatus.TIME_RESTRICTED.value},
+        )
+        self.queryset.filter(pk=self.foods[0].pk).update(is_available=False)
+        for food in self.queryset:
+            final_price, status = food.final_price, food.availability_status
+            food.save()
+            self.assertEqual((food.final_price, food.availability_status), (final_price, status))
+        self.foods[0].refresh_from_db()
+        self.assertEqual(self.foods[0].availability_status, AvailabilityStatus.UNAVAILABLE.value)
+        self.assertGreater(self.foods[0].updated_at, updated_at)
+
+    def test_invalidates_snapshot_and_bumps_updated_at(self):
+        before = get_menu_snapshot()
+        updated_at = self.foods[0].updated_at
+        self.queryset.apply_discount(10)
+        self.foods[0].refresh_from_db()
+        self.assertGreater(self.foods[0].updated_at, updated_at)
+        snapshot = get_menu_snapshot()
+        self.assertNotEqual(snapshot.version, before.version)
+        self.assertEqual(snapshot.get_food(self.foods[0].pk).final_price, Decimal('9.00'))
+
+
+class BulkChangeAdminTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=category, name="Margherita", price=10)
+
+    def test_discount_action(self):
+        url = reverse('admin:menu_food_changelist')
+        data = {'action': 'bulk_discount', '_selected_action': [self.food.pk]}
+        response = self.client.post(url, data)
+        self.assertContains(response, 'name="discount"')
+        self.assertContains(response, '1 foods selected.')
+
+        response = self.client.post(url, {**data, 'apply': '1', 'discount': '20', 'discount_type': 'percentage'})
+        self.assertRedirects(response, url)
+        self.food.refresh_from_db()
+        self.assertEqual(self.food.final_price, Decimal('8.00'))
+
+    def test_invalid_values_are_reported(self):
+        url = reverse('admin:menu_topping_changelist')
+        topping = Topping.objects.create(name="Cheese", price=1)
+        response = self.client.post(url, {
+            'action': 'bulk_discount', '_selected_action': [topping.pk], 'apply': '1',
+            'discount': '5', 'discount_type': 'fixed',
+        }, follow=True)
+        self.assertContains(response, "Fixed discount cannot exceed the price")
+        topping.refresh_from_db()
+        self.assertEqual(topping.discount, 0)
+
+
+class BulkChangeAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=category, name="Margherita", price=10)
+        self.url = reverse('food-bulk-price')
+
+    def test_requires_staff(self):
+        response = self.client.post(self.url, {'ids': [self.food.pk], 'amount': 10, 'adjustment': 'percent'}, format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_bulk_price(self):
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', is_staff=True))
+        response = self.client.post(self.url, {'ids': [self.food.pk], 'amount': 10, 'adjustment': 'percent'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 1})
+        self.food.refresh_from_db()
+        self.assertEqual(self.food.final_price, Decimal('11.00'))
+
+        response = self.client.post(self.url, {'ids': [self.food.pk], 'amount': -20, 'adjustment': 'fixed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ["Price cannot be negative"])
+
+    def test_bulk_discount_rejects_non_finite_values(self):
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', is_staff=True))
+        for value in ('nan', 'inf'):
+            with self.subTest(value=value):
+                response = self.client.post(reverse('food-bulk-discount'), {'ids': [self.food.pk], 'discount': value}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data['non_field_errors'], ["Discount must be a finite number"])
+        self.food.refresh_from_db()
+        self.assertEqual(self.food.final_price, Decimal('10.00'))
+
+    def test_bulk_availability(self):
+        self.client.force_authenticate(get_user_model().objects.create_user('staff', is_staff=True))
+        response = self.client.post(reverse('food-bulk-availability'), {'ids': [self.food.pk], 'is_available': False}, format='json')
+        self.assertEqual(response.data, {'updated': 1})
+        self.food.refresh_from_db()
+        self.assertFalse(self.food.is_available)
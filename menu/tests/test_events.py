@@ -0,0 +1,167 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from menu.events import MenuEventStream
+from menu.jobs.tasks import prune_menu_events
+from menu.models import Category, Food, FoodTopping, MenuEvent, Topping
+from menu.utils.snapshot import get_menu_snapshot
+
+
+def parse_messages(text):
+    messages = []
+    for block in text.strip().split('\n\n'):
+        message = {}
+        for line in block.splitlines():
+            field, _, value = line.partition(': ')
+            message[field] = value
+        if 'data' in message:
+            message['data'] = json.loads(message['data'])
+        messages.append(message)
+    return messages
+
+
+class MenuEventLogTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=self.category, name="Margherita", price='9.00')
+        self.topping = Topping.objects.create(name="Cheese", price='1.50')
+
+    def last_event(self):
+        return MenuEvent.objects.order_by('-pk').first()
+
+    def test_create_records_full_item(self):
+        event = MenuEvent.objects.get(model_name='food')
+        self.assertEqual(event.action, 'created')
+        item = event.items[0]
+        self.assertEqual((item['id'], item['name'], item['price'], item['final_price']), (self.food.pk, "Margherita", '9.00', 9.0))
+
+    def test_update_records_changed_fields_only(self):
+        self.food.discount = 10
+        self.food.save()
+        event = self.last_event()
+        self.assertEqual(event.action, 'updated')
+        self.assertEqual(event.items, [{'id': self.food.pk, 'discount': 10.0, 'final_price': 8.1}])
+
+    def test_untouched_save_records_nothing(self):
+        count = MenuEvent.objects.count()
+        self.food.description = "Tomato and mozzarella"
+        self.food.save()
+        Food.objects.get(pk=self.food.pk).save()
+        self.assertEqual(MenuEvent.objects.count(), count)
+
+    def test_delete_and_links(self):
+        link = FoodTopping.objects.create(food=self.food, topping=self.topping)
+        self.assertEqual(self.last_event().items, [{'id': link.pk, 'food_id': self.food.pk, 'topping_id': self.topping.pk}])
+        self.topping.delete()
+        events = list(MenuEvent.objects.order_by('-pk')[:2])
+        self.assertEqual(
+            {(event.model_name, event.action) for event in events},
+            {('foodtopping', 'deleted'), ('topping', 'deleted')},
+        )
+
+    def test_bulk_change_records_one_event(self):
+        second = Food.objects.create(category=self.category, name="Marinara", price='7.00')
+        Food.objects.filter(pk__in=[self.food.pk, second.pk]).set_availability(False)
+        event = self.last_event()
+        self.assertEqual(event.action, 'updated')
+        self.assertEqual(
+            sorted((item['id'], item['is_available'], item['availability_status']) for item in event.items),
+            [(self.food.pk, False, 'unavailable'), (second.pk, False, 'unavailable')],
+        )
+
+    def test_bulk_create_and_update(self):
+        foods = Food.objects.bulk_create([
+            Food(category=self.category, name=f"Food {index}", price='5.00') for index in range(3)
+        ])
+        self.assertEqual(len(self.last_event().items), 3)
+        for food in foods:
+            food.price = '6.00'
+        Food.objects.bulk_update(foods, ['price'])
+        self.assertEqual(
+            self.last_event().items[0],
+            {'id': foods[0].pk, 'price': '6.00', 'final_price': 6.0, 'availability_status': 'available'},
+        )
+
+    @override_settings(MENU_EVENTS_RETENTION=60)
+    def test_prune(self):
+        MenuEvent.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        latest = self.last_event().pk
+        prune_menu_events()
+        self.assertEqual(list(MenuEvent.objects.values_list('pk', flat=True)), [latest])
+
+
+class MenuEventStreamTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=self.category, name="Margherita", price='9.00')
+
+    def test_new_client_starts_at_latest_event(self):
+        stream = MenuEventStream()
+        latest = MenuEvent.objects.order_by('-pk').first().pk
+        messages = stream.start(latest, 1)
+        self.assertEqual(messages[-1], f'id: {latest}\n\n')
+        self.assertEqual(list(stream.query(MenuEvent.objects)), [])
+
+    def test_pruned_cursor_resets(self):
+        stream = MenuEventStream(last_event_id=3)
+        messages = parse_messages(''.join(stream.start(latest_id=50, oldest_id=10)))
+        self.assertEqual(messages[1]['event'], 'reset')
+        self.assertEqual(stream.cursor, 50)
+
+    @override_settings(MENU_EVENTS_GAP_TIMEOUT=5)
+    def test_late_commits_fill_gaps(self):
+        stream = MenuEventStream(last_event_id=1)
+        events = {pk: MenuEvent(pk=pk, model_name='food', action='updated', items=[]) for pk in range(2, 6)}
+        stream.event_messages([events[2], events[5]], now=100)
+        self.assertEqual(set(stream.gaps), {3, 4})
+        messages = parse_messages(''.join(stream.event_messages([events[3]], now=101)))
+        self.assertEqual([message['id'] for message in messages], ['3', '5'])
+        self.assertEqual(set(stream.gaps), {4})
+        stream.event_messages([], now=106)
+        self.assertEqual(stream.gaps, {})
+
+    @override_settings(MENU_EVENTS_MAX_GAPS=10)
+    def test_gaps_are_bounded(self):
+        stream = MenuEventStream(last_event_id=0)
+        event = MenuEvent(pk=10 ** 6, model_name='food', action='updated', items=[])
+        stream.event_messages([event], now=100)
+        self.assertEqual(sorted(stream.gaps), list(range(10 ** 6 - 10, 10 ** 6)))
+        for pk in (10 ** 6 + 5, 10 ** 6 + 9):
+            stream.event_messages([MenuEvent(pk=pk, model_name='food', action='updated', items=[])], now=100)
+        self.assertEqual(len(stream.gaps), 10)
+        self.assertEqual(min(stream.gaps), 10 ** 6 - 3)
+
+    def test_availability_diffs(self):
+        stream = MenuEventStream()
+        first = parse_messages(''.join(stream.availability_messages(get_menu_snapshot())))
+        self.assertEqual(first[0]['data'], {'full': True, 'foods': {'available': [self.food.pk]}, 'toppings': {'available': []}})
+        self.assertEqual(stream.availability_messages(get_menu_snapshot()), [])
+        self.food.is_available = False
+        self.food.save()
+        diff = parse_messages(''.join(stream.availability_messages(get_menu_snapshot())))
+        self.assertEqual(diff[0]['data']['foods'], {'available': [], 'unavailable': [self.food.pk]})
+
+    def test_sync_view_polls_once(self):
+        last_event_id = MenuEvent.objects.order_by('-pk').first().pk
+        self.food.price = '10.00'
+        self.food.save()
+        response = self.client.get(reverse('menu-events'), headers={'last-event-id': str(last_event_id)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        messages = parse_messages(b''.join(response.streaming_content).decode())
+        self.assertEqual(messages[0], {'retry': '3000'})
+        update = next(message for message in messages if message.get('event') == 'food.updated')
+        self.assertEqual(update['data']['items'], [{'id': self.food.pk, 'price': '10.00', 'final_price': 10.0}])
+        self.assertEqual(messages[-1]['event'], 'availability')
+
+    @override_settings(MENU_EVENTS_POLL_INTERVAL=0, MENU_EVENTS_MAX_DURATION=0)
+    async def test_async_stream(self):
+        response = await self.async_client.get(reverse('menu-events'), headers={'last-event-id': '0'})
+        self.assertTrue(response.is_async)
+        text = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        events = [message.get('event') for message in parse_messages(text)]
+        self.assertIn('food.created', events)
+        self.assertEqual(events[-1], 'availability')
@@ -0,0 +1,151 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from menu.models import Category, Food, FoodImage
+from menu.utils.images import image_formats, image_url, is_stale
+
+
+def make_image(name='food.png', size=(800, 600), color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageVariantTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(
+            MEDIA_ROOT=self.media_root, MENU_IMAGE_FORMATS=['webp'], MENU_JOBS_EAGER=True,
+        )
+        self.override.enable()
+        self.category = Category.objects.create(name="Test Category")
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+
+class ImageVariantTest(ImageVariantTestCase):
+    def test_variants_generated_on_upload(self):
+        food = Food.objects.create(category=self.category, name="Pizza", price=10.00, header_image=make_image())
+        food.refresh_from_db()
+        variants = food.header_image_variants['variants']
+        self.assertEqual(food.header_image_variants['source'], food.header_image.name)
+        self.assertEqual({name: entry['width'] for name, entry in variants.items()}, {'thumb': 160, 'card': 480, 'full': 800})
+        for entry in variants.values():
+            self.assertTrue(default_storage.exists(entry['webp']))
+            with default_storage.open(entry['webp']) as variant:
+                image = Image.open(variant)
+                self.assertEqual((image.format, image.width), ('WEBP', entry['width']))
+        self.assertEqual(image_url(food, 'header_image', 'thumb'), default_storage.url(variants['thumb']['webp']))
+
+    def test_replaced_and_cleared_image(self):
+        food = Food.objects.create(category=self.category, name="Pizza", price=10.00, header_image=make_image())
+        food.refresh_from_db()
+        old_thumb = food.header_image_variants['variants']['thumb']['webp']
+
+        food.header_image = make_image('other.png', color='blue')
+        food.save()
+        food.refresh_from_db()
+        self.assertFalse(default_storage.exists(old_thumb))
+        self.assertFalse(is_stale(food, 'header_image'))
+
+        thumb = food.header_image_variants['variants']['thumb']['webp']
+        food.header_image = None
+        food.save()
+        food.refresh_from_db()
+        self.assertEqual(food.header_image_variants, {})
+        self.assertFalse(default_storage.exists(thumb))
+        self.assertIsNone(image_url(food, 'header_image', 'thumb'))
+
+    def test_variants_deleted_with_object(self):
+        image = FoodImage.objects.create(
+            food=Food.objects.create(category=self.category, name="Pizza", price=10.00),
+            image=make_image(),
+        )
+        image.refresh_from_db()
+        thumb = image.image_variants['variants']['thumb']['webp']
+        image.delete()
+        self.assertFalse(default_storage.exists(thumb))
+
+    def test_unreadable_image_falls_back_to_original(self):
+        upload = SimpleUploadedFile('broken.png', b'not an image', content_type='image/png')
+        with self.assertLogs('menu.utils.images', 'WARNING'):
+            category = Category.objects.create(name="Drinks", icon=upload)
+        self.assertEqual(category.icon_variants, {})
+        self.assertEqual(image_url(category, 'icon', 'thumb'), category.icon.url)
+
+    def test_formats_limited_to_pillow_support(self):
+        with override_settings(MENU_IMAGE_FORMATS=['avif', 'webp', 'nonexistent']):
+            self.assertNotIn('nonexistent', image_formats())
+
+
+class ImageVariantOutputTest(ImageVariantTestCase):
+    def setUp(self):
+        super().setUp()
+        self.food = Food.objects.create(category=self.category, name="Pizza", price=10.00, header_image=make_image())
+        FoodImage.objects.create(food=self.food, image=make_image('gallery.png'))
+        self.food.refresh_from_db()
+
+    def test_api_srcset(self):
+        response = APIClient().get(reverse('food-detail', args=[self.food.id]))
+        srcset = response.data['header_image_srcset']['webp'].split(', ')
+        self.assertEqual([candidate.split(' ')[1] for candidate in srcset], ['160w', '480w', '800w'])
+        self.assertTrue(srcset[0].startswith('http://testserver/'))
+        self.assertIn('webp', response.data['images'][0]['srcset'])
+        self.assertEqual(response.data['category']['icon_srcset'], {})
+
+    def test_menu_stream_srcset(self):
+        response = APIClient().get(reverse('menu-stream'))
+        food = json.loads(b''.join(response.streaming_content))['categories'][0]['foods'][0]
+        self.assertEqual(len(food['header_image_srcset']['webp'].split(', ')), 3)
+        self.assertIn('webp', food['images'][0]['srcset'])
+
+    def test_templates_use_variants(self):
+        response = self.client.get(reverse('menu_list'))
+        self.assertContains(response, '<source type="image/webp" srcset="')
+        self.assertContains(response, self.food.header_image_variants['variants']['card']['webp'])
+
+        response = self.client.get(reverse('food_detail', args=[self.food.id]))
+        self.assertContains(response, self.food.header_image_variants['variants']['thumb']['webp'])
+        self.assertContains(response, self.food.header_image_variants['variants']['full']['webp'])
+
+
+class GenerateImageVariantsCommandTest(ImageVariantTestCase):
+    def setUp(self):
+        super().setUp()
+        names = [default_storage.save(f'foods/legacy-{index}.png', make_image()) for index in range(3)]
+        foods = Food.objects.bulk_create([
+            Food(category=self.category, name=f"Legacy {index}", price=10.00, header_image=name)
+            for index, name in enumerate(names)
+        ])
+        self.food_ids = [food.id for food in foods]
+
+    def stale_foods(self):
+        return [food for food in Food.objects.filter(pk__in=self.food_ids) if is_stale(food, 'header_image')]
+
+    def test_backfill(self):
+        self.assertEqual(len(self.stale_foods()), 3)
+        out = StringIO()
+        call_command('generate_image_variants', workers=1, stdout=out)
+        self.assertIn('Generated variants for 3 images, 0 failed.', out.getvalue())
+        self.assertEqual(self.stale_foods(), [])
+
+        out = StringIO()
+        call_command('generate_image_variants', workers=1, stdout=out)
+        self.assertIn('All image variants are up to date.', out.getvalue())
+
+    def test_backfill_in_process_pool(self):
+        out = StringIO()
+        call_command('generate_image_variants', workers=2, stdout=out)
+        self.assertIn('Generated variants for 3 images, 0 failed.', out.getvalue())
+        self.assertEqual(self.stale_foods(), [])
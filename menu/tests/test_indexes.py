@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test import TestCase
+from menu.models import Category, Food, Topping
+
+
+CATEGORIES = 20
+FOODS_PER_CATEGORY = 250
+TOPPINGS = 500
+
+
+class ListQueryPlanTest(TestCase):
+    """
+    The main list queries must be served by an index on a large menu, not by
+    a sequential scan of the table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            return
+        categories = Category.objects.bulk_create([
+            Category(name=f"Category {index}") for index in range(CATEGORIES)
+        ])
+        Food.objects.bulk_create([
+            Food(
+                category=category,
+                name=f"Food {category.id}-{index}",
+                price=5 + index % 20,
+                is_available=index % 10 != 0,
+            )
+            for category in categories
+            for index in range(FOODS_PER_CATEGORY)
+        ])
+        Topping.objects.bulk_create([
+            Topping(name=f"Topping {index}", price=1.00) for index in range(TOPPINGS)
+        ])
+        cls.category = categories[CATEGORIES // 2]
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f"No query plan check for {connection.vendor}")
+
+    def assertNoSequentialScan(self, queryset, table):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            scans = [
+                line for line in plan.splitlines()
+                if f"SCAN {table}" in line and 'USING' not in line
+            ]
+        else:
+            scans = [line for line in plan.splitlines() if f"Seq Scan on {table}" in line]
+        self.assertEqual(scans, [], plan)
+
+    def test_foods_by_category(self):
+        queryset = Food.objects.filter(category_id=self.category.id).order_by('name')
+        self.assertNoSequentialScan(queryset, 'menu_food')
+
+    def test_foods_of_categories_in_model_order(self):
+        queryset = Food.objects.filter(category_id__in=[self.category.id, self.category.id + 1])
+        self.assertNoSequentialScan(queryset, 'menu_food')
+
+    def test_foods_page_by_name(self):
+        self.assertNoSequentialScan(Food.objects.order_by('name')[:20], 'menu_food')
+
+    def test_foods_page_by_created_at(self):
+        self.assertNoSequentialScan(Food.objects.all()[:20], 'menu_food')
+
+    def test_available_foods_of_category(self):
+        queryset = Food.objects.filter(category_id=self.category.id, is_available=True)
+        self.assertNoSequentialScan(queryset, 'menu_food')
+
+    def test_toppings_page_by_name(self):
+        self.assertNoSequentialScan(Topping.objects.order_by('name')[:20], 'menu_topping')
+
+    def test_categories_page_by_name(self):
+        self.assertNoSequentialScan(Category.objects.order_by('name')[:20], 'menu_category')
@@ -0,0 +1,183 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from menu.enums import JobStatus
+from menu.jobs import enqueue, job, run_pending_jobs
+from menu.jobs.queue import claim_jobs, enqueue_periodic_jobs, requeue_stale_jobs
+from menu.models import Category, Food, Job, Topping
+from menu.tests.test_images import ImageVariantTestCase, make_image
+from menu.utils.fragments import FOOD_CARD_KEY, fragment_cache
+from menu.utils.images import is_stale
+
+calls = []
+
+
+@job('tests.record')
+def record(value=None):
+    calls.append(value)
+
+
+@job('tests.fail')
+def fail():
+    raise RuntimeError("boom")
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        enqueue('tests.record', {'value': 1})
+        enqueue('tests.record', {'value': 2})
+        self.assertEqual(run_pending_jobs(), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_identical_jobs_are_queued_once(self):
+        self.assertIsNotNone(enqueue('tests.record', {'value': 1}))
+        self.assertIsNone(enqueue('tests.record', {'value': 1}))
+        self.assertIsNotNone(enqueue('tests.record', {'value': 2}))
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_delayed_job_waits(self):
+        enqueue('tests.record', {'value': 1}, delay=60)
+        self.assertEqual(run_pending_jobs(), 0)
+        Job.objects.update(run_after=timezone.now())
+        self.assertEqual(run_pending_jobs(), 1)
+
+    def test_unknown_job(self):
+        with self.assertRaises(LookupError):
+            enqueue('tests.missing')
+
+    @override_settings(MENU_JOB_MAX_ATTEMPTS=2, MENU_JOB_RETRY_DELAY=30)
+    def test_retry_then_fail(self):
+        enqueue('tests.fail')
+        with self.assertLogs('menu.jobs.queue', 'WARNING'):
+            run_pending_jobs()
+        queued = Job.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (JobStatus.PENDING.value, 1))
+        self.assertGreater(queued.run_after, timezone.now() + timedelta(seconds=20))
+        self.assertIn('RuntimeError: boom', queued.last_error)
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs('menu.jobs.queue', 'WARNING'):
+            run_pending_jobs()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (JobStatus.FAILED.value, 2))
+
+    def test_claimed_job_is_not_claimed_again(self):
+        enqueue('tests.record', {'value': 1})
+        self.assertEqual(len(claim_jobs(10)), 1)
+        self.assertEqual(claim_jobs(10), [])
+        # Enqueueing while the first one runs queues a fresh run.
+        self.assertIsNotNone(enqueue('tests.record', {'value': 1}))
+
+    @override_settings(MENU_JOB_TIMEOUT=60)
+    def test_stale_running_job_requeued(self):
+        enqueue('tests.record', {'value': 1})
+        claim_jobs(10)
+        self.assertEqual(requeue_stale_jobs(), 0)
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_eager(self):
+        with self.settings(MENU_JOBS_EAGER=True):
+            enqueue('tests.record', {'value': 1})
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_jobs_command(self):
+        enqueue('tests.record', {'value': 1})
+        enqueue('tests.fail')
+        out = StringIO()
+        with self.assertLogs('menu.jobs.queue', 'WARNING'):
+            call_command('run_jobs', once=True, stdout=out)
+        # Plus the two periodic prune jobs.
+        self.assertIn('Ran 4 jobs, 1 failed.', out.getvalue())
+        self.assertEqual(calls, [1])
+
+    @override_settings(MENU_EVENTS_PRUNE_INTERVAL=0, MENU_SYNC_PRUNE_INTERVAL=0)
+    def test_periodic_jobs_are_queued_by_interval(self):
+        last_queued = {}
+        enqueue_periodic_jobs(last_queued)
+        self.assertEqual(
+            set(Job.objects.values_list('name', flat=True)), {'menu.prune_menu_events', 'menu.prune_tombstones'},
+        )
+        run_pending_jobs()
+        with self.settings(MENU_EVENTS_PRUNE_INTERVAL=3600, MENU_SYNC_PRUNE_INTERVAL=3600):
+            enqueue_periodic_jobs(last_queued)
+        self.assertFalse(Job.objects.exists())
+
+    def test_writes_queue_no_prune_jobs(self):
+        category = Category.objects.create(name="Pizzas")
+        Food.objects.create(category=category, name="Margherita", price=9.00).delete()
+        self.assertFalse(Job.objects.filter(name__startswith='menu.prune').exists())
+
+    def test_only_renames_reindex_category(self):
+        category = Category.objects.create(name="Pizzas")
+        category.description = "Stone baked"
+        category.save()
+        category = Category.objects.get()
+        category.description = "Wood fired"
+        category.save()
+        self.assertFalse(Job.objects.filter(name='menu.reindex_category').exists())
+        category.name = "Pies"
+        category.save()
+        category.save()
+        self.assertEqual(Job.objects.filter(name='menu.reindex_category').count(), 1)
+
+
+class MenuJobSignalTest(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def shared_fragment_cache(self):
+        return override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'menu_fragments': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir,
+            },
+        })
+
+    def test_burst_of_saves_warms_cache_once(self):
+        with self.shared_fragment_cache():
+            category = Category.objects.create(name="Test Category")
+            foods = [
+                Food.objects.create(category=category, name=f"Food {index}", price=10.00)
+                for index in range(5)
+            ]
+            Topping.objects.create(name="Cheese", price=1.00)
+            warm_jobs = Job.objects.filter(name='menu.warm_menu_cache')
+            self.assertEqual(warm_jobs.count(), 1)
+            warm_jobs.update(run_after=timezone.now())
+            self.assertEqual(run_pending_jobs(), 1)
+            cards = fragment_cache().get_many([FOOD_CARD_KEY.format(food.id) for food in foods])
+            self.assertEqual(len(cards), 5)
+
+    def test_no_warming_with_per_process_cache(self):
+        Category.objects.create(name="Test Category")
+        self.assertFalse(Job.objects.filter(name='menu.warm_menu_cache').exists())
+
+
+class ImageVariantJobTest(ImageVariantTestCase):
+    @override_settings(MENU_JOBS_EAGER=False)
+    def test_variants_generated_by_worker(self):
+        category = Category.objects.create(name="Drinks", icon=make_image())
+        category.refresh_from_db()
+        self.assertTrue(is_stale(category, 'icon'))
+
+        run_pending_jobs()
+        category.refresh_from_db()
+        self.assertFalse(is_stale(category, 'icon'))
+        self.assertIn('thumb', category.icon_variants['variants'])
@@ -1,9 +1,11 @@
 from django.test import TestCase
 from django.utils import timezone
-from datetime import time
+from datetime import datetime, time, timezone as dt_timezone
 from menu.models import Category, Food, FoodImage, Topping, FoodTopping
-from menu.utils.availability import is_food_available
-from menu.utils.pricing import calculate_final_price
+from menu.utils.availability import is_food_available, AvailabilityTimeline
+from decimal import Decimal
+from menu.enums import DiscountType
+from menu.utils.pricing import calculate_final_price, compute_final_price, final_price_expression
 
 
 class CategoryModelTest(TestCase):
@@ -21,6 +23,14 @@ class CategoryModelTest(TestCase):
     
     def test_category_str(self):
         self.assertEqual(str(self.category), "Test Category")
+    
+    def test_category_foods_count_annotation(self):
+        Food.objects.create(category=self.category, name="Food", price=1.00)
+        Food.objects.create(category=self.category, name="Hidden", price=1.00, is_available=False)
+        category = Category.objects.with_foods_count().get(pk=self.category.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(category.foods_count, 1)
+        self.assertEqual(self.category.foods_count, 1)
 
 
 class FoodModelTest(TestCase):
@@ -45,6 +55,32 @@ class FoodModelTest(TestCase):
         final_price = calculate_final_price(self.food.price, self.food.discount)
         self.assertEqual(final_price, 8.40)
     
+    def test_food_computed_fields(self):
+        self.food.discount = 20
+        self.food.available_from = time(11, 0)
+        self.food.save()
+        self.food.refresh_from_db()
+        self.assertEqual(self.food.final_price, Decimal('8.40'))
+        self.assertEqual(self.food.availability_status, 'time_restricted')
+        self.food.set_price(20)
+        self.assertEqual(self.food.final_price, Decimal('16.00'))
+    
+    def test_food_computed_fields_on_bulk_paths(self):
+        food = Food.objects.bulk_create([
+            Food(category=self.category, name="Bulk Food", price=10.00, discount=50, is_available=False)
+        ])[0]
+        food.refresh_from_db()
+        self.assertEqual(food.final_price, Decimal('5.00'))
+        self.assertEqual(food.availability_status, 'unavailable')
+        food.discount = 10
+        Food.objects.bulk_update([food], ['discount'])
+        food.refresh_from_db()
+        self.assertEqual(food.final_price, Decimal('9.00'))
+        Food.objects.filter(pk=food.pk).update(price=30, is_available=True)
+        food.refresh_from_db()
+        self.assertEqual(food.final_price, Decimal('27.00'))
+        self.assertEqual(food.availability_status, 'available')
+    
     def test_food_time_availability(self):
         now = timezone.now().time()
         self.food.available_from = time(now.hour - 1, now.minute)
@@ -128,6 +164,52 @@ class UtilsTest(TestCase):
         final_price = calculate_final_price(price, discount)
         self.assertEqual(final_price, 100.00)
     
+    def test_compute_final_price_is_exact(self):
+        self.assertEqual(compute_final_price(Decimal('10.05'), 50), Decimal('5.03'))
+        self.assertEqual(compute_final_price(Decimal('9.99'), 15), Decimal('8.49'))
+        self.assertEqual(compute_final_price(Decimal('4.00'), None), Decimal('4.00'))
+    
+    def test_compute_final_price_fixed_discount(self):
+        fixed = DiscountType.FIXED.value
+        self.assertEqual(compute_final_price(Decimal('10.00'), 2.5, fixed), Decimal('7.50'))
+        self.assertEqual(compute_final_price(Decimal('2.00'), 5, fixed), Decimal('0.00'))
+    
+    def test_final_price_expression_matches_python(self):
+        category = Category.objects.create(name="Test Category")
+        cases = [
+            ('10.05', 50, DiscountType.PERCENTAGE.value),
+            ('9.99', 15, DiscountType.PERCENTAGE.value),
+            ('12.00', 0, DiscountType.PERCENTAGE.value),
+            ('10.00', 2.5, DiscountType.FIXED.value),
+            ('2.00', 5, DiscountType.FIXED.value),
+        ]
+        for index, (price, discount, discount_type) in enumerate(cases):
+            Food.objects.create(
+                category=category,
+                name=f"Food {index}",
+                price=Decimal(price),
+                discount=discount,
+                discount_type=discount_type
+            )
+        foods = Food.objects.annotate(db_final_price=final_price_expression())
+        for food in foods:
+            self.assertEqual(compute_final_price(food.price, food.discount, food.discount_type), food.final_price)
+            self.assertEqual(Decimal(food.db_final_price).quantize(Decimal('0.01')), food.final_price)
+    
+    def test_set_discount_validates_fixed_discount(self):
+        category = Category.objects.create(name="Test Category")
+        food = Food.objects.create(category=category, name="Test Food", price=10.00)
+        food.set_discount(3, DiscountType.FIXED.value)
+        self.assertEqual(food.final_price, Decimal('7.00'))
+        with self.assertRaises(ValueError):
+            food.set_discount(11, DiscountType.FIXED.value)
+        with self.assertRaises(ValueError):
+            food.set_discount(101, DiscountType.PERCENTAGE.value)
+        with self.assertRaisesMessage(ValueError, "Discount must be a finite number"):
+            food.set_discount(float('nan'), DiscountType.PERCENTAGE.value)
+        with self.assertRaisesMessage(ValueError, "Price must be a finite number"):
+            food.set_price(Decimal('Infinity'))
+    
     def test_is_food_available_when_available(self):
         category = Category.objects.create(name="Test Category")
         food = Food.objects.create(
@@ -148,3 +230,62 @@ class UtilsTest(TestCase):
         )
         self.assertFalse(is_food_available(food))
 
+
+class AvailabilityTimelineTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.always = Food.objects.create(category=self.category, name="Always", price=5.00)
+        self.lunch = Food.objects.create(
+            category=self.category,
+            name="Lunch",
+            price=12.00,
+            available_from=time(11, 0),
+            available_to=time(15, 0)
+        )
+        self.late = Food.objects.create(
+            category=self.category,
+            name="Late Night",
+            price=9.00,
+            available_from=time(22, 0),
+            available_to=time(2, 0)
+        )
+        self.off = Food.objects.create(category=self.category, name="Off", price=1.00, is_available=False)
+        self.topping = Topping.objects.create(
+            name="Lunch Topping",
+            price=1.00,
+            available_from=time(11, 0),
+            available_to=time(15, 0)
+        )
+        self.timeline = AvailabilityTimeline(Food.objects.all(), Topping.objects.all())
+    
+    def test_lunch_window(self):
+        ids = self.timeline.available_food_ids(time(12, 30))
+        self.assertEqual(ids, {self.always.id, self.lunch.id})
+        self.assertEqual(self.timeline.available_topping_ids(time(12, 30)), {self.topping.id})
+    
+    def test_window_bounds_are_inclusive(self):
+        self.assertIn(self.lunch.id, self.timeline.available_food_ids(time(11, 0)))
+        self.assertIn(self.lunch.id, self.timeline.available_food_ids(time(15, 0)))
+        self.assertNotIn(self.lunch.id, self.timeline.available_food_ids(time(15, 0, 1)))
+    
+    def test_overnight_window(self):
+        self.assertIn(self.late.id, self.timeline.available_food_ids(time(23, 0)))
+        self.assertIn(self.late.id, self.timeline.available_food_ids(time(1, 0)))
+        self.assertNotIn(self.late.id, self.timeline.available_food_ids(time(3, 0)))
+        self.assertTrue(is_food_available(self.late, time(1, 0)))
+    
+    def test_matches_is_food_available(self):
+        foods = list(Food.objects.all())
+        for hour in range(24):
+            now = time(hour, 30)
+            expected = {food.id for food in foods if is_food_available(food, now)}
+            self.assertEqual(self.timeline.available_food_ids(now), expected)
+    
+    def test_next_change(self):
+        now = datetime(2024, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            self.timeline.next_change(now),
+            datetime(2024, 1, 1, 15, 0, 0, 1, tzinfo=dt_timezone.utc)
+        )
+        late = datetime(2024, 1, 1, 23, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.timeline.next_change(late), datetime(2024, 1, 2, tzinfo=dt_timezone.utc))
@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from menu.models import Category, Food, Topping
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Test Category")
+        for index in range(45):
+            Food.objects.create(
+                category=self.category,
+                name=f"Food {index % 7}",
+                price=10 + index % 5
+            )
+        Topping.objects.create(name="Test Topping", price=1.00)
+    
+    def walk(self, **params):
+        url = reverse('food-list')
+        response = self.client.get(url, {'pagination': 'cursor', **params})
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            response = self.client.get(response.data['next'])
+    
+    def test_cursor_walk_matches_page_numbers(self):
+        for ordering in ('name', '-price', 'price,-name', '-created_at'):
+            with self.subTest(ordering=ordering):
+                pages = self.walk(ordering=ordering)
+                ids = [food['id'] for page in pages for food in page['results']]
+                expected = list(
+                    Food.objects.order_by(*ordering.split(','), 'pk').values_list('id', flat=True)
+                )
+                self.assertEqual(ids, expected)
+                self.assertEqual(len(pages), 3)
+                self.assertIsNone(pages[0]['previous'])
+    
+    def test_cursor_previous_link(self):
+        pages = self.walk(ordering='name')
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(
+            [food['id'] for food in response.data['results']],
+            [food['id'] for food in pages[1]['results']]
+        )
+    
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('food-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_keyset_pages_do_not_count(self):
+        url = reverse('topping-list')
+        self.client.get(url, {'pagination': 'cursor'})
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'pagination': 'cursor', 'search': 'Test'})
+        self.assertEqual(len(response.data['results']), 1)
+    
+    def test_page_numbers_without_count(self):
+        url = reverse('food-list')
+        response = self.client.get(url, {'count': 'false', 'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+    
+    def test_default_pagination_is_unchanged(self):
+        response = self.client.get(reverse('food-list'))
+        self.assertEqual(response.data['count'], 45)
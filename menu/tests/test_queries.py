@@ -0,0 +1,67 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from menu.models import Category, Food, FoodImage, Topping, FoodTopping
+from menu.utils.snapshot import get_menu_snapshot, invalidate_menu_snapshot
+
+
+MENU_SIZES = (1, 50, 500)
+
+
+@override_settings(MENU_SNAPSHOT_CHECK_INTERVAL=3600)
+class FoodAPIQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.toppings = Topping.objects.bulk_create([
+            Topping(name="Available Topping", price=1.00),
+            Topping(name="Unavailable Topping", price=1.00, is_available=False),
+        ])
+    
+    def seed(self, size):
+        Category.objects.all().delete()
+        self.category = Category.objects.create(name="Test Category")
+        foods = Food.objects.bulk_create([
+            Food(category=self.category, name=f"Food {index}", price=10.00)
+            for index in range(size)
+        ])
+        FoodImage.objects.bulk_create([FoodImage(food=food) for food in foods])
+        FoodTopping.objects.bulk_create([
+            FoodTopping(food=food, topping=topping)
+            for food in foods
+            for topping in self.toppings
+        ])
+        invalidate_menu_snapshot()
+        get_menu_snapshot()
+        return foods
+    
+    def test_list_query_count(self):
+        for size in MENU_SIZES:
+            with self.subTest(size=size):
+                self.seed(size)
+                # count, foods, categories, images, toppings
+                with self.assertNumQueries(5):
+                    response = self.client.get(reverse('food-list'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['count'], size)
+                self.assertEqual(len(response.data['results'][0]['toppings']), 1)
+    
+    def test_retrieve_query_count(self):
+        for size in MENU_SIZES:
+            with self.subTest(size=size):
+                foods = self.seed(size)
+                with self.assertNumQueries(0):
+                    response = self.client.get(reverse('food-detail', args=[foods[-1].id]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['toppings']), 1)
+                self.assertEqual(len(response.data['all_toppings']), 2)
+                self.assertEqual(response.data['category']['foods_count'], size)
+    
+    def test_by_category_query_count(self):
+        for size in MENU_SIZES:
+            with self.subTest(size=size):
+                self.seed(size)
+                # foods, categories, images, toppings
+                with self.assertNumQueries(4):
+                    response = self.client.get(reverse('food-by-category'), {'category_id': self.category.id})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data), size)
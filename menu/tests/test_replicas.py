@@ -0,0 +1,90 @@
+import time
+from types import SimpleNamespace
+
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from menu.models import Food
+from menu.utils import snapshot as snapshot_module
+from online_menu.middleware import PRIMARY_COOKIE, ReplicaRoutingMiddleware
+from online_menu.routers import read_from_replica
+
+REPLICAS = ['replica_1', 'replica_2']
+
+
+def record_read_alias(request):
+    return HttpResponse(router.db_for_read(Food))
+
+
+async def arecord_read_alias(request):
+    return record_read_alias(request)
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTest(SimpleTestCase):
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(router.db_for_read(Food), 'default')
+
+    def test_one_replica_per_block(self):
+        with read_from_replica():
+            alias = router.db_for_read(Food)
+            self.assertIn(alias, REPLICAS)
+            self.assertEqual({router.db_for_read(Food) for _ in range(20)}, {alias})
+            self.assertEqual(router.db_for_write(Food), 'default')
+        self.assertEqual(router.db_for_read(Food), 'default')
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(router.allow_migrate('replica_1', 'menu'))
+        self.assertTrue(router.allow_migrate('default', 'menu'))
+
+
+class ReplicaRoutingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(record_read_alias)
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    def test_routing(self):
+        cases = (
+            (self.factory.get('/api/foods/'), True),
+            (self.factory.get('/'), True),
+            (self.factory.get('/admin/menu/food/'), False),
+            (self.factory.post('/api/foods/bulk-price/'), False),
+        )
+        for request, replica in cases:
+            with self.subTest(method=request.method, path=request.path):
+                response = self.middleware(request)
+                self.assertEqual(response.content.decode() in REPLICAS, replica)
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_STICKY_SECONDS=7)
+    def test_write_pins_client_to_primary(self):
+        response = self.middleware(self.factory.post('/admin/menu/food/1/change/'))
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]['max-age'], 7)
+
+        request = self.factory.get('/api/foods/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+        self.assertEqual(self.middleware(request).content, b'default')
+
+    @override_settings(DATABASE_REPLICAS=REPLICAS)
+    async def test_async(self):
+        middleware = ReplicaRoutingMiddleware(arecord_read_alias)
+        response = await middleware(self.factory.get('/api/foods/'))
+        self.assertIn(response.content.decode(), REPLICAS)
+        response = await middleware(self.factory.post('/api/foods/bulk-price/'))
+        self.assertEqual(response.content, b'default')
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_without_replicas(self):
+        self.assertEqual(self.middleware(self.factory.get('/')).content, b'default')
+        self.assertNotIn(PRIMARY_COOKIE, self.middleware(self.factory.post('/')).cookies)
+
+
+class SnapshotReadYourWritesTest(TestCase):
+    def test_primary_reads_recheck_replica_snapshot(self):
+        snapshot_module.get_menu_snapshot()
+        now = time.monotonic()
+        from_replica = SimpleNamespace(using='replica_1')
+        self.assertTrue(snapshot_module._fresh_enough(snapshot_module.get_menu_snapshot(), now))
+        self.assertFalse(snapshot_module._fresh_enough(from_replica, now))
+        with self.settings(DATABASE_REPLICAS=['replica_1']), read_from_replica():
+            self.assertTrue(snapshot_module._fresh_enough(from_replica, now))
@@ -0,0 +1,138 @@
+import io
+import threading
+from math import ceil
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from menu.models import Category, Food
+from menu.utils.response_cache import (
+    api_cache,
+    api_cache_stats,
+    response_cache_key,
+    response_cache_timeout,
+)
+from menu.utils.snapshot import get_menu_snapshot
+
+
+class ApiResponseCacheTest(TestCase):
+    def setUp(self):
+        api_cache().clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=self.category, name="Margherita", price=9.00)
+        self.url = reverse('food-list')
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_identical_request_is_served_from_cache(self):
+        first = self.get(search='margherita', ordering='price')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.get(ordering='price', search='margherita')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_menu_change_moves_to_fresh_key(self):
+        self.get()
+        self.food.price = 11.00
+        self.food.save()
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['price'], '11.00')
+
+    @override_settings(ALLOWED_HOSTS=['internal', 'menu.example.com'])
+    def test_hosts_are_cached_separately(self):
+        Food.objects.bulk_create([
+            Food(category=self.category, name=f"Food {index}", price=7.00) for index in range(25)
+        ])
+        response = self.client.get(self.url, HTTP_HOST='internal:8000')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.json()['next'].startswith('http://internal:8000/'))
+        response = self.client.get(self.url, HTTP_HOST='menu.example.com', secure=True)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.json()['next'].startswith('https://menu.example.com/'))
+
+    def test_formats_are_cached_separately(self):
+        self.get()
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json; indent=2')
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_uncached_requests(self):
+        self.get()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertFalse(response.has_header('X-Cache'))
+        response = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = self.client.get(reverse('menu-changes'))
+        self.assertFalse(response.has_header('X-Cache'))
+
+    @override_settings(MENU_API_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.get()
+        self.assertFalse(self.get().has_header('X-Cache'))
+
+    @override_settings(MENU_API_CACHE_TIMEOUT=10 ** 6)
+    def test_timeout_capped_at_next_availability_change(self):
+        snapshot = get_menu_snapshot()
+        self.assertEqual(response_cache_timeout(snapshot), ceil(snapshot.timeline.seconds_until_next_change()))
+
+    @override_settings(MENU_API_CACHE_LOCK_TIMEOUT=5)
+    def test_concurrent_request_waits_for_result(self):
+        key = response_cache_key(RequestFactory().get(self.url), get_menu_snapshot())
+        cache = api_cache()
+        cache.add(f'{key}:lock', 1)
+        content = b'{"computed": "elsewhere"}'
+        timer = threading.Timer(0.2, cache.set, (key, (content, [('Content-Type', 'application/json')])))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertEqual(response['X-Cache'], 'COALESCED')
+        self.assertEqual(response.content, content)
+
+    @override_settings(MENU_API_CACHE_LOCK_TIMEOUT=5)
+    def test_waiter_computes_when_lock_released_without_result(self):
+        key = response_cache_key(RequestFactory().get(self.url), get_menu_snapshot())
+        cache = api_cache()
+        cache.add(f'{key}:lock', 1)
+        timer = threading.Timer(0.2, cache.delete, (f'{key}:lock',))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_stats(self):
+        self.get()
+        self.get()
+        self.get(reverse('food-detail', args=[self.food.id]))
+        stats = api_cache_stats()
+        self.assertEqual(stats['food-list'], {'hit': 1, 'miss': 1, 'coalesced': 0})
+        self.assertEqual(stats['food-detail'], {'hit': 0, 'miss': 1, 'coalesced': 0})
+
+        out = io.StringIO()
+        call_command('api_cache_stats', reset=True, stdout=out)
+        self.assertRegex(out.getvalue(), r'food-list\s+1\s+1\s+0\s+50%')
+        self.assertEqual(api_cache_stats()['food-list']['hit'], 0)
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('menu-cache-stats')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        self.get()
+        self.assertEqual(self.client.get(url).json()['food-list']['miss'], 1)
+
+    async def test_async(self):
+        first = await self.async_client.get(self.url)
+        second = await self.async_client.get(self.url)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.content, first.content)
@@ -0,0 +1,66 @@
+from django.test import TestCase
+from django.urls import reverse
+from menu.models import Category, Food, Topping, FoodTopping
+from menu.utils.snapshot import aget_menu_snapshot, get_menu_snapshot, invalidate_menu_snapshot
+
+
+class MenuSnapshotTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.food = Food.objects.create(
+            category=self.category,
+            name="Test Food",
+            price=10.00,
+            discount=20
+        )
+        self.topping = Topping.objects.create(name="Test Topping", price=2.00)
+        FoodTopping.objects.create(food=self.food, topping=self.topping)
+    
+    def test_snapshot_is_reused_between_reads(self):
+        snapshot = get_menu_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(get_menu_snapshot(), snapshot)
+    
+    async def test_async_snapshot(self):
+        snapshot = await aget_menu_snapshot()
+        self.assertIs(await aget_menu_snapshot(), snapshot)
+        invalidate_menu_snapshot()
+        rebuilt = await aget_menu_snapshot()
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertEqual(rebuilt.get_food(self.food.id).name, "Test Food")
+    
+    def test_snapshot_contains_menu(self):
+        snapshot = get_menu_snapshot()
+        self.assertEqual(snapshot.get_food(self.food.id).name, "Test Food")
+        self.assertEqual(snapshot.get_topping(self.topping.id).name, "Test Topping")
+        self.assertEqual(snapshot.food_items[self.food.id]['final_price'], 8.00)
+        self.assertEqual(len(snapshot.available_toppings[self.food.id]), 1)
+    
+    def test_snapshot_is_immutable(self):
+        snapshot = get_menu_snapshot()
+        with self.assertRaises(AttributeError):
+            snapshot.foods = {}
+    
+    def test_save_swaps_snapshot(self):
+        snapshot = get_menu_snapshot()
+        self.food.name = "Renamed Food"
+        self.food.save()
+        new_snapshot = get_menu_snapshot()
+        self.assertIsNot(new_snapshot, snapshot)
+        self.assertEqual(new_snapshot.get_food(self.food.id).name, "Renamed Food")
+    
+    def test_delete_swaps_snapshot(self):
+        get_menu_snapshot()
+        food_id = self.food.id
+        self.food.delete()
+        self.assertIsNone(get_menu_snapshot().get_food(food_id))
+    
+    def test_views_are_served_from_memory(self):
+        invalidate_menu_snapshot()
+        self.client.get(reverse('menu_list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('menu_list'))
+        self.assertContains(response, "Test Food")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('food_detail', args=[self.food.id]))
+        self.assertContains(response, "Test Topping")
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from menu.jobs.tasks import prune_tombstones
+from menu.models import Category, Food, FoodTopping, Tombstone, Topping
+from menu.utils.sync import decode_sync_token, encode_sync_token
+
+
+@override_settings(MENU_SYNC_OVERLAP=0)
+class MenuChangesTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizzas")
+        self.food = Food.objects.create(category=self.category, name="Margherita", price='9.00')
+        self.topping = Topping.objects.create(name="Cheese", price='1.50')
+        self.link = FoodTopping.objects.create(food=self.food, topping=self.topping)
+
+    def sync(self, token=None):
+        params = {'since': token} if token else {}
+        response = self.client.get(reverse('menu-changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, data, key):
+        return [row['id'] for row in data[key]]
+
+    def test_full_sync(self):
+        data = self.sync()
+        self.assertTrue(data['full'])
+        self.assertEqual(self.ids(data, 'foods'), [self.food.pk])
+        self.assertEqual(data['food_toppings'], [{
+            'id': self.link.pk, 'food_id': self.food.pk, 'topping_id': self.topping.pk,
+            'updated_at': data['food_toppings'][0]['updated_at'],
+        }])
+        self.assertEqual(data['foods'][0]['category_id'], self.category.pk)
+
+    def test_nothing_changed(self):
+        data = self.sync(self.sync()['token'])
+        self.assertFalse(data['full'])
+        for key in ('categories', 'foods', 'toppings', 'food_images', 'food_toppings'):
+            self.assertEqual(data[key], [])
+            self.assertEqual(data['deleted'][key], [])
+
+    def test_changes_and_deletes_since_token(self):
+        token = self.sync()['token']
+        self.food.is_available = False
+        self.food.save()
+        second = Food.objects.create(category=self.category, name="Marinara", price='7.00')
+        Topping.objects.filter(pk=self.topping.pk).apply_discount(10)
+        link_id = self.link.pk
+        self.link.delete()
+
+        data = self.sync(token)
+        self.assertEqual(self.ids(data, 'foods'), [self.food.pk, second.pk])
+        self.assertEqual(data['foods'][0]['availability_status'], 'unavailable')
+        self.assertEqual(data['toppings'][0]['final_price'], 1.35)
+        self.assertEqual(data['categories'], [])
+        self.assertEqual(data['deleted']['food_toppings'], [link_id])
+
+        self.assertEqual(self.ids(self.sync(data['token']), 'foods'), [])
+
+    def test_overlap_resends_recent_rows(self):
+        token = encode_sync_token(timezone.now() + timedelta(seconds=3))
+        with self.settings(MENU_SYNC_OVERLAP=10):
+            data = self.sync(token)
+        self.assertEqual(self.ids(data, 'foods'), [self.food.pk])
+
+    def test_query_count(self):
+        token = self.sync()['token']
+        with self.assertNumQueries(6):
+            self.sync(token)
+
+    def test_invalid_token(self):
+        response = self.client.get(reverse('menu-changes'), {'since': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.json())
+
+    @override_settings(MENU_SYNC_RETENTION=3600)
+    def test_expired_token_requires_full_sync(self):
+        token = encode_sync_token(timezone.now() - timedelta(hours=2))
+        response = self.client.get(reverse('menu-changes'), {'since': token})
+        self.assertEqual(response.status_code, 410)
+        self.assertIn('without since', response.json()['detail'])
+        self.assertFalse(self.sync(encode_sync_token(timezone.now() - timedelta(minutes=30)))['full'])
+
+    @override_settings(MENU_SYNC_RETENTION=3600)
+    def test_prune_tombstones(self):
+        self.link.delete()
+        self.topping.delete()
+        Tombstone.objects.filter(model_name='foodtopping').update(created_at=timezone.now() - timedelta(hours=2))
+        prune_tombstones()
+        self.assertEqual(list(Tombstone.objects.values_list('model_name', flat=True)), ['topping'])
+
+    def test_token_round_trip(self):
+        moment = timezone.now()
+        self.assertEqual(decode_sync_token(encode_sync_token(moment)), moment)
@@ -0,0 +1,257 @@
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from menu.models import Category, Food, FoodTopping, MenuEvent, Tombstone, Topping
+from menu.search import get_search_backend
+from menu.utils.snapshot import get_menu_snapshot
+from menu.transfer import CSV, JSONL, MenuImporter, MenuImportError, read_records, write_records
+
+
+def jsonl(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+MENU = (
+    {'type': 'category', 'name': 'Pizzas', 'description': 'Stone baked'},
+    {'type': 'topping', 'name': 'Cheese', 'price': '1.50'},
+    {'type': 'topping', 'name': 'Basil', 'price': '0.50', 'discount': 10},
+    {
+        'type': 'food', 'category': 'Pizzas', 'name': 'Margherita', 'description': 'Tomato and mozzarella',
+        'price': '9.00', 'discount': 10, 'toppings': ['Cheese', 'Basil'],
+    },
+    {
+        'type': 'food', 'category': 'Drinks', 'name': 'Lemonade', 'price': '3.00',
+        'available_from': '11:00', 'available_to': '15:00', 'is_available': True,
+    },
+)
+
+
+class MenuImportTest(TestCase):
+    def import_records(self, text, fmt=JSONL, **kwargs):
+        return MenuImporter(**kwargs).run(read_records(io.StringIO(text), fmt))
+
+    def test_import_creates_menu(self):
+        stats = self.import_records(jsonl(*MENU))
+        self.assertEqual(stats['category created'], 2)
+        self.assertEqual(stats['topping created'], 2)
+        self.assertEqual(stats['food created'], 2)
+        self.assertEqual(stats['topping link created'], 2)
+
+        margherita = Food.objects.get(name="Margherita")
+        self.assertEqual(margherita.category.description, "Stone baked")
+        self.assertEqual(margherita.final_price, Decimal('8.10'))
+        self.assertEqual(
+            sorted(margherita.food_toppings.values_list('topping__name', flat=True)), ["Basil", "Cheese"]
+        )
+        lemonade = Food.objects.get(name="Lemonade")
+        self.assertEqual(lemonade.category.name, "Drinks")
+        self.assertEqual(lemonade.availability_status, 'time_restricted')
+        self.assertEqual(get_search_backend().search('mozzarella'), [margherita.id])
+
+    def test_import_upserts_by_natural_key(self):
+        self.import_records(jsonl(*MENU))
+        stats = self.import_records(jsonl(
+            {'type': 'topping', 'name': 'Cheese', 'price': '2.00'},
+            {'type': 'food', 'category': 'Pizzas', 'name': 'Margherita', 'price': '10.00', 'toppings': ['Cheese']},
+        ))
+        self.assertEqual(stats['food updated'], 1)
+        self.assertEqual(stats['topping link removed'], 1)
+        self.assertEqual(Food.objects.count(), 2)
+        self.assertEqual(Topping.objects.count(), 2)
+
+        margherita = Food.objects.get(name="Margherita")
+        self.assertEqual(margherita.price, Decimal('10.00'))
+        self.assertEqual(margherita.final_price, Decimal('9.00'))
+        self.assertEqual(margherita.description, "Tomato and mozzarella")
+        self.assertEqual(list(margherita.food_toppings.values_list('topping__name', flat=True)), ["Cheese"])
+        self.assertEqual(Topping.objects.get(name="Cheese").final_price, Decimal('2.00'))
+
+    def test_invalidates_snapshot_on_commit(self):
+        before = get_menu_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.import_records(jsonl(*MENU))
+            self.assertIs(get_menu_snapshot(), before)
+        self.assertIsNot(get_menu_snapshot(), before)
+
+    def test_topping_links_are_logged(self):
+        self.import_records(jsonl(*MENU))
+        event = MenuEvent.objects.get(model_name='foodtopping', action='created')
+        margherita = Food.objects.get(name="Margherita")
+        self.assertEqual(
+            sorted((item['food_id'], item['topping_id']) for item in event.items),
+            sorted(margherita.food_toppings.values_list('food_id', 'topping_id')),
+        )
+        basil = margherita.food_toppings.get(topping__name="Basil").pk
+        self.import_records(jsonl({'category': 'Pizzas', 'name': 'Margherita', 'toppings': ['Cheese']}))
+        event = MenuEvent.objects.get(model_name='foodtopping', action='deleted')
+        self.assertEqual(event.items, [{'id': basil}])
+        self.assertEqual(list(Tombstone.objects.values_list('model_name', 'object_id')), [('foodtopping', basil)])
+
+    def test_removing_links_is_batched(self):
+        def count_queries(size):
+            records = [{'type': 'topping', 'name': 'Cheese', 'price': '1.00'}, {'type': 'topping', 'name': 'Basil', 'price': '1.00'}]
+            foods = [{'category': 'Pizzas', 'name': f'Food {index}', 'price': '5.00'} for index in range(size)]
+            FoodTopping.objects.all().delete()
+            self.import_records(jsonl(*records, *[{**food, 'toppings': ['Cheese', 'Basil']} for food in foods]))
+            with CaptureQueriesContext(connection) as context:
+                self.import_records(jsonl(*[{**food, 'toppings': ['Cheese']} for food in foods]))
+            self.assertEqual(FoodTopping.objects.filter(topping__name='Basil').count(), 0)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(5), count_queries(50))
+
+    def test_import_in_chunks(self):
+        records = [{'type': 'topping', 'name': 'Cheese', 'price': '1.00'}] + [
+            {'category': f'Category {index % 3}', 'name': f'Food {index}', 'price': '5.00', 'toppings': ['Cheese']}
+            for index in range(25)
+        ]
+        stats = self.import_records(jsonl(*records), chunk_size=10)
+        self.assertEqual(stats['food created'], 25)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(FoodTopping.objects.count(), 25)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def count_queries(size, offset):
+            records = [
+                {'category': 'Pizzas', 'name': f'Food {offset + index}', 'price': '5.00'}
+                for index in range(size)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                self.import_records(jsonl(*records))
+            return len(context.captured_queries)
+
+        # Only SQLite's limit on query parameters splits bulk inserts further.
+        self.assertLess(count_queries(200, 0), 20)
+
+    def test_errors_roll_back_everything(self):
+        invalid = (
+            {'category': 'Pizzas', 'name': 'Hawaii', 'price': '9.00', 'toppings': ['Pineapple']},
+            {'category': 'Pizzas', 'name': 'Napoli', 'price': 'cheap'},
+            {'category': 'Pizzas', 'name': 'Marinara'},
+            {'type': 'drink', 'name': 'Cola'},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': '9.00', 'available_from': 'noon'},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': 'NaN'},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': '1e30'},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': '9.00', 'discount': 'inf'},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': '9.00', 'discount': 150},
+            {'category': 'Pizzas', 'name': 'Calzone', 'price': '9.00', 'discount': 10, 'discount_type': 'fixed'},
+            {'type': 'topping', 'name': 'Olives', 'price': '1.00', 'discount': 'nan'},
+        )
+        for record in invalid:
+            with self.subTest(record=record):
+                with self.assertRaises(MenuImportError) as context:
+                    self.import_records(jsonl(MENU[0], record))
+                self.assertEqual(context.exception.line_number, 2)
+                self.assertFalse(Category.objects.exists())
+
+    def test_discount_is_checked_against_stored_price(self):
+        self.import_records(jsonl(*MENU))
+        with self.assertRaisesMessage(MenuImportError, "Line 1: Fixed discount cannot exceed the price"):
+            self.import_records(jsonl({'type': 'topping', 'name': 'Cheese', 'discount': 2, 'discount_type': 'fixed'}))
+        self.assertEqual(Topping.objects.get(name="Cheese").final_price, Decimal('1.50'))
+
+    def test_csv(self):
+        text = (
+            "type,category,name,description,price,discount,discount_type,is_available,available_from,available_to,toppings\n"
+            "topping,,Cheese,,1.50,,,,,,\n"
+            "topping,,Basil,,0.50,,,,,,\n"
+            "food,Pizzas,Margherita,\"Tomato, mozzarella\",9.00,2,fixed,yes,,,Cheese|Basil\n"
+        )
+        self.import_records(text, fmt=CSV)
+        margherita = Food.objects.get(name="Margherita")
+        self.assertEqual(margherita.description, "Tomato, mozzarella")
+        self.assertEqual(margherita.final_price, Decimal('7.00'))
+        self.assertEqual(margherita.food_toppings.count(), 2)
+
+
+class MenuTransferCommandTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_export_import_round_trip(self):
+        source = self.path('menu.jsonl')
+        with open(source, 'w') as menu_file:
+            menu_file.write(jsonl(*MENU))
+        call_command('import_menu', source, stdout=io.StringIO())
+
+        for fmt in (CSV, JSONL):
+            with self.subTest(fmt=fmt):
+                exported = self.path(f'export.{fmt}')
+                out = io.StringIO()
+                call_command('export_menu', exported, stdout=out)
+                self.assertIn('Exported 6 records', out.getvalue())
+                with open(exported) as export_file:
+                    before = [record for _, record in read_records(export_file, fmt)]
+
+                Category.objects.all().delete()
+                Topping.objects.all().delete()
+                call_command('import_menu', exported, stdout=io.StringIO())
+                call_command('export_menu', self.path('again.' + fmt), stdout=io.StringIO())
+                with open(self.path('again.' + fmt)) as export_file:
+                    after = [record for _, record in read_records(export_file, fmt)]
+                self.assertEqual(before, after)
+                self.assertEqual(Food.objects.count(), 2)
+                self.assertEqual(FoodTopping.objects.count(), 2)
+
+    def test_export_to_stdout(self):
+        Category.objects.create(name="Pizzas")
+        out = io.StringIO()
+        call_command('export_menu', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), {'type': 'category', 'name': 'Pizzas', 'description': None})
+
+    def test_import_error(self):
+        source = self.path('menu.csv')
+        with open(source, 'w') as menu_file:
+            menu_file.write("type,category,name,price,toppings\nfood,Pizzas,Hawaii,9.00,Pineapple\n")
+        with self.assertRaisesMessage(CommandError, "Nothing was imported. Line 2: unknown topping 'Pineapple'"):
+            call_command('import_menu', source, stdout=io.StringIO())
+        self.assertFalse(Food.objects.exists())
+
+    def test_unknown_extension(self):
+        with self.assertRaises(CommandError):
+            call_command('import_menu', self.path('menu.txt'), stdout=io.StringIO())
+
+
+class MenuExportAdminActionTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        MenuImporter().run(read_records(io.StringIO(jsonl(*MENU)), JSONL))
+
+    def test_export_selected_foods(self):
+        margherita = Food.objects.get(name="Margherita")
+        response = self.client.post(reverse('admin:menu_food_changelist'), {
+            'action': 'export_csv',
+            '_selected_action': [margherita.pk],
+        })
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        records = [record for _, record in read_records(io.StringIO(b''.join(response.streaming_content).decode()), CSV)]
+        self.assertEqual([record['type'] for record in records], ['category', 'topping', 'topping', 'food'])
+        self.assertEqual(records[-1]['toppings'], ['Basil', 'Cheese'])
+
+    def test_export_selected_categories(self):
+        response = self.client.post(reverse('admin:menu_category_changelist'), {
+            'action': 'export_jsonl',
+            '_selected_action': list(Category.objects.filter(name="Drinks").values_list('pk', flat=True)),
+        })
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['Drinks', 'Lemonade'])
+
+    def test_write_records_round_trip(self):
+        records = [{'type': 'food', 'category': 'Pizzas', 'name': 'Margherita', 'price': '9.00', 'toppings': ['A', 'B']}]
+        text = ''.join(write_records(records, CSV))
+        self.assertEqual([record for _, record in read_records(io.StringIO(text), CSV)], records)
@@ -1,6 +1,7 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from menu.models import Category, Food, Topping, FoodTopping
+from menu.utils.fragments import fragment_cache, FOOD_CARD_KEY, CATEGORY_SECTION_KEY
 
 
 class MenuListViewTest(TestCase):
@@ -31,6 +32,25 @@ class MenuListViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertNotContains(response, "Test Food")
     
+    def test_menu_list_conditional_get(self):
+        response = self.client.get(reverse('menu_list'))
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('menu_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_menu_list_etag_changes_on_edit_and_delete(self):
+        etag = self.client.get(reverse('menu_list'))['ETag']
+        self.food.price = 12.00
+        self.food.save()
+        response = self.client.get(reverse('menu_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        Food.objects.create(category=self.category, name="Other Food", price=1.00).delete()
+        response = self.client.get(reverse('menu_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
     def test_menu_list_empty(self):
         Food.objects.all().delete()
         Category.objects.all().delete()
@@ -38,6 +58,41 @@ class MenuListViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class MenuFragmentCacheTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.category = Category.objects.create(name="Test Category")
+        self.food = Food.objects.create(
+            category=self.category,
+            name="Test Food",
+            price=10.00
+        )
+    
+    def test_fragments_are_cached(self):
+        self.client.get(reverse('menu_list'))
+        self.assertIsNotNone(fragment_cache().get(FOOD_CARD_KEY.format(self.food.id)))
+        self.assertIsNotNone(fragment_cache().get(CATEGORY_SECTION_KEY.format(self.category.id)))
+    
+    def test_food_save_invalidates_fragments(self):
+        self.client.get(reverse('menu_list'))
+        self.food.name = "Renamed Food"
+        self.food.save()
+        self.assertIsNone(fragment_cache().get(FOOD_CARD_KEY.format(self.food.id)))
+        response = self.client.get(reverse('menu_list'))
+        self.assertContains(response, "Renamed Food")
+    
+    def test_stale_fragment_is_not_served(self):
+        self.client.get(reverse('menu_list'))
+        fragment_cache().set(
+            FOOD_CARD_KEY.format(self.food.id),
+            (('stale', True), '<p>Stale Card</p>')
+        )
+        fragment_cache().delete(CATEGORY_SECTION_KEY.format(self.category.id))
+        response = self.client.get(reverse('menu_list'))
+        self.assertNotContains(response, "Stale Card")
+        self.assertContains(response, "Test Food")
+
+
 class FoodDetailViewTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -82,3 +137,28 @@ class FoodDetailViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Test Topping")
 
+
+
+class AsyncMenuViewTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.food = Food.objects.create(category=self.category, name="Test Food", price=10.00)
+
+    async def test_views_under_asgi(self):
+        for url in (reverse('menu_list'), reverse('food_detail', args=[self.food.id])):
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Test Food")
+                response = await self.async_client.get(url, headers={'if-none-match': response['ETag']})
+                self.assertEqual(response.status_code, 304)
+
+    async def test_menu_stream_is_not_buffered(self):
+        response = await self.async_client.get(reverse('menu-stream'))
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b'"name":"Test Food"', body)
+
+    async def test_missing_food(self):
+        response = await self.async_client.get(reverse('food_detail', args=[self.food.id + 1]))
+        self.assertEqual(response.status_code, 404)
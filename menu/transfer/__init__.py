@@ -0,0 +1,15 @@
+from menu.transfer.exporter import iter_menu_records
+from menu.transfer.formats import CSV, FORMATS, JSONL, MenuImportError, detect_format, read_records, write_records
+from menu.transfer.importer import MenuImporter
+
+__all__ = [
+    'CSV',
+    'FORMATS',
+    'JSONL',
+    'MenuImportError',
+    'MenuImporter',
+    'detect_format',
+    'iter_menu_records',
+    'read_records',
+    'write_records',
+]
@@ -0,0 +1,63 @@
+from django.db.models import Prefetch
+
+from menu.utils.encoding import isoformat
+
+
+def _pricing(obj):
+    return {
+        'price': f'{obj.price:.2f}',
+        'discount': obj.discount,
+        'discount_type': obj.discount_type,
+        'is_available': obj.is_available,
+        'available_from': isoformat(obj.available_from),
+        'available_to': isoformat(obj.available_to),
+    }
+
+
+def category_record(category):
+    return {'type': 'category', 'name': category.name, 'description': category.description}
+
+
+def topping_record(topping):
+    return {'type': 'topping', 'name': topping.name, 'description': topping.description, **_pricing(topping)}
+
+
+def food_record(food):
+    return {
+        'type': 'food',
+        'category': food.category.name,
+        'name': food.name,
+        'description': food.description,
+        **_pricing(food),
+        'toppings': [food_topping.topping.name for food_topping in food.food_toppings.all()],
+    }
+
+
+def iter_menu_records(foods=None, chunk_size=1000):
+    """
+    Yield export records for ``foods`` preceded by the categories and
+    toppings they reference, so the output can be imported on its own.
+    Without ``foods`` the whole menu is exported. Rows are read in chunks,
+    never all at once.
+    """
+    from menu.models import Category, Food, FoodTopping, Topping
+
+    if foods is None:
+        foods = Food.objects.all()
+        categories = Category.objects.all()
+        toppings = Topping.objects.all()
+    else:
+        categories = Category.objects.filter(pk__in=foods.values('category_id'))
+        toppings = Topping.objects.filter(pk__in=FoodTopping.objects.filter(food__in=foods).values('topping_id'))
+    categories = categories.order_by('name', 'pk')
+    toppings = toppings.order_by('name', 'pk')
+    foods = foods.select_related('category').prefetch_related(
+        Prefetch('food_toppings', queryset=FoodTopping.objects.select_related('topping').order_by('topping__name')),
+    ).order_by('category__name', 'name', 'pk')
+
+    for category in categories.iterator(chunk_size=chunk_size):
+        yield category_record(category)
+    for topping in toppings.iterator(chunk_size=chunk_size):
+        yield topping_record(topping)
+    for food in foods.iterator(chunk_size=chunk_size):
+        yield food_record(food)
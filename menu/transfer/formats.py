@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from menu.utils.encoding import dumps
+
+CSV = 'csv'
+JSONL = 'jsonl'
+FORMATS = (CSV, JSONL)
+
+RECORD_TYPES = ('category', 'topping', 'food')
+
+# Column order of CSV files. Rows of every type share the columns and leave
+# the ones that don't apply to them empty.
+COLUMNS = (
+    'type', 'category', 'name', 'description', 'price', 'discount', 'discount_type',
+    'is_available', 'available_from', 'available_to', 'toppings',
+)
+TOPPINGS_SEPARATOR = '|'
+
+
+class MenuImportError(ValueError):
+    def __init__(self, line_number, message):
+        self.line_number = line_number
+        super().__init__(f"Line {line_number}: {message}")
+
+
+def detect_format(path):
+    if path.endswith('.csv'):
+        return CSV
+    if path.endswith(('.jsonl', '.ndjson')):
+        return JSONL
+    return None
+
+
+def read_records(stream, fmt):
+    """
+    Yield ``(line_number, record)`` pairs from a text stream, one at a time.
+    CSV cells stay strings; empty cells are dropped so they read the same as
+    keys missing from a JSON line.
+    """
+    if fmt == CSV:
+        reader = csv.DictReader(stream)
+        for record in reader:
+            record = {key: value for key, value in record.items() if key and value not in (None, '')}
+            if 'toppings' in record:
+                record['toppings'] = [
+                    name.strip() for name in record['toppings'].split(TOPPINGS_SEPARATOR) if name.strip()
+                ]
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise MenuImportError(line_number, f"invalid JSON ({exc})")
+        if not isinstance(record, dict):
+            raise MenuImportError(line_number, "expected a JSON object")
+        yield line_number, record
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        return TOPPINGS_SEPARATOR.join(value)
+    return str(value)
+
+
+def write_records(records, fmt):
+    """
+    Encode records as chunks of text, one line at a time, for files and
+    streaming responses alike.
+    """
+    if fmt == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        yield buffer.getvalue()
+        for record in records:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([_csv_value(record.get(column)) for column in COLUMNS])
+            yield buffer.getvalue()
+        return
+    for record in records:
+        yield dumps(record) + '\n'
@@ -0,0 +1,314 @@
+from collections import Counter
+from datetime import time
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from menu.enums import DiscountType, MenuEventAction
+from menu.events import event_item, record_menu_event
+from menu.search import get_search_backend
+from menu.transfer.formats import RECORD_TYPES, MenuImportError
+from menu.utils.pricing import CENT, validate_discount, validate_price
+from menu.utils.snapshot import invalidate_menu_snapshot
+
+NAME_MAX_LENGTH = 150
+# bulk_update builds one CASE per field, which gets slow with large batches.
+UPDATE_BATCH_SIZE = 200
+CATEGORY_FIELDS = ('description',)
+PRICED_FIELDS = (
+    'description', 'price', 'discount', 'discount_type', 'is_available', 'available_from', 'available_to',
+)
+TRUE_VALUES = ('true', '1', 'yes', 'y')
+FALSE_VALUES = ('false', '0', 'no', 'n')
+
+
+def _clean_description(value):
+    return None if value is None else str(value)
+
+
+def _clean_price(value):
+    try:
+        price = Decimal(str(value)).quantize(CENT)
+    except ArithmeticError:
+        raise ValueError(f"invalid price {value!r}")
+    validate_price(price)
+    return price
+
+
+def _clean_discount(value):
+    if value is None:
+        return 0
+    try:
+        discount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid discount {value!r}")
+    validate_discount(discount, None)
+    return discount
+
+
+def _clean_discount_type(value):
+    values = [discount_type.value for discount_type in DiscountType]
+    if value not in values:
+        raise ValueError(f"discount_type must be one of {', '.join(values)}")
+    return value
+
+
+def _clean_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid boolean {value!r}")
+
+
+def _clean_time(value):
+    if value is None or value == '':
+        return None
+    try:
+        return time.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"invalid time {value!r}")
+
+
+CLEANERS = {
+    'description': _clean_description,
+    'price': _clean_price,
+    'discount': _clean_discount,
+    'discount_type': _clean_discount_type,
+    'is_available': _clean_bool,
+    'available_from': _clean_time,
+    'available_to': _clean_time,
+}
+
+
+class MenuImporter:
+    """
+    Upsert categories, toppings and foods from import records.
+
+    Categories and toppings are matched by name and foods by category name
+    plus name. Keys missing from a record leave the stored value alone, and
+    a food's ``toppings`` list, when present, replaces its topping links.
+    Unknown categories are created on the fly; unknown toppings are errors.
+
+    Records are written ``chunk_size`` at a time with bulk queries, resolving
+    names through maps loaded once up front, and the whole import runs in
+    one transaction, so an error anywhere leaves the menu untouched.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, chunk_size=1000):
+        self.using = using
+        self.chunk_size = chunk_size
+        self.stats = Counter()
+
+    def run(self, records):
+        with transaction.atomic(using=self.using):
+            self.load()
+            chunk = []
+            for line_number, record in records:
+                chunk.append((line_number, record))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk)
+            transaction.on_commit(invalidate_menu_snapshot, using=self.using)
+        return self.stats
+
+    def load(self):
+        from menu.models import Category, Food, Topping
+        # Iterate newest first so the oldest row wins when names repeat.
+        self.categories = {
+            category.name: category
+            for category in Category.objects.using(self.using).order_by('-pk')
+        }
+        self.toppings = {
+            topping.name: topping
+            for topping in Topping.objects.using(self.using).order_by('-pk')
+        }
+        self.food_ids = {
+            (category_id, name): pk
+            for category_id, name, pk in Food.objects.using(self.using).order_by('-pk').values_list(
+                'category_id', 'name', 'pk',
+            )
+        }
+
+    def import_chunk(self, chunk):
+        from menu.models import Category, Topping
+        rows = {record_type: [] for record_type in RECORD_TYPES}
+        for line_number, record in chunk:
+            record_type = record.get('type') or 'food'
+            if record_type not in rows:
+                raise MenuImportError(line_number, f"unknown type {record_type!r}")
+            rows[record_type].append((line_number, record))
+        self.upsert(Category, self.categories, rows['category'], CATEGORY_FIELDS, 'category')
+        self.upsert(Topping, self.toppings, rows['topping'], PRICED_FIELDS, 'topping')
+        self.import_foods(rows['food'])
+
+    def clean(self, line_number, record, fields):
+        name = record.get('name')
+        if not isinstance(name, str) or not name.strip():
+            raise MenuImportError(line_number, "name is required")
+        if len(name.strip()) > NAME_MAX_LENGTH:
+            raise MenuImportError(line_number, f"name is longer than {NAME_MAX_LENGTH} characters")
+        values = {}
+        for field in fields:
+            if field not in record:
+                continue
+            try:
+                values[field] = CLEANERS[field](record[field])
+            except ValueError as exc:
+                raise MenuImportError(line_number, str(exc))
+        return name.strip(), values
+
+    def apply(self, line_number, obj, values, updated_fields):
+        """
+        Set ``values`` on ``obj`` and return whether anything changed.
+        """
+        if obj.pk is None and getattr(obj, 'price', '') is None and 'price' not in values:
+            raise MenuImportError(line_number, "price is required for new items")
+        changed = [field for field, value in values.items() if getattr(obj, field) != value]
+        for field in changed:
+            setattr(obj, field, values[field])
+        if {'price', 'discount', 'discount_type'} & set(changed):
+            # The discount is checked against the type and price it ends up with.
+            try:
+                validate_discount(obj.discount, obj.discount_type, obj.price)
+            except ValueError as exc:
+                raise MenuImportError(line_number, str(exc))
+        if obj.pk is not None:
+            updated_fields.update(changed)
+        return bool(changed)
+
+    def save(self, model, created, updated, updated_fields, label):
+        if created:
+            model.objects.using(self.using).bulk_create(created)
+            self.stats[f'{label} created'] += len(created)
+        if updated:
+            now = timezone.now()
+            for obj in updated:
+                obj.updated_at = now
+            model.objects.using(self.using).bulk_update(
+                updated, [*updated_fields, 'updated_at'], batch_size=UPDATE_BATCH_SIZE,
+            )
+            self.stats[f'{label} updated'] += len(updated)
+
+    def upsert(self, model, lookup, rows, fields, label):
+        created, updated = {}, {}
+        updated_fields = set()
+        for line_number, record in rows:
+            name, values = self.clean(line_number, record, fields)
+            obj = lookup.get(name)
+            if obj is None:
+                obj = lookup[name] = model(name=name)
+            if self.apply(line_number, obj, values, updated_fields) and obj.pk is not None:
+                updated[id(obj)] = obj
+            elif obj.pk is None:
+                created[id(obj)] = obj
+        self.save(model, list(created.values()), list(updated.values()), updated_fields, label)
+
+    def resolve_categories(self, rows):
+        from menu.models import Category
+        missing = {}
+        for line_number, record in rows:
+            name = record.get('category')
+            if not isinstance(name, str) or not name.strip():
+                raise MenuImportError(line_number, "category is required for foods")
+            name = name.strip()
+            if name not in self.categories and name not in missing:
+                missing[name] = Category(name=name)
+        if missing:
+            Category.objects.using(self.using).bulk_create(missing.values())
+            self.categories.update(missing)
+            self.stats['category created'] += len(missing)
+
+    def import_foods(self, rows):
+        from menu.models import Food
+        if not rows:
+            return
+        self.resolve_categories(rows)
+
+        cleaned = []
+        for line_number, record in rows:
+            name, values = self.clean(line_number, record, PRICED_FIELDS)
+            category = self.categories[record['category'].strip()]
+            cleaned.append((line_number, record, (category.pk, name), category, values))
+
+        existing = Food.objects.using(self.using).in_bulk(
+            {self.food_ids[key] for _, _, key, _, _ in cleaned if key in self.food_ids}
+        )
+        foods = {}
+        created, updated = {}, {}
+        updated_fields = set()
+        for line_number, record, key, category, values in cleaned:
+            food = foods.get(key)
+            if food is None:
+                food = existing.get(self.food_ids.get(key))
+            if food is None:
+                food = Food(category=category, name=key[1], price=None)
+            food.category = category
+            foods[key] = food
+            if food.pk is None:
+                self.apply(line_number, food, values, updated_fields)
+                created[key] = food
+            elif self.apply(line_number, food, values, updated_fields):
+                updated[key] = food
+        self.save(Food, list(created.values()), list(updated.values()), updated_fields, 'food')
+        for key, food in created.items():
+            self.food_ids[key] = food.pk
+
+        self.sync_toppings(cleaned, foods)
+        get_search_backend(self.using).index_foods([*created.values(), *updated.values()])
+
+    def sync_toppings(self, cleaned, foods):
+        from menu.models import FoodTopping, Tombstone
+        wanted = {}
+        for line_number, record, key, _, _ in cleaned:
+            if 'toppings' not in record:
+                continue
+            names = record['toppings']
+            if not isinstance(names, list):
+                raise MenuImportError(line_number, "toppings must be a list of topping names")
+            topping_ids = set()
+            for name in names:
+                topping = self.toppings.get(str(name).strip())
+                if topping is None:
+                    raise MenuImportError(line_number, f"unknown topping {name!r}")
+                topping_ids.add(topping.pk)
+            wanted[foods[key].pk] = topping_ids
+        if not wanted:
+            return
+
+        current = {}
+        stale = []
+        links = FoodTopping.objects.using(self.using).filter(food_id__in=wanted).values_list('pk', 'food_id', 'topping_id')
+        for pk, food_id, topping_id in links:
+            if topping_id in wanted[food_id]:
+                current.setdefault(food_id, set()).add(topping_id)
+            else:
+                stale.append(pk)
+        new_links = [
+            FoodTopping(food_id=food_id, topping_id=topping_id)
+            for food_id, topping_ids in wanted.items()
+            for topping_id in topping_ids - current.get(food_id, set())
+        ]
+        if new_links:
+            # Only foods and toppings log their bulk inserts themselves.
+            created = FoodTopping.objects.using(self.using).bulk_create(new_links)
+            record_menu_event(
+                FoodTopping, MenuEventAction.CREATED,
+                [event_item(link) for link in created if link.pk is not None], self.using,
+            )
+            self.stats['topping link created'] += len(new_links)
+        if stale:
+            # One DELETE instead of the per-row delete signals, then the
+            # tombstones and the event those would have written, in bulk.
+            FoodTopping.objects.using(self.using).filter(pk__in=stale)._raw_delete(self.using)
+            Tombstone.objects.using(self.using).bulk_create([
+                Tombstone(model_name=FoodTopping._meta.model_name, object_id=pk) for pk in stale
+            ])
+            record_menu_event(FoodTopping, MenuEventAction.DELETED, [{'id': pk} for pk in stale], self.using)
+            self.stats['topping link removed'] += len(stale)
@@ -1,5 +1,4 @@
-from menu.utils.availability import is_food_available
+from menu.utils.availability import is_food_available, AvailabilityTimeline
 from menu.utils.pricing import calculate_final_price
 
-__all__ = ['is_food_available', 'calculate_final_price']
-
+__all__ = ['is_food_available', 'AvailabilityTimeline', 'calculate_final_price']
@@ -1,10 +1,140 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from django.db.models import Case, Q, Value, When
 from django.utils import timezone
+from menu.enums import AvailabilityStatus
 
-def is_food_available(food):
+MICROSECONDS_PER_DAY = 24 * 60 * 60 * 1000000
+
+
+def is_within_window(available_from, available_to, now):
+    """
+    Check ``now`` against an inclusive time window. A window whose start is
+    after its end runs overnight, e.g. 22:00 -> 02:00.
+    """
+    if available_from is None and available_to is None:
+        return True
+    if available_from is None:
+        return now <= available_to
+    if available_to is None:
+        return available_from <= now
+    if available_from <= available_to:
+        return available_from <= now <= available_to
+    return now >= available_from or now <= available_to
+
+def is_food_available(food, now=None):
     if not food.is_available:
         return False
-    if food.available_from is not None and food.available_from>timezone.now().time():
-        return False
-    if food.available_to is not None and food.available_to<timezone.now().time():
-        return False
-    return True
\ No newline at end of file
+    if now is None:
+        now = timezone.now().time()
+    return is_within_window(food.available_from, food.available_to, now)
+
+
+def get_availability_status(obj):
+    """
+    Time-independent availability bucket of a food or topping.
+    """
+    if not obj.is_available:
+        return AvailabilityStatus.UNAVAILABLE.value
+    if obj.available_from is not None or obj.available_to is not None:
+        return AvailabilityStatus.TIME_RESTRICTED.value
+    return AvailabilityStatus.AVAILABLE.value
+
+def availability_status_expression():
+    return Case(
+        When(is_available=False, then=Value(AvailabilityStatus.UNAVAILABLE.value)),
+        When(
+            Q(available_from__isnull=False) | Q(available_to__isnull=False),
+            then=Value(AvailabilityStatus.TIME_RESTRICTED.value),
+        ),
+        default=Value(AvailabilityStatus.AVAILABLE.value),
+    )
+
+
+def _to_microseconds(value):
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+
+
+class AvailabilityTimeline:
+    """
+    Precomputed availability of foods and toppings over a day.
+
+    The day is cut at every ``available_from`` and just after every
+    ``available_to`` so that within one slice the set of available items is
+    constant. Looking up what is available now is a bisect plus a set lookup.
+    """
+
+    def __init__(self, foods=(), toppings=()):
+        foods = list(foods)
+        toppings = list(toppings)
+        boundaries = {0}
+        for obj in foods + toppings:
+            if not obj.is_available:
+                continue
+            if obj.available_from is not None:
+                boundaries.add(_to_microseconds(obj.available_from))
+            if obj.available_to is not None:
+                end = _to_microseconds(obj.available_to) + 1
+                if end < MICROSECONDS_PER_DAY:
+                    boundaries.add(end)
+        self.boundaries = tuple(sorted(boundaries))
+        self.food_slices = self._build_slices(foods)
+        self.topping_slices = self._build_slices(toppings)
+
+    def _build_slices(self, objects):
+        slices = [[] for _ in self.boundaries]
+        for obj in objects:
+            if not obj.is_available:
+                continue
+            for index in self._slice_range(obj.available_from, obj.available_to):
+                slices[index].append(obj.id)
+        return tuple(frozenset(ids) for ids in slices)
+
+    def _slice_range(self, available_from, available_to):
+        start = 0 if available_from is None else _to_microseconds(available_from)
+        end = MICROSECONDS_PER_DAY - 1 if available_to is None else _to_microseconds(available_to)
+        if start <= end:
+            return range(bisect_left(self.boundaries, start), bisect_right(self.boundaries, end))
+        return [
+            *range(0, bisect_right(self.boundaries, end)),
+            *range(bisect_left(self.boundaries, start), len(self.boundaries)),
+        ]
+
+    def slice_index(self, now=None):
+        if now is None:
+            now = timezone.now()
+        if isinstance(now, datetime):
+            now = now.time()
+        return bisect_right(self.boundaries, _to_microseconds(now)) - 1
+
+    def available_food_ids(self, now=None):
+        return self.food_slices[self.slice_index(now)]
+
+    def available_topping_ids(self, now=None):
+        return self.topping_slices[self.slice_index(now)]
+
+    def slice_start(self, now=None):
+        """
+        Return the datetime at which the current slice started.
+        """
+        if now is None:
+            now = timezone.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(microseconds=self.boundaries[self.slice_index(now)])
+
+    def next_change(self, now=None):
+        """
+        Return the datetime at which the available sets change next.
+        """
+        if now is None:
+            now = timezone.now()
+        index = self.slice_index(now)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if index + 1 < len(self.boundaries):
+            return midnight + timedelta(microseconds=self.boundaries[index + 1])
+        return midnight + timedelta(days=1)
+
+    def seconds_until_next_change(self, now=None):
+        if now is None:
+            now = timezone.now()
+        return max((self.next_change(now) - now).total_seconds(), 0)
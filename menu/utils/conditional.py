@@ -0,0 +1,64 @@
+import hashlib
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+from menu.utils.snapshot import aget_menu_snapshot, get_menu_snapshot
+
+
+def request_snapshot(request):
+    """
+    The snapshot an async view loaded up front, so the ETag and the body of
+    one response come from the same menu, or else the current snapshot.
+    """
+    snapshot = getattr(request, 'menu_snapshot', None)
+    return snapshot if snapshot is not None else get_menu_snapshot()
+
+
+def menu_version(now=None, snapshot=None):
+    """
+    Menu-wide version stamp: the database fingerprint of the current snapshot
+    plus the availability slice we are in. Identical across workers that see
+    the same data, and computed without touching the ORM once the snapshot is
+    warm.
+    """
+    if snapshot is None:
+        snapshot = get_menu_snapshot()
+    slice_index = snapshot.timeline.slice_index(now)
+    digest = hashlib.sha1(repr((snapshot.fingerprint, slice_index)).encode()).hexdigest()
+    return digest[:20]
+
+
+def menu_etag(request, *args, **kwargs):
+    key = '|'.join((
+        menu_version(snapshot=request_snapshot(request)),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def menu_last_modified(request, *args, **kwargs):
+    snapshot = request_snapshot(request)
+    slice_start = snapshot.timeline.slice_start()
+    if snapshot.last_modified is None:
+        return slice_start
+    return max(snapshot.last_modified, slice_start)
+
+
+menu_condition = condition(etag_func=menu_etag, last_modified_func=menu_last_modified)
+
+
+def amenu_condition(view):
+    """
+    ``menu_condition`` for async views. Django calls the ETag and
+    Last-Modified functions synchronously, so the snapshot they read is
+    loaded first, with ``aget_menu_snapshot``, and kept on the request.
+    """
+    conditional_view = menu_condition(view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.menu_snapshot = await aget_menu_snapshot()
+        return await conditional_view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,8 @@
+import json
+
+# Compact JSON for payloads written straight into a response body or file.
+dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from menu.constants.templates import FOOD_CARD_TEMPLATE, CATEGORY_SECTION_TEMPLATE
+
+FOOD_CARD_KEY = 'menu:food-card:{}'
+CATEGORY_SECTION_KEY = 'menu:category-section:{}'
+
+
+def fragment_cache():
+    return caches[settings.MENU_FRAGMENT_CACHE]
+
+
+def fragment_cache_is_shared():
+    """
+    Whether fragments rendered in one process are visible to the others, so
+    warming the cache from a background worker helps the web workers.
+    """
+    return not isinstance(fragment_cache(), (LocMemCache, DummyCache))
+
+
+def _food_stamp(item):
+    return item['food'].updated_at.isoformat()
+
+
+def _section_stamp(section):
+    return (
+        section['category'].updated_at.isoformat(),
+        tuple((item['food'].id, _food_stamp(item)) for item in section['foods']),
+    )
+
+
+def _cached(cache, key, stamp):
+    entry = cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    return None
+
+
+def render_food_cards(section):
+    """
+    Render the food cards of a menu section, reusing every card whose food
+    row is unchanged since it was cached.
+    """
+    cache = fragment_cache()
+    items = section['foods']
+    keys = [FOOD_CARD_KEY.format(item['food'].id) for item in items]
+    entries = cache.get_many(keys)
+    cards = []
+    missing = {}
+    for key, item in zip(keys, items):
+        stamp = _food_stamp(item)
+        entry = entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            cards.append(entry[1])
+            continue
+        html = render_to_string(FOOD_CARD_TEMPLATE, {'item': item})
+        missing[key] = (stamp, html)
+        cards.append(html)
+    if missing:
+        cache.set_many(missing)
+    return ''.join(cards)
+
+
+def render_category_section(section):
+    cache = fragment_cache()
+    key = CATEGORY_SECTION_KEY.format(section['category'].id)
+    stamp = _section_stamp(section)
+    html = _cached(cache, key, stamp)
+    if html is None:
+        html = render_to_string(CATEGORY_SECTION_TEMPLATE, {
+            'section': section,
+            'food_cards': mark_safe(render_food_cards(section)),
+        })
+        cache.set(key, (stamp, html))
+    return mark_safe(html)
+
+
+def invalidate_food_fragments(food):
+    fragment_cache().delete_many([
+        FOOD_CARD_KEY.format(food.pk),
+        CATEGORY_SECTION_KEY.format(food.category_id),
+    ])
+
+
+def invalidate_category_fragments(category):
+    fragment_cache().delete(CATEGORY_SECTION_KEY.format(category.pk))
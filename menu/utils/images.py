@@ -0,0 +1,203 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_FORMAT = 'webp'
+VARIANTS_DIR = 'variants'
+SAVE_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 60},
+}
+
+
+def image_variants():
+    """
+    Variant name -> maximum width in pixels, smallest first.
+    """
+    variants = settings.MENU_IMAGE_VARIANTS
+    return dict(sorted(variants.items(), key=lambda item: item[1]))
+
+
+def image_formats():
+    """
+    Configured output formats in order of preference, limited to the ones
+    this Pillow build can encode.
+    """
+    formats = settings.MENU_IMAGE_FORMATS
+    return tuple(fmt for fmt in formats if fmt in features.modules and features.check_module(fmt))
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def variant_name(name, variant, fmt):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, VARIANTS_DIR, f'{stem}-{variant}.{fmt}')
+
+
+def _open(storage, name):
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    image.save(buffer, format=fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(name, storage=None):
+    """
+    Write every sized variant of the image at ``name`` in every output
+    format and return its manifest::
+
+        {'source': name, 'variants': {'thumb': {'width': 160, 'webp': ...}}}
+
+    Images are never upscaled. Existing variant files are overwritten so
+    their names stay stable.
+    """
+    storage = storage or default_storage
+    image = _open(storage, name)
+    manifest = {'source': name, 'variants': {}}
+    for variant, max_width in image_variants().items():
+        width = min(max_width, image.width)
+        resized = image
+        if width < image.width:
+            resized = image.resize((width, max(round(image.height * width / image.width), 1)), Image.LANCZOS)
+        entry = {'width': width}
+        for fmt in image_formats():
+            target = variant_name(name, variant, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+            entry[fmt] = storage.save(target, _encode(resized, fmt))
+        manifest['variants'][variant] = entry
+    return manifest
+
+
+def delete_variants(manifest, storage=None):
+    storage = storage or default_storage
+    for entry in (manifest or {}).get('variants', {}).values():
+        for fmt, target in entry.items():
+            if fmt != 'width' and storage.exists(target):
+                storage.delete(target)
+
+
+def variant_url(manifest, variant, fmt=FALLBACK_FORMAT):
+    """
+    URL of one variant, or ``None`` if it was not generated.
+    """
+    entry = (manifest or {}).get('variants', {}).get(variant)
+    if not entry or fmt not in entry:
+        return None
+    return default_storage.url(entry[fmt])
+
+
+def image_url(instance, field_name, variant, fmt=FALLBACK_FORMAT):
+    """
+    URL of a variant of an image field, falling back to the original upload
+    while variants are missing. ``None`` if there is no image at all.
+    """
+    image = getattr(instance, field_name)
+    if not image:
+        return None
+    if not is_stale(instance, field_name):
+        url = variant_url(getattr(instance, variants_field(field_name)), variant, fmt)
+        if url:
+            return url
+    return image.url
+
+
+def srcset(manifest, fmt, build_url=None):
+    """
+    ``srcset`` attribute value for one format, e.g. ``a.webp 160w, b.webp 480w``.
+    """
+    candidates = {}
+    for entry in (manifest or {}).get('variants', {}).values():
+        if fmt in entry:
+            candidates.setdefault(entry['width'], entry[fmt])
+    urls = []
+    for width, target in sorted(candidates.items()):
+        url = default_storage.url(target)
+        urls.append(f'{build_url(url) if build_url else url} {width}w')
+    return ', '.join(urls)
+
+
+def srcsets(manifest, build_url=None):
+    """
+    Format -> ``srcset`` for every format the image has variants in.
+    """
+    result = {}
+    for fmt in image_formats():
+        value = srcset(manifest, fmt, build_url)
+        if value:
+            result[fmt] = value
+    return result
+
+
+def is_stale(instance, field_name):
+    name = getattr(instance, field_name).name or ''
+    manifest = getattr(instance, variants_field(field_name)) or {}
+    return manifest.get('source', '') != name
+
+
+def store_variants(instance, field_name, manifest):
+    """
+    Save a manifest without going through ``save()``, bumping
+    ``updated_at`` so the menu snapshot and fragment caches notice.
+    """
+    updated_at = timezone.now()
+    type(instance)._default_manager.using(instance._state.db).filter(pk=instance.pk).update(**{
+        variants_field(field_name): manifest,
+        'updated_at': updated_at,
+    })
+    setattr(instance, variants_field(field_name), manifest)
+    instance.updated_at = updated_at
+
+
+def refresh_image_variants(instance, force=False):
+    """
+    Regenerate the variants of every image field on ``instance`` whose file
+    changed since its manifest was written. Returns the number of fields
+    that were refreshed.
+    """
+    refreshed = 0
+    for field_name in instance.variant_image_fields:
+        if not force and not is_stale(instance, field_name):
+            continue
+        name = getattr(instance, field_name).name
+        manifest = {}
+        if name:
+            try:
+                manifest = generate_variants(name)
+            except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+                logger.warning('Could not generate variants of %s: %s', name, exc)
+                continue
+        apply_variants(instance, field_name, manifest)
+        refreshed += 1
+    return refreshed
+
+
+def apply_variants(instance, field_name, manifest):
+    """
+    Store a freshly generated manifest and remove the files of the one it
+    replaces, unless both describe the same source.
+    """
+    old_manifest = getattr(instance, variants_field(field_name))
+    if old_manifest and old_manifest.get('source') != manifest.get('source'):
+        delete_variants(old_manifest)
+    store_variants(instance, field_name, manifest)
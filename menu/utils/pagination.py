@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Row count of ``model``'s table from the database statistics, without
+    scanning it, or ``None`` where there are no statistics yet. The numbers
+    are as fresh as the last ``ANALYZE``.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == 'mysql':
+        sql = "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s"
+        params = [table]
+    elif connection.vendor == 'sqlite':
+        # The first number of every sqlite_stat1 row is the table's row count.
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+        params = [table]
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 only exists once ANALYZE has run.
+        return None
+    # PostgreSQL reports -1 for tables that were never analyzed.
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def estimated_count_threshold():
+    return settings.MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD
+
+
+def uses_estimated_count(model, using='default'):
+    """
+    Whether ``model``'s table is big enough that changelists should show the
+    estimated rather than the exact number of rows.
+    """
+    threshold = estimated_count_threshold()
+    if not threshold:
+        return False
+    estimate = estimated_row_count(model, using)
+    return estimate is not None and estimate >= threshold
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the count of an unfiltered queryset over a large
+    table from the database statistics instead of ``COUNT(*)``. Filtered
+    querysets, and tables below ``MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD``
+    rows, are counted exactly. The last page may come out short or empty
+    when the estimate is off.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        threshold = estimated_count_threshold()
+        if threshold and not queryset.query.where and not queryset.query.is_sliced:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
@@ -1,10 +1,110 @@
-def calculate_final_price(price, discount):
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest, Round
+
+from menu.enums import DiscountType
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+HUNDRED = Decimal('100')
+# Largest value the six-digit price columns hold.
+MAX_PRICE = Decimal('9999.99')
+
+
+def to_decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def validate_price(value):
+    if not math.isfinite(value):
+        raise ValueError("Price must be a finite number")
+    if value < 0:
+        raise ValueError("Price cannot be negative")
+    if value > MAX_PRICE:
+        raise ValueError(f"Price cannot exceed {MAX_PRICE}")
+
+
+def validate_discount(value, discount_type, price=None):
     """
-    Calculate final price after discount.
+    Check a discount the way ``set_discount`` does. Pass ``price=None`` to
+    skip the per-row fixed discount check, which bulk updates run as a query.
+    """
+    if not math.isfinite(value):
+        raise ValueError("Discount must be a finite number")
+    if value < 0:
+        raise ValueError("Discount cannot be negative")
+    if discount_type == DiscountType.PERCENTAGE.value and value > 100:
+        raise ValueError("Discount must be between 0 and 100")
+    if discount_type == DiscountType.FIXED.value and price is not None and to_decimal(value) > to_decimal(price):
+        raise ValueError("Fixed discount cannot exceed the price")
+
+
+def compute_final_price(price, discount, discount_type=DiscountType.PERCENTAGE.value):
+    """
+    Exact final price after discount, rounded half-up to the cent.
     """
     if price is None:
-        return 0.0
+        return ZERO
+    price = to_decimal(price)
     if discount and discount > 0:
-        return round(float(price) * (1 - discount / 100), 2)
-    return float(price)
+        discount = to_decimal(discount)
+        if discount_type == DiscountType.FIXED.value:
+            price = max(price - discount, ZERO)
+        else:
+            price = price * (HUNDRED - discount) / HUNDRED
+    return price.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def final_price_expression(price=None, discount=None, discount_type=None):
+    """
+    The same calculation as ``compute_final_price`` as a database expression,
+    for annotations and bulk ``UPDATE`` statements. The discount is cast to
+    a decimal so databases with exact numerics round like Python does.
+
+    ``price`` replaces the price column with an expression, and ``discount``
+    and ``discount_type`` replace the discount columns with constants, so an
+    ``UPDATE`` can write new values and their final price in one statement
+    (its ``SET`` clauses only see the old row).
+    """
+    if price is None:
+        price = F('price')
+    output_field = DecimalField(max_digits=8, decimal_places=2)
+    if discount is not None:
+        return Round(
+            _discounted(price, Value(to_decimal(discount)), discount_type, output_field),
+            2,
+            output_field=output_field,
+        )
+    discount = Cast(Coalesce(F('discount'), Value(0.0)), DecimalField(max_digits=9, decimal_places=4))
+    return Round(
+        Case(
+            When(Q(discount__isnull=True) | Q(discount__lte=0), then=price),
+            When(
+                discount_type=DiscountType.FIXED.value,
+                then=_discounted(price, discount, DiscountType.FIXED.value, output_field),
+            ),
+            default=_discounted(price, discount, DiscountType.PERCENTAGE.value, output_field),
+            output_field=output_field,
+        ),
+        2,
+        output_field=output_field,
+    )
 
+
+def _discounted(price, discount, discount_type, output_field):
+    if discount_type == DiscountType.FIXED.value:
+        return Greatest(price - discount, Value(ZERO), output_field=output_field)
+    return price * (Value(HUNDRED) - discount) / Value(HUNDRED)
+
+
+def calculate_final_price(price, discount, discount_type=DiscountType.PERCENTAGE.value):
+    """
+    Calculate final price after discount.
+    """
+    return float(compute_final_price(price, discount, discount_type))
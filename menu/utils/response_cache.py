@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import time
+from math import ceil
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.viewsets import ViewSetMixin
+
+from menu.utils.conditional import menu_version
+
+HIT = 'hit'
+MISS = 'miss'
+# Served from the cache after waiting for another request to compute it.
+COALESCED = 'coalesced'
+OUTCOMES = (HIT, MISS, COALESCED)
+
+RESPONSE_KEY = 'api-response:{}:{}'
+STATS_KEY = 'api-cache-stats:{}:{}'
+# Headers replayed with a cached body; everything else is per request.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Allow', 'Cache-Control')
+LOCK_POLL_INTERVAL = 0.05
+
+
+def api_cache():
+    return caches[settings.MENU_API_CACHE]
+
+
+def cached_endpoint(request):
+    """
+    URL name of the viewset route serving ``request`` when its response
+    may come from the cache, else ``None``. Conditional requests are left
+    to the viewsets, which answer them without touching the database.
+    """
+    if request.method != 'GET' or not settings.MENU_API_CACHE_TIMEOUT:
+        return None
+    if 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META:
+        return None
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None or not issubclass(view_class, ViewSetMixin):
+        return None
+    return match.url_name
+
+
+def response_cache_key(request, snapshot):
+    """
+    The menu version (which includes the availability slice) plus the
+    scheme and host, the path, the query params sorted by name and the
+    ``Accept`` header, so a change to the menu or a passing availability
+    boundary moves to fresh keys. Bodies hold absolute URLs (pagination
+    links, images), hence the scheme and host.
+    """
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = hashlib.sha1('|'.join((
+        request.build_absolute_uri('/'), request.path_info, params, request.META.get('HTTP_ACCEPT', ''),
+    )).encode()).hexdigest()
+    return RESPONSE_KEY.format(menu_version(snapshot=snapshot), digest)
+
+
+def response_cache_timeout(snapshot):
+    """
+    ``MENU_API_CACHE_TIMEOUT`` capped at the next availability boundary,
+    after which the key is never asked for again.
+    """
+    return min(
+        settings.MENU_API_CACHE_TIMEOUT,
+        ceil(snapshot.timeline.seconds_until_next_change()),
+    )
+
+
+def cacheable(response):
+    # The browsable API renders the user and a CSRF token into its pages.
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.get('Content-Type', '').startswith('text/html')
+    )
+
+
+def cache_entry(response):
+    return (response.content, [(name, response[name]) for name in CACHED_HEADERS if response.has_header(name)])
+
+
+def cached_response(entry, outcome):
+    content, headers = entry
+    response = HttpResponse(content)
+    for name, value in headers:
+        response[name] = value
+    response['X-Cache'] = outcome.upper()
+    return response
+
+
+def _lock_timeout():
+    return settings.MENU_API_CACHE_LOCK_TIMEOUT
+
+
+def serve_cached(request, endpoint, snapshot, get_response):
+    """
+    Answer ``request`` from the cache, or compute the response once while
+    concurrent identical requests wait for it instead of recomputing it.
+    Waiters give up and compute it themselves when the lock goes away
+    without a result or after ``MENU_API_CACHE_LOCK_TIMEOUT`` seconds.
+    """
+    cache = api_cache()
+    key = response_cache_key(request, snapshot)
+    entry = cache.get(key)
+    if entry is not None:
+        record_outcome(cache, endpoint, HIT)
+        return cached_response(entry, HIT)
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, _lock_timeout()):
+        deadline = time.monotonic() + _lock_timeout()
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                record_outcome(cache, endpoint, COALESCED)
+                return cached_response(entry, COALESCED)
+            if cache.get(lock_key) is None:
+                break
+        lock_key = None
+
+    try:
+        response = get_response(request)
+        timeout = response_cache_timeout(snapshot)
+        if cacheable(response) and timeout > 0:
+            cache.set(key, cache_entry(response), timeout)
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+    record_outcome(cache, endpoint, MISS)
+    response['X-Cache'] = MISS.upper()
+    return response
+
+
+async def aserve_cached(request, endpoint, snapshot, get_response):
+    cache = api_cache()
+    key = response_cache_key(request, snapshot)
+    entry = await cache.aget(key)
+    if entry is not None:
+        await arecord_outcome(cache, endpoint, HIT)
+        return cached_response(entry, HIT)
+
+    lock_key = f'{key}:lock'
+    if not await cache.aadd(lock_key, 1, _lock_timeout()):
+        deadline = time.monotonic() + _lock_timeout()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = await cache.aget(key)
+            if entry is not None:
+                await arecord_outcome(cache, endpoint, COALESCED)
+                return cached_response(entry, COALESCED)
+            if await cache.aget(lock_key) is None:
+                break
+        lock_key = None
+
+    try:
+        response = await get_response(request)
+        timeout = response_cache_timeout(snapshot)
+        if cacheable(response) and timeout > 0:
+            await cache.aset(key, cache_entry(response), timeout)
+    finally:
+        if lock_key is not None:
+            await cache.adelete(lock_key)
+    await arecord_outcome(cache, endpoint, MISS)
+    response['X-Cache'] = MISS.upper()
+    return response
+
+
+def record_outcome(cache, endpoint, outcome):
+    key = STATS_KEY.format(endpoint, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+async def arecord_outcome(cache, endpoint, outcome):
+    key = STATS_KEY.format(endpoint, outcome)
+    if not await cache.aadd(key, 1, None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, None)
+
+
+def cached_endpoints():
+    """
+    URL names of every viewset route under ``/api/``.
+    """
+    from menu.api.urls import router
+    names = []
+    for pattern in router.urls:
+        view_class = getattr(pattern.callback, 'cls', None)
+        if pattern.name and view_class and issubclass(view_class, ViewSetMixin) and pattern.name not in names:
+            names.append(pattern.name)
+    return names
+
+
+def api_cache_stats():
+    """
+    Hit, miss and coalesced counts per endpoint, as seen by this process's
+    view of the cache: per worker with the local memory backend, for all
+    workers with a shared one.
+    """
+    cache = api_cache()
+    endpoints = cached_endpoints()
+    keys = [STATS_KEY.format(endpoint, outcome) for endpoint in endpoints for outcome in OUTCOMES]
+    counts = cache.get_many(keys)
+    return {
+        endpoint: {outcome: counts.get(STATS_KEY.format(endpoint, outcome), 0) for outcome in OUTCOMES}
+        for endpoint in endpoints
+    }
+
+
+def reset_api_cache_stats():
+    api_cache().delete_many([
+        STATS_KEY.format(endpoint, outcome) for endpoint in cached_endpoints() for outcome in OUTCOMES
+    ])
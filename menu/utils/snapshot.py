@@ -0,0 +1,203 @@
+import itertools
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import Count, Max
+
+from menu.utils.availability import AvailabilityTimeline
+
+
+class MenuSnapshot:
+    """
+    Immutable, versioned view of the whole menu.
+
+    Built once from the database and shared between requests until one of the
+    menu models changes. The model instances it holds must be treated as
+    read-only.
+    """
+
+    __slots__ = (
+        'version', 'using', 'fingerprint', 'categories', 'foods', 'toppings',
+        'food_items', 'available_toppings', 'timeline', 'last_modified',
+    )
+
+    def __init__(self, version, fingerprint, categories, toppings, using=DEFAULT_DB_ALIAS):
+        self.version = version
+        self.using = using
+        self.fingerprint = fingerprint
+        self.last_modified = max((last for _, last in fingerprint if last is not None), default=None)
+        self.categories = tuple(categories)
+        self.foods = {
+            food.id: food
+            for category in self.categories
+            for food in category.foods.all()
+        }
+        self.toppings = {topping.id: topping for topping in toppings}
+        self.food_items = {food.id: _price_item('food', food) for food in self.foods.values()}
+        self.available_toppings = {
+            food.id: tuple(
+                _price_item('topping', food_topping.topping)
+                for food_topping in food.food_toppings.all()
+                if food_topping.topping.is_available
+            )
+            for food in self.foods.values()
+        }
+        self.timeline = AvailabilityTimeline(self.foods.values(), self.toppings.values())
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("MenuSnapshot is immutable")
+        super().__setattr__(name, value)
+
+    def get_category(self, category_id):
+        for category in self.categories:
+            if category.id == category_id:
+                return category
+        return None
+
+    def get_food(self, food_id):
+        return self.foods.get(food_id)
+
+    def get_topping(self, topping_id):
+        return self.toppings.get(topping_id)
+
+    def available_menu(self, now=None):
+        available = self.timeline.available_food_ids(now)
+        menu = []
+        for category in self.categories:
+            foods = [
+                self.food_items[food.id]
+                for food in category.foods.all()
+                if food.id in available
+            ]
+            if foods:
+                menu.append({'category': category, 'foods': foods})
+        return menu
+
+
+def _price_item(key, obj):
+    return {
+        key: obj,
+        'final_price': obj.final_price,
+        'has_discount': obj.discount and obj.discount > 0,
+    }
+
+
+_lock = threading.Lock()
+_snapshot = None
+_versions = itertools.count(1)
+_version = 0
+_checked_at = 0.0
+
+
+def _menu_models():
+    from menu.models import Category, Food, FoodImage, FoodTopping, Topping, Tombstone
+    return (Category, Food, FoodImage, FoodTopping, Topping, Tombstone)
+
+
+def menu_fingerprint():
+    """
+    Cheap database-wide stamp of the menu tables, used to notice changes made
+    by other processes. Max ``updated_at`` catches edits, and deletes through
+    their tombstones; counts catch rows removed without signals.
+    """
+    fingerprint = []
+    for model in _menu_models():
+        stats = model.objects.order_by().aggregate(count=Count('id'), last=Max('updated_at'))
+        fingerprint.append((stats['count'], stats['last']))
+    return tuple(fingerprint)
+
+
+async def amenu_fingerprint():
+    fingerprint = []
+    for model in _menu_models():
+        stats = await model.objects.order_by().aaggregate(count=Count('id'), last=Max('updated_at'))
+        fingerprint.append((stats['count'], stats['last']))
+    return tuple(fingerprint)
+
+
+def build_menu_snapshot(version):
+    from menu.models import Category, Topping
+
+    using = router.db_for_read(Category)
+    fingerprint = menu_fingerprint()
+    categories = list(
+        Category.objects.with_foods_count().prefetch_related(
+            'foods__images',
+            'foods__food_toppings__topping',
+        ).all()
+    )
+    toppings = list(Topping.objects.all())
+    return MenuSnapshot(version, fingerprint, categories, toppings, using)
+
+
+def _check_interval():
+    return settings.MENU_SNAPSHOT_CHECK_INTERVAL
+
+
+def _fresh_enough(snapshot, now):
+    """
+    Whether ``snapshot`` can be served without checking the fingerprint.
+    Requests pinned to the primary after a write always check a snapshot
+    that was built from a replica, which may not have the write yet.
+    """
+    if now - _checked_at >= _check_interval():
+        return False
+    from menu.models import Category
+    return snapshot.using == DEFAULT_DB_ALIAS or router.db_for_read(Category) != DEFAULT_DB_ALIAS
+
+
+def get_menu_snapshot():
+    """
+    Return the current snapshot, rebuilding it if it was invalidated in this
+    process or, at most every ``MENU_SNAPSHOT_CHECK_INTERVAL`` seconds, if the
+    database fingerprint moved because another worker changed the menu.
+    """
+    global _snapshot, _checked_at
+
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and snapshot.version == _version:
+        if _fresh_enough(snapshot, now):
+            return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.version == _version:
+            if _fresh_enough(snapshot, now):
+                return snapshot
+            if menu_fingerprint() == snapshot.fingerprint:
+                _checked_at = now
+                return snapshot
+        # Invalidations don't take the lock, so a save that lands mid-build
+        # simply leaves this snapshot one version behind and forces a rebuild.
+        _snapshot = build_menu_snapshot(_version)
+        _checked_at = time.monotonic()
+        return _snapshot
+
+
+async def aget_menu_snapshot():
+    """
+    ``get_menu_snapshot`` for async views. A warm snapshot is returned
+    without leaving the event loop and the fingerprint is checked with the
+    async ORM; only a rebuild runs in a worker thread, under the lock.
+    """
+    global _checked_at
+
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and snapshot.version == _version:
+        if _fresh_enough(snapshot, now):
+            return snapshot
+        if await amenu_fingerprint() == snapshot.fingerprint and snapshot.version == _version:
+            _checked_at = now
+            return snapshot
+    return await sync_to_async(get_menu_snapshot)()
+
+
+def invalidate_menu_snapshot():
+    global _version
+    _version = next(_versions)
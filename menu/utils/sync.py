@@ -0,0 +1,88 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+# Response key of every synced model, keyed by model name as stored in
+# tombstones.
+SYNC_KEYS = {
+    'category': 'categories',
+    'food': 'foods',
+    'topping': 'toppings',
+    'foodimage': 'food_images',
+    'foodtopping': 'food_toppings',
+}
+
+
+class SyncTokenExpired(Exception):
+    """
+    The token predates the retained tombstones, so deletions since then may
+    be missing.
+    """
+
+
+def _sync_models():
+    from menu.models import Category, Food, FoodImage, FoodTopping, Topping
+    return (Category, Food, Topping, FoodImage, FoodTopping)
+
+
+def encode_sync_token(moment):
+    data = json.dumps({'t': moment.isoformat()}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """
+    Return the moment a token was issued at, or raise ``ValueError``.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+        moment = datetime.fromisoformat(data['t'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        raise ValueError("Invalid sync token")
+    if timezone.is_naive(moment):
+        raise ValueError("Invalid sync token")
+    return moment
+
+
+def menu_changes(since=None):
+    """
+    Rows changed and ids deleted since ``since`` (a datetime, or ``None``
+    for the whole menu), plus the token of the next sync.
+
+    The token is taken before anything is read, and the next sync reaches
+    ``MENU_SYNC_OVERLAP`` seconds further back than it, so rows saved by a
+    transaction that was still open (or a replica that was behind) are
+    picked up next time. Rows in the overlap are sent twice; applying them
+    is idempotent.
+
+    Raises ``SyncTokenExpired`` when ``since`` reaches back further than
+    the ``MENU_SYNC_RETENTION`` seconds tombstones are kept for.
+    """
+    from menu.models import Tombstone
+
+    now = timezone.now()
+    token = encode_sync_token(now)
+    changed = {}
+    deleted = {key: [] for key in SYNC_KEYS.values()}
+    if since is None:
+        for model in _sync_models():
+            changed[SYNC_KEYS[model._meta.model_name]] = model.objects.order_by('pk')
+        return token, changed, deleted
+
+    cutoff = since - timedelta(seconds=settings.MENU_SYNC_OVERLAP)
+    if cutoff < now - timedelta(seconds=settings.MENU_SYNC_RETENTION):
+        raise SyncTokenExpired
+    for model in _sync_models():
+        changed[SYNC_KEYS[model._meta.model_name]] = model.objects.filter(updated_at__gte=cutoff).order_by('pk')
+    tombstones = Tombstone.objects.filter(
+        created_at__gte=cutoff, model_name__in=list(SYNC_KEYS),
+    ).order_by('pk').values_list('model_name', 'object_id')
+    seen = set()
+    for model_name, object_id in tombstones:
+        if (model_name, object_id) not in seen:
+            seen.add((model_name, object_id))
+            deleted[SYNC_KEYS[model_name]].append(object_id)
+    return token, changed, deleted
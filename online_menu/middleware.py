@@ -0,0 +1,87 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import reverse
+
+from menu.utils.response_cache import aserve_cached, cached_endpoint, serve_cached
+from menu.utils.snapshot import aget_menu_snapshot, get_menu_snapshot
+from online_menu.routers import read_from_replica, replica_aliases
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_COOKIE = 'read_primary'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe, non-admin requests from a read replica. Streamed bodies
+    are produced after the middleware returns and read from the primary.
+
+    A successful write sets a short-lived cookie that keeps the client on
+    the primary for ``DATABASE_REPLICA_STICKY_SECONDS``, so an editor sees
+    their own change before it has reached the replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.use_replica(request):
+            with read_from_replica():
+                return self.get_response(request)
+        return self.pin_to_primary(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        if self.use_replica(request):
+            with read_from_replica():
+                return await self.get_response(request)
+        return self.pin_to_primary(request, await self.get_response(request))
+
+    def use_replica(self, request):
+        if not replica_aliases() or request.method not in SAFE_METHODS:
+            return False
+        if PRIMARY_COOKIE in request.COOKIES:
+            return False
+        return not request.path_info.startswith(reverse('admin:index'))
+
+    def pin_to_primary(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            response.set_cookie(
+                PRIMARY_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class ApiResponseCacheMiddleware:
+    """
+    Cache successful GET responses of the API viewsets for the current menu
+    version and availability slice, so identical searches, orderings and
+    pages are computed once per menu change. See ``menu.utils.response_cache``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        endpoint = cached_endpoint(request)
+        if endpoint is None:
+            return self.get_response(request)
+        return serve_cached(request, endpoint, get_menu_snapshot(), self.get_response)
+
+    async def __acall__(self, request):
+        endpoint = cached_endpoint(request)
+        if endpoint is None:
+            return await self.get_response(request)
+        return await aserve_cached(request, endpoint, await aget_menu_snapshot(), self.get_response)
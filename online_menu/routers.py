@@ -0,0 +1,50 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# The replica the current request reads from, or None to read from the
+# primary. Unset outside requests, so commands and jobs use the primary.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_aliases():
+    return list(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route reads inside the block to one replica, picked at random once so
+    that every query sees the same point of replication.
+    """
+    replicas = replica_aliases()
+    token = _read_alias.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request, and writes,
+    migrations and everything outside ``read_from_replica`` to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
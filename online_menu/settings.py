@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 
@@ -53,6 +54,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'online_menu.middleware.ReplicaRoutingMiddleware',
+    'online_menu.middleware.ApiResponseCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,8 +94,39 @@ if config('DB_ENGINE', default='') == 'django.db.backends.postgresql':
             'PASSWORD': config('DB_PASSWORD', default=''),
             'HOST': config('DB_HOST', default='db'),
             'PORT': config('DB_PORT', default='5432'),
+            # Drop broken persistent connections before a request uses them.
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
         }
     }
+    # Connection reuse: a psycopg 3 pool per worker process when DB_POOL is
+    # on (the default) and psycopg_pool is installed. Keep
+    # workers * DB_POOL_MAX_SIZE below the server's max_connections.
+    # Otherwise connections are closed after each request by default: under
+    # ASGI, sync views run in a thread per request and persistent connections
+    # would pile up, one per thread. Set DB_CONN_MAX_AGE to keep them under WSGI.
+    if config('DB_POOL', default=True, cast=bool) and find_spec('psycopg_pool'):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+    # Read replicas as comma-separated host[:port] entries. They share the
+    # primary's name and credentials unless DB_REPLICA_USER/PASSWORD are set.
+    for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]), 1):
+        host, _, port = replica.partition(':')
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+            'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+            'HOST': host,
+            'PORT': port or DATABASES['default']['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     DATABASES = {
         'default': {
@@ -101,6 +135,12 @@ else:
         }
     }
 
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['online_menu.routers.ReplicaRouter']
+# Seconds a client keeps reading from the primary after a write, to cover
+# replication lag.
+DATABASE_REPLICA_STICKY_SECONDS = config('DB_REPLICA_STICKY_SECONDS', default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,7 +197,118 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    # Besides JSON and the browsable API: ?format=compact drops nulls and
+    # empty values, ?format=msgpack (when msgpack is installed) is binary.
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'menu.renderers.CompactJSONRenderer',
+    ],
 }
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('menu.renderers.MessagePackRenderer')
+
+# Cache settings
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The fragment cache defaults to per-worker memory. Point it at a shared
+# backend (e.g. django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.db.DatabaseCache) to share rendered cards
+# between gunicorn workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'menu_fragments': {
+        'BACKEND': config('MENU_FRAGMENT_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('MENU_FRAGMENT_CACHE_LOCATION', default='menu-fragments'),
+        'TIMEOUT': config('MENU_FRAGMENT_CACHE_TIMEOUT', default=3600, cast=int),
+    },
+    'api_responses': {
+        'BACKEND': config('MENU_API_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('MENU_API_CACHE_LOCATION', default='api-responses'),
+        'OPTIONS': {'MAX_ENTRIES': config('MENU_API_CACHE_MAX_ENTRIES', default=5000, cast=int)},
+    },
+}
+
+MENU_FRAGMENT_CACHE = 'menu_fragments'
+
+# API response cache settings
+# GET responses of the API viewsets are cached per menu version and
+# availability slice, for at most this many seconds (0 disables the cache).
+# A shared MENU_API_CACHE_BACKEND also shares the single-flight locks and
+# the hit/miss counts shown by `python manage.py api_cache_stats`.
+MENU_API_CACHE = 'api_responses'
+MENU_API_CACHE_TIMEOUT = config('MENU_API_CACHE_TIMEOUT', default=60, cast=int)
+# Seconds identical requests wait for the one computing a response.
+MENU_API_CACHE_LOCK_TIMEOUT = config('MENU_API_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+
+# Menu snapshot settings
+# How often (in seconds) a worker checks whether another process changed the menu.
+MENU_SNAPSHOT_CHECK_INTERVAL = config('MENU_SNAPSHOT_CHECK_INTERVAL', default=5, cast=int)
+
+# Menu event settings
+# Foods, toppings and topping links record their changes in an event log that
+# /api/menu/events/ pushes to clients as Server-Sent Events.
+# Seconds between polls of the event log by each open stream.
+MENU_EVENTS_POLL_INTERVAL = config('MENU_EVENTS_POLL_INTERVAL', default=1, cast=float)
+# Seconds an idle stream waits before sending a keep-alive comment.
+MENU_EVENTS_HEARTBEAT = config('MENU_EVENTS_HEARTBEAT', default=15, cast=int)
+# Streams close after this many seconds and clients reconnect, so workers
+# restart cleanly and connections get spread over them again.
+MENU_EVENTS_MAX_DURATION = config('MENU_EVENTS_MAX_DURATION', default=300, cast=int)
+# Seconds clients wait before reconnecting.
+MENU_EVENTS_RETRY = config('MENU_EVENTS_RETRY', default=3, cast=int)
+# Seconds a skipped event id is asked for again in case its transaction
+# has not committed yet.
+MENU_EVENTS_GAP_TIMEOUT = config('MENU_EVENTS_GAP_TIMEOUT', default=5, cast=int)
+# Most skipped event ids each stream keeps asking for.
+MENU_EVENTS_MAX_GAPS = config('MENU_EVENTS_MAX_GAPS', default=1000, cast=int)
+# Events older than this many seconds are deleted; clients resuming from
+# an older event are told to reload the menu.
+MENU_EVENTS_RETENTION = config('MENU_EVENTS_RETENTION', default=86400, cast=int)
+# Seconds between prune runs, queued by the run_jobs workers.
+MENU_EVENTS_PRUNE_INTERVAL = config('MENU_EVENTS_PRUNE_INTERVAL', default=3600, cast=int)
+
+# Delta sync settings
+# /api/menu/changes/ also returns rows saved this many seconds before the
+# client's sync token, covering transactions that committed late and
+# replica lag.
+MENU_SYNC_OVERLAP = config('MENU_SYNC_OVERLAP', default=5, cast=int)
+# Tombstones of deleted rows are kept this many seconds (30 days). Older
+# sync tokens get 410 Gone and the client must sync the whole menu again.
+MENU_SYNC_RETENTION = config('MENU_SYNC_RETENTION', default=2592000, cast=int)
+# Seconds between prune runs, queued by the run_jobs workers.
+MENU_SYNC_PRUNE_INTERVAL = config('MENU_SYNC_PRUNE_INTERVAL', default=3600, cast=int)
+
+# Admin settings
+# Unfiltered changelists of tables with at least this many rows (per the
+# database statistics) show an estimated count instead of running COUNT(*).
+# 0 always counts exactly.
+MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD = config('MENU_ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# Full-text search settings
+# Maximum number of ranked matches a food search returns.
+MENU_SEARCH_LIMIT = config('MENU_SEARCH_LIMIT', default=1000, cast=int)
+
+# Image variant settings
+# Every uploaded image is resized to these maximum widths in each format,
+# most preferred format first. Formats this Pillow build can't encode are skipped.
+MENU_IMAGE_VARIANTS = {'thumb': 160, 'card': 480, 'full': 1200}
+MENU_IMAGE_FORMATS = config('MENU_IMAGE_FORMATS', default='avif,webp', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+
+# Background job settings
+# Jobs are stored in the database and run by `python manage.py run_jobs`.
+# With MENU_JOBS_EAGER they run inside the request that queued them instead.
+MENU_JOBS_EAGER = config('MENU_JOBS_EAGER', default=False, cast=bool)
+# Seconds a burst of menu edits is given to settle before caches are warmed.
+MENU_JOB_BATCH_DELAY = config('MENU_JOB_BATCH_DELAY', default=2, cast=int)
+MENU_JOB_MAX_ATTEMPTS = config('MENU_JOB_MAX_ATTEMPTS', default=5, cast=int)
+# Base delay of the exponential retry backoff, in seconds.
+MENU_JOB_RETRY_DELAY = config('MENU_JOB_RETRY_DELAY', default=10, cast=int)
+# Running jobs older than this (seconds) are assumed lost and queued again.
+MENU_JOB_TIMEOUT = config('MENU_JOB_TIMEOUT', default=300, cast=int)
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool)